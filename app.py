@@ -3,23 +3,77 @@ Flask web application for landslide magnitude (mLS) calculation.
 Allows users to upload shapefiles and calculate mLS values.
 """
 
-from flask import Flask, render_template, request, flash, redirect, url_for, jsonify, session
+from flask import (Flask, Response, render_template, request, flash, redirect, url_for, jsonify,
+                   session, stream_with_context)
+import base64
+import csv
+import io
+import json
+import math
 import os
-import geopandas as gpd
-import numpy as np
+import time
+import uuid
 from werkzeug.utils import secure_filename
-import zipfile
 import tempfile
 import shutil
-from mls_calculator import calculate_mls
-from powerlaw_estimator import estimate_powerlaw_parameters
+from concurrent.futures import ProcessPoolExecutor
+from area_reader import AREA_VERIFY_SAMPLE, find_zip_shapefiles, zip_member_path
+from job_queue import DONE, FAILED, QUEUED, RUNNING, JobQueue, JobStore, QueueFull
+from layer_cache import compute_layer, read_summary
+from pipeline import METHOD_NAMES, areas_key, plot_results, run_areas, run_layer
+from result_cache import ResultCache, save_with_sha256
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your-secret-key-change-this-in-production-' + os.urandom(24).hex()
-app.config['UPLOAD_FOLDER'] = tempfile.mkdtemp()
+# Every upload gets its own directory in here, deleted after its job or after UPLOAD_RETENTION
+app.config['UPLOAD_FOLDER'] = os.environ.get('MLS_UPLOAD_DIR',
+                                             os.path.join(tempfile.gettempdir(), 'mls_uploads'))
+os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+# Multi-layer uploads stay for layer selection until unused for this long
+app.config['UPLOAD_RETENTION_SECONDS'] = (
+    int(os.environ.get('MLS_UPLOAD_RETENTION_HOURS', 24)) * 3600
+)
 app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB max file size
+# Processes used to repair, reproject and measure polygons (1 = in the request process)
+app.config['AREA_WORKERS'] = int(os.environ.get('MLS_AREA_WORKERS', 1))
+# How invalid polygons are repaired: 'buffer' (buffer(0)), 'make_valid' or 'always'
+app.config['REPAIR_STRATEGY'] = os.environ.get('MLS_REPAIR_STRATEGY', 'buffer')
+# How geographic layers are projected: 'utm' (one zone), 'utm_zones' (per feature) or 'equal_area'
+app.config['PROJECTION'] = os.environ.get('MLS_PROJECTION', 'utm')
+# Uploaded ZIPs are read in place; reject archives with more members or a larger expanded size
+app.config['MAX_ZIP_MEMBERS'] = int(os.environ.get('MLS_MAX_ZIP_MEMBERS', 1000))
+app.config['MAX_ZIP_UNCOMPRESSED_SIZE'] = (
+    int(os.environ.get('MLS_MAX_ZIP_UNCOMPRESSED_MB', 2048)) * 1024 ** 2
+)
+# Processes precomputing the areas of every layer of a multi-layer upload
+app.config['LAYER_WORKERS'] = int(os.environ.get('MLS_LAYER_WORKERS', os.cpu_count() or 1))
+# Content-addressed cache of areas, fits and results, shared by all workers
+app.config['CACHE_DIR'] = os.environ.get('MLS_CACHE_DIR',
+                                         os.path.join(tempfile.gettempdir(), 'mls_cache'))
+app.config['CACHE_DISK_BYTES'] = int(os.environ.get('MLS_CACHE_DISK_MB', 1024)) * 1024 ** 2
+app.config['CACHE_MEMORY_BYTES'] = int(os.environ.get('MLS_CACHE_MEMORY_MB', 64)) * 1024 ** 2
 
-ALLOWED_EXTENSIONS = {'zip', 'shp', 'dbf', 'shx', 'prj'}
+result_cache = ResultCache(app.config['CACHE_DIR'], max_disk_bytes=app.config['CACHE_DISK_BYTES'],
+                           max_memory_bytes=app.config['CACHE_MEMORY_BYTES'])
+# Uploads are analysed as jobs in this many worker processes; job state lives in SQLite
+app.config['JOB_WORKERS'] = int(os.environ.get('MLS_JOB_WORKERS', 2))
+app.config['JOB_DB'] = os.environ.get('MLS_JOB_DB',
+                                      os.path.join(tempfile.gettempdir(), 'mls_jobs.sqlite3'))
+app.config['MAX_PENDING_JOBS'] = int(os.environ.get('MLS_MAX_PENDING_JOBS', 100))
+app.config['JOB_RETENTION_SECONDS'] = int(os.environ.get('MLS_JOB_RETENTION_HOURS', 24)) * 3600
+# A progress event stream is closed after this many seconds; browsers reconnect by themselves
+app.config['EVENT_STREAM_SECONDS'] = int(os.environ.get('MLS_EVENT_STREAM_SECONDS', 60))
+
+job_queue = JobQueue(JobStore(app.config['JOB_DB']), max_workers=app.config['JOB_WORKERS'],
+                     max_pending=app.config['MAX_PENDING_JOBS'])
+
+# Largest number of area arrays in one batch API request
+app.config['MAX_BATCH_SIZE'] = int(os.environ.get('MLS_MAX_BATCH_SIZE', 1000))
+# Largest number of bootstrap refits a request may ask for
+app.config['MAX_BOOTSTRAP'] = int(os.environ.get('MLS_MAX_BOOTSTRAP', 1000))
+
+ALLOWED_EXTENSIONS = {'zip', 'shp', 'dbf', 'shx', 'prj', 'gpkg', 'fgb', 'parquet'}
+UNCERTAINTY_METHODS = ('montecarlo', 'delta', 'sobol')
 
 
 def allowed_file(filename):
@@ -27,74 +81,156 @@ def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
-def extract_shapefile(zip_path, extract_dir):
-    """Extract shapefile from zip archive and return list of .shp files."""
-    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-        zip_ref.extractall(extract_dir)
-    
-    # Find all .shp files (including in subdirectories)
-    shp_files = []
-    for root, dirs, files in os.walk(extract_dir):
-        for file in files:
-            if file.endswith('.shp'):
-                # Store relative path from extract_dir
-                rel_path = os.path.relpath(os.path.join(root, file), extract_dir)
-                shp_files.append(rel_path)
-    
-    if not shp_files:
-        raise ValueError("No .shp file found in the uploaded zip")
+def find_shapefiles(zip_path):
+    """
+    List the .shp files inside a zip archive without extracting it.
     
-    return shp_files
+    The layers are later read in place through GDAL's /vsizip/ (see
+    zip_member_path), so only the chosen shapefile and its sidecar files
+    are ever decompressed.
+    """
+    return find_zip_shapefiles(zip_path, max_members=app.config['MAX_ZIP_MEMBERS'],
+                               max_uncompressed_size=app.config['MAX_ZIP_UNCOMPRESSED_SIZE'])
+
+
+def read_options(area_field=None, verify_area=True, workers=None):
+    """Keyword arguments of area_reader.read_areas from the app configuration."""
+    return {
+        'workers': app.config['AREA_WORKERS'] if workers is None else workers,
+        'repair': app.config['REPAIR_STRATEGY'],
+        'projection': app.config['PROJECTION'],
+        'area_field': area_field,
+        'verify_sample': AREA_VERIFY_SAMPLE if verify_area else 0,
+    }
 
 
-def calculate_areas_from_shapefile(shapefile_path):
+def form_read_options(form):
     """
-    Read shapefile and calculate areas of polygons.
-    
-    Parameters:
-    -----------
-    shapefile_path : str
-        Path to the shapefile
-        
+    read_areas options for the layers of a multi-layer upload.
+
+    Layers are read one per process, in parallel with each other.
+    """
+    return read_options(area_field=form.get('area_field', '').strip() or None,
+                        verify_area=not form.get('trust_area_field'), workers=1)
+
+
+# Pending background area computations, by (cache directory, layer number)
+_layer_pool = None
+_layer_jobs = {}
+
+
+def _forget_layer_job(key, future):
+    if _layer_jobs.get(key) is future:
+        del _layer_jobs[key]
+
+
+def precompute_layers(zip_path, shp_files, cache_dir, options, upload_hash):
+    """Start computing the areas of every layer of an archive in the background."""
+    global _layer_pool
+    if _layer_pool is None:
+        _layer_pool = ProcessPoolExecutor(max_workers=app.config['LAYER_WORKERS'])
+    for index, member in enumerate(shp_files):
+        key = (cache_dir, index)
+        future = _layer_jobs[key] = _layer_pool.submit(
+            compute_layer, zip_member_path(zip_path, member), cache_dir, index, options,
+            result_cache, areas_key(upload_hash, member, options)
+        )
+        future.add_done_callback(lambda done, key=key: _forget_layer_job(key, done))
+
+
+def check_parameters(parameters):
+    """
+    Reject estimation and mLS parameters that cannot give a finite mLS or
+    that ask for too much work.
+
+    Raises:
+    -------
+    ValueError
+        If a number is not finite or out of range, or a method is unknown
+    """
+    for name in ('cutoff', 'beta_error', 'cutoff_error'):
+        value = parameters.get(name)
+        if value is not None and not (math.isfinite(value) and value > 0):
+            raise ValueError(f"'{name}' must be a positive number")
+    beta = parameters.get('beta')
+    if beta is not None and not (math.isfinite(beta) and beta != 0):
+        raise ValueError("'beta' must be a non-zero number")
+    if parameters.get('estimation_method', 'auto') not in METHOD_NAMES:
+        raise ValueError(f"'estimation_method' must be one of {', '.join(METHOD_NAMES)}")
+    if parameters.get('uncertainty_method', 'montecarlo') not in UNCERTAINTY_METHODS:
+        raise ValueError(f"'uncertainty_method' must be one of {', '.join(UNCERTAINTY_METHODS)}")
+    if not 0 <= parameters.get('n_bootstrap', 0) <= app.config['MAX_BOOTSTRAP']:
+        raise ValueError(f"'n_bootstrap' must be between 0 and {app.config['MAX_BOOTSTRAP']}")
+
+
+def parse_parameters(form):
+    """
+    Estimation and mLS parameters of a submitted form (see
+    pipeline.PARAMETER_DEFAULTS), checked with check_parameters.
+    """
+    parameters = {
+        'cutoff': form.get('cutoff', type=float),
+        'beta': form.get('beta', type=float),
+        'beta_error': form.get('beta_error', type=float),
+        'cutoff_error': form.get('cutoff_error', type=float),
+        'estimation_method': form.get('estimation_method', 'auto'),
+        'uncertainty_method': form.get('uncertainty_method', 'montecarlo'),
+        'n_bootstrap': form.get('n_bootstrap', 0, type=int),
+        'goodness_of_fit': bool(form.get('goodness_of_fit')),
+    }
+    check_parameters(parameters)
+    return parameters
+
+
+def sweep_uploads():
+    """
+    Delete upload directories unused for UPLOAD_RETENTION_SECONDS whose
+    layers are no longer being computed. Uploads in use are touched (see
+    touch_upload); single-layer uploads are deleted by their job.
+    """
+    root = app.config['UPLOAD_FOLDER']
+    expired = time.time() - app.config['UPLOAD_RETENTION_SECONDS']
+    busy = {os.path.dirname(cache_dir) for cache_dir, _ in list(_layer_jobs)}
+    for entry in os.scandir(root):
+        try:
+            if entry.is_dir() and entry.path not in busy and entry.stat().st_mtime < expired:
+                shutil.rmtree(entry.path, ignore_errors=True)
+        except OSError:
+            pass
+
+
+def touch_upload(temp_dir):
+    """Mark an upload directory as used now, postponing its deletion."""
+    try:
+        os.utime(temp_dir)
+    except OSError:
+        pass
+
+
+def save_upload(file):
+    """
+    Save an uploaded file in a new directory of UPLOAD_FOLDER, hashing it
+    for the result cache. Expired uploads are deleted first.
+
     Returns:
     --------
-    areas : array
-        Array of polygon areas in square meters
+    temp_dir, filepath, upload_hash : str
     """
-    # Read shapefile
-    gdf = gpd.read_file(shapefile_path)
-    
-    # Ensure geometry is valid
-    gdf['geometry'] = gdf['geometry'].buffer(0)
-    
-    # Check if CRS is projected (for accurate area calculation)
-    if gdf.crs is None:
-        raise ValueError("Shapefile has no coordinate reference system (CRS) defined")
-    
-    # If CRS is geographic (lat/lon), reproject to appropriate UTM zone
-    if gdf.crs.is_geographic:
-        # Get the centroid of all features to determine UTM zone
-        centroid = gdf.dissolve().centroid.iloc[0]
-        lon = centroid.x
-        
-        # Calculate UTM zone
-        utm_zone = int((lon + 180) / 6) + 1
-        hemisphere = 'north' if centroid.y >= 0 else 'south'
-        
-        # Create UTM CRS
-        utm_crs = f"+proj=utm +zone={utm_zone} +{hemisphere} +ellps=WGS84 +datum=WGS84 +units=m +no_defs"
-        
-        # Reproject
-        gdf = gdf.to_crs(utm_crs)
-        flash(f'Shapefile reprojected to UTM Zone {utm_zone}{hemisphere[0].upper()} for area calculation', 'info')
-    
-    # Calculate areas in square meters
-    areas = gdf.geometry.area.values
-    
-    # Filter out very small polygons (< 1 m²)
-    areas = areas[areas >= 1]
-    
-    return areas, len(gdf), gdf.crs
+    sweep_uploads()
+    temp_dir = tempfile.mkdtemp(dir=app.config['UPLOAD_FOLDER'])
+    filepath = os.path.join(temp_dir, secure_filename(file.filename))
+    try:
+        upload_hash = save_with_sha256(file.stream, filepath)
+    except Exception:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise
+    return temp_dir, filepath, upload_hash
+
+
+def submit_job(function, *args, info=None, after=None, batch=None):
+    """Queue a job (see job_queue.JobQueue.submit), forgetting expired ones first."""
+    job_queue.store.delete_older_than(app.config['JOB_RETENTION_SECONDS'])
+    return job_queue.submit(function, *args, info=info, after=after, batch=batch)
 
 
 @app.route('/')
@@ -117,100 +253,56 @@ def upload_file():
         return redirect(url_for('index'))
     
     if not allowed_file(file.filename):
-        flash('Invalid file type. Please upload a ZIP file containing shapefile components', 'error')
+        flash('Invalid file type. Please upload a ZIP file containing shapefile components, '
+              'or a GeoPackage, FlatGeobuf or GeoParquet file', 'error')
         return redirect(url_for('index'))
     
     try:
-        # Create temporary directory for this upload
-        temp_dir = tempfile.mkdtemp()
-        
-        # Save uploaded file
-        filename = secure_filename(file.filename)
-        filepath = os.path.join(temp_dir, filename)
-        file.save(filepath)
+        # Save uploaded file in a temporary directory, hashing it for the result cache
+        temp_dir, filepath, upload_hash = save_upload(file)
+        filename = os.path.basename(filepath)
         
-        # Extract if zip file
+        # Read shapefiles straight out of a zip file
+        layer = None
         if filename.endswith('.zip'):
-            extract_dir = os.path.join(temp_dir, 'extracted')
-            os.makedirs(extract_dir, exist_ok=True)
-            shp_files = extract_shapefile(filepath, extract_dir)
+            shp_files = find_shapefiles(filepath)
             
-            # If multiple shapefiles found, show selection page
+            # If multiple shapefiles found, compute all their areas in the
+            # background and show the selection page
             if len(shp_files) > 1:
-                # Store temp directory path in session
+                # The previous upload may still be read by its jobs, so it is
+                # left for sweep_uploads
+                cache_dir = os.path.join(temp_dir, 'areas')
+                os.makedirs(cache_dir, exist_ok=True)
+                precompute_layers(filepath, shp_files, cache_dir, form_read_options(request.form),
+                                  upload_hash)
+                
+                # Store temp directory and archive paths in session
                 session['temp_dir'] = temp_dir
-                session['extract_dir'] = extract_dir
+                session['zip_path'] = filepath
+                session['upload_hash'] = upload_hash
+                session['original_params'] = request.form.to_dict()
                 return render_template('select_shapefile.html', 
                                      shapefiles=shp_files,
                                      original_params=request.form.to_dict())
             
             # Single shapefile found
-            shapefile_path = os.path.join(extract_dir, shp_files[0])
+            layer = shp_files[0]
+            shapefile_path = zip_member_path(filepath, layer)
         else:
             shapefile_path = filepath
         
-        # Calculate areas from shapefile
-        areas, feature_count, crs = calculate_areas_from_shapefile(shapefile_path)
-        
-        if len(areas) == 0:
-            flash('No valid polygons found in shapefile', 'error')
-            shutil.rmtree(temp_dir)
-            return redirect(url_for('index'))
-        
-        # Get user-provided parameters or estimate them
-        cutoff = request.form.get('cutoff', type=float)
-        beta = request.form.get('beta', type=float)
-        beta_error = request.form.get('beta_error', type=float)
-        cutoff_error = request.form.get('cutoff_error', type=float)
-        estimation_method = request.form.get('estimation_method', 'auto')
-        
-        # If parameters not provided, estimate them
-        method_used = None
-        if cutoff is None or beta is None:
-            method_name = {'auto': 'automatic', 'official': 'Clauset et al. (2009)', 'simplified': 'simplified'}
-            flash(f'Estimating power-law parameters using {method_name.get(estimation_method, "automatic")} method...', 'info')
-            estimated_cutoff, estimated_beta, est_cutoff_err, est_beta_err, method_used = estimate_powerlaw_parameters(areas, method=estimation_method)
-            flash(f'Parameters estimated using {method_used} method', 'success')
-            
-            if cutoff is None:
-                cutoff = estimated_cutoff
-            if beta is None:
-                beta = estimated_beta
-            if beta_error is None:
-                beta_error = est_beta_err
-            if cutoff_error is None:
-                cutoff_error = est_cutoff_err
-        
-        # Calculate mLS
-        mls_value, error, plot_base64 = calculate_mls(
-            areas, cutoff, beta, beta_error, cutoff_error
+        # The analysis runs as a job; the upload is deleted when it is over
+        area_field = request.form.get('area_field', '').strip() or None
+        options = read_options(area_field, not request.form.get('trust_area_field'))
+        cache_key = areas_key(upload_hash, layer, options)
+        job_id = submit_job(
+            run_layer, result_cache, cache_key, shapefile_path, options,
+            parse_parameters(request.form), None, None, temp_dir,
+            info={'shapefile_name': os.path.basename(layer) if layer else filename,
+                  'cache_key': cache_key}
         )
-        
-        # Prepare results
-        results = {
-            'mls': float(mls_value),
-            'error': float(error) if isinstance(error, (int, float)) else error,
-            'beta': float(beta),
-            'cutoff': float(cutoff),
-            'beta_error': float(beta_error) if beta_error is not None else None,
-            'cutoff_error': float(cutoff_error) if cutoff_error is not None else None,
-            'estimation_method': method_used,
-            'feature_count': int(feature_count),
-            'valid_areas_count': int(len(areas)),
-            'min_area': float(np.min(areas)),
-            'max_area': float(np.max(areas)),
-            'mean_area': float(np.mean(areas)),
-            'median_area': float(np.median(areas)),
-            'total_area': float(np.sum(areas)),
-            'crs': str(crs),
-            'plot': plot_base64,
-            'shapefile_name': os.path.basename(shapefile_path) if isinstance(shapefile_path, str) else filename
-        }
-        
-        # Clean up
-        shutil.rmtree(temp_dir)
-        
-        return render_template('results.html', results=results)
+        return redirect(url_for('job_page', job_id=job_id))
         
     except Exception as e:
         flash(f'Error processing file: {str(e)}', 'error')
@@ -224,99 +316,461 @@ def process_selected():
     """Process the selected shapefile from multiple options."""
     selected_shp = request.form.get('selected_shapefile')
     temp_dir = session.get('temp_dir')
-    extract_dir = session.get('extract_dir')
+    zip_path = session.get('zip_path')
+    upload_hash = session.get('upload_hash')
     
-    if not selected_shp or not temp_dir or not extract_dir:
+    if not selected_shp or not temp_dir or not zip_path or not upload_hash:
         flash('Invalid selection or session expired', 'error')
         return redirect(url_for('index'))
+    try:
+        parameters = parse_parameters(request.form)
+    except ValueError as error:
+        flash(str(error), 'error')
+        return redirect(url_for('select_layer'))
     
     try:
-        shapefile_path = os.path.join(extract_dir, selected_shp)
-        
-        if not os.path.exists(shapefile_path):
+        shp_files = find_shapefiles(zip_path) if os.path.exists(zip_path) else []
+        if selected_shp not in shp_files:
             flash('Selected shapefile not found', 'error')
-            shutil.rmtree(temp_dir, ignore_errors=True)
             return redirect(url_for('index'))
+        touch_upload(temp_dir)
         
-        # Get parameters from form
-        cutoff = request.form.get('cutoff', type=float)
-        beta = request.form.get('beta', type=float)
-        beta_error = request.form.get('beta_error', type=float)
-        cutoff_error = request.form.get('cutoff_error', type=float)
-        
-        # Calculate areas and process
-        areas, feature_count, crs = calculate_areas_from_shapefile(shapefile_path)
-        
-        if len(areas) == 0:
-            flash('No valid polygons found in shapefile', 'error')
-            shutil.rmtree(temp_dir)
-            return redirect(url_for('index'))
-        
-        # Get estimation method
-        estimation_method = request.form.get('estimation_method', 'auto')
-        
-        # Estimate parameters if not provided
-        method_used = None
-        if cutoff is None or beta is None:
-            method_name = {'auto': 'automatic', 'official': 'Clauset et al. (2009)', 'simplified': 'simplified'}
-            flash(f'Estimating power-law parameters using {method_name.get(estimation_method, "automatic")} method...', 'info')
-            estimated_cutoff, estimated_beta, est_cutoff_err, est_beta_err, method_used = estimate_powerlaw_parameters(areas, method=estimation_method)
-            flash(f'Parameters estimated using {method_used} method', 'success')
-            
-            if cutoff is None:
-                cutoff = estimated_cutoff
-            if beta is None:
-                beta = estimated_beta
-            if beta_error is None:
-                beta_error = est_beta_err
-            if cutoff_error is None:
-                cutoff_error = est_cutoff_err
-        
-        # Calculate mLS
-        mls_value, error, plot_base64 = calculate_mls(
-            areas, cutoff, beta, beta_error, cutoff_error
+        # Areas precomputed at upload (or read now if the options changed);
+        # the job waits for the layer's precomputation to finish first
+        options = form_read_options(request.form)
+        cache_dir = os.path.join(temp_dir, 'areas')
+        index = shp_files.index(selected_shp)
+        cache_key = areas_key(upload_hash, selected_shp, options)
+        job_id = submit_job(
+            run_layer, result_cache, cache_key, zip_member_path(zip_path, selected_shp), options,
+            parameters, cache_dir, index,
+            info={'shapefile_name': selected_shp, 'layer_selection': True,
+                  'cache_key': cache_key},
+            after=_layer_jobs.get((cache_dir, index))
         )
         
-        # Prepare results
-        results = {
-            'mls': float(mls_value),
-            'error': float(error) if isinstance(error, (int, float)) else error,
-            'beta': float(beta),
-            'cutoff': float(cutoff),
-            'beta_error': float(beta_error) if beta_error is not None else None,
-            'cutoff_error': float(cutoff_error) if cutoff_error is not None else None,
-            'estimation_method': method_used,
-            'feature_count': int(feature_count),
-            'valid_areas_count': int(len(areas)),
-            'min_area': float(np.min(areas)),
-            'max_area': float(np.max(areas)),
-            'mean_area': float(np.mean(areas)),
-            'median_area': float(np.median(areas)),
-            'total_area': float(np.sum(areas)),
-            'crs': str(crs),
-            'plot': plot_base64,
-            'shapefile_name': selected_shp
-        }
-        
-        # Clean up
-        shutil.rmtree(temp_dir)
+        # The upload and its precomputed areas stay until sweep_uploads
+        # expires them, so another layer can be selected without uploading again
+        return redirect(url_for('job_page', job_id=job_id))
         
-        # Clear session
+    except Exception as e:
+        flash(f'Error processing file: {str(e)}', 'error')
+        # Clear session; jobs may still read the upload, so sweep_uploads deletes it
         session.pop('temp_dir', None)
-        session.pop('extract_dir', None)
+        session.pop('zip_path', None)
+        return redirect(url_for('index'))
+
+
+@app.route('/process_all', methods=['POST'])
+def process_all():
+    """Process every shapefile of the current upload, one job per layer, into one table."""
+    temp_dir = session.get('temp_dir')
+    zip_path = session.get('zip_path')
+    upload_hash = session.get('upload_hash')
+    
+    if not temp_dir or not zip_path or not upload_hash or not os.path.exists(zip_path):
+        flash('Session expired, please upload the file again', 'error')
+        return redirect(url_for('index'))
+    try:
+        parameters = dict(parse_parameters(request.form), plot=False)
+    except ValueError as error:
+        flash(str(error), 'error')
+        return redirect(url_for('select_layer'))
+    
+    try:
+        shp_files = find_shapefiles(zip_path)
+        if job_queue.store.count(QUEUED, RUNNING) + len(shp_files) > job_queue.max_pending:
+            flash('Too many jobs are waiting, please try again later', 'error')
+            return redirect(url_for('select_layer'))
         
-        return render_template('results.html', results=results)
+        touch_upload(temp_dir)
+        # Layers run concurrently in the job pool; plots are rendered on demand
+        options = form_read_options(request.form)
+        cache_dir = os.path.join(temp_dir, 'areas')
+        batch_id = uuid.uuid4().hex
+        for index, member in enumerate(shp_files):
+            cache_key = areas_key(upload_hash, member, options)
+            submit_job(
+                run_layer, result_cache, cache_key, zip_member_path(zip_path, member), options,
+                parameters, cache_dir, index,
+                info={'shapefile_name': member, 'cache_key': cache_key},
+                after=_layer_jobs.get((cache_dir, index)), batch=batch_id
+            )
+        return redirect(url_for('batch_page', batch_id=batch_id))
         
     except Exception as e:
         flash(f'Error processing file: {str(e)}', 'error')
-        if temp_dir and os.path.exists(temp_dir):
-            shutil.rmtree(temp_dir, ignore_errors=True)
-        # Clear session
-        session.pop('temp_dir', None)
-        session.pop('extract_dir', None)
         return redirect(url_for('index'))
 
 
+# Columns of the comparative table of a batch: (key, CSV header)
+BATCH_COLUMNS = [
+    ('layer', 'layer'), ('status', 'status'), ('mls', 'mls'), ('error', 'mls_error'),
+    ('beta', 'beta'), ('beta_error', 'beta_error'), ('cutoff', 'cutoff_m2'),
+    ('cutoff_error', 'cutoff_error_m2'), ('estimation_method', 'estimation_method'),
+    ('uncertainty_method', 'uncertainty_method'), ('feature_count', 'feature_count'),
+    ('valid_areas_count', 'valid_areas_count'), ('min_area', 'min_area_m2'),
+    ('median_area', 'median_area_m2'), ('max_area', 'max_area_m2'),
+    ('total_area', 'total_area_m2'), ('crs', 'crs'), ('read_seconds', 'read_seconds'),
+    ('analysis_seconds', 'analysis_seconds'), ('total_seconds', 'total_seconds'),
+    ('failure', 'failure'),
+]
+
+
+def batch_row(job):
+    """Row of the comparative table for one layer job (see BATCH_COLUMNS)."""
+    results = job['result'] or {}
+    timings = results.get('timings', {})
+    row = {key: results.get(key) for key, _ in BATCH_COLUMNS}
+    row.update({
+        'job_id': job['id'],
+        'layer': job['info'].get('shapefile_name'),
+        'status': job['status'],
+        'progress': job['progress'],
+        'read_seconds': timings.get('read'),
+        'analysis_seconds': timings.get('analysis'),
+        'total_seconds': timings.get('total'),
+        'failure': job['error'],
+    })
+    return row
+
+
+@app.route('/batches/<batch_id>')
+def batch_page(batch_id):
+    """Comparative table of the layers of a batch, filled in as the jobs finish."""
+    jobs = job_queue.store.batch(batch_id)
+    if not jobs:
+        flash('Unknown batch, it may have expired', 'error')
+        return redirect(url_for('index'))
+    return render_template('batch_results.html', batch_id=batch_id,
+                           rows=[batch_row(job) for job in jobs])
+
+
+@app.route('/batches/<batch_id>/rows')
+def batch_rows(batch_id):
+    """Rows of the comparative table as JSON, and whether every job has finished."""
+    jobs = job_queue.store.batch(batch_id)
+    if not jobs:
+        return jsonify({'error': 'Unknown batch'}), 404
+    return jsonify({'rows': [batch_row(job) for job in jobs],
+                    'complete': all(job['status'] in (DONE, FAILED) for job in jobs)})
+
+
+@app.route('/batches/<batch_id>.csv')
+def batch_csv(batch_id):
+    """Comparative table of a batch as a CSV download."""
+    jobs = job_queue.store.batch(batch_id)
+    if not jobs:
+        return jsonify({'error': 'Unknown batch'}), 404
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow([header for _, header in BATCH_COLUMNS])
+    for job in jobs:
+        row = batch_row(job)
+        writer.writerow(['' if row[key] is None else row[key] for key, _ in BATCH_COLUMNS])
+    return Response(output.getvalue(), mimetype='text/csv', headers={
+        'Content-Disposition': f'attachment; filename=mls_batch_{batch_id[:8]}.csv'
+    })
+
+
+@app.route('/jobs/<job_id>/plot.png')
+def job_plot(job_id):
+    """
+    Plot of a finished job. Jobs run without a plot get it rendered on
+    first request, from the cached areas, and kept in the result cache.
+    """
+    job = job_queue.store.get(job_id)
+    if job is None or job['status'] != DONE:
+        return jsonify({'error': 'No finished job with this ID'}), 404
+    results = job['result']
+    
+    plot_base64 = results.get('plot')
+    if plot_base64 is None:
+        cache_key = job['info'].get('cache_key')
+        plot_key = ResultCache.key('plot', cache_key, results['cutoff'], results['beta'],
+                                   results['error'])
+        cached = result_cache.get('plot', plot_key)
+        if cached is not None:
+            plot_base64 = cached['plot']
+        else:
+            entry = result_cache.get_array('areas', cache_key) if cache_key else None
+            if entry is None:
+                return jsonify({'error': 'The areas of this job are no longer cached'}), 404
+            plot_base64 = plot_results(entry[0], results)
+            result_cache.put('plot', plot_key, {'plot': plot_base64})
+    
+    return Response(base64.b64decode(plot_base64), mimetype='image/png',
+                    headers={'Cache-Control': 'private, max-age=86400'})
+
+
+@app.route('/jobs/<job_id>')
+def job_page(job_id):
+    """Results of a job once it is done, or a page polling its status until then."""
+    job = job_queue.store.get(job_id)
+    if job is None:
+        flash('Unknown job, it may have expired', 'error')
+        return redirect(url_for('index'))
+    
+    if job['status'] == FAILED:
+        for message, category in job['messages']:
+            flash(message, category)
+        flash(f"Error processing file: {job['error']}", 'error')
+        return redirect(url_for('index'))
+    
+    if job['status'] == DONE:
+        for message, category in job['messages']:
+            flash(message, category)
+        results = dict(job['result'], job_id=job_id, **job['info'])
+        return render_template('results.html', results=results)
+    
+    return render_template('job_status.html', job=job)
+
+
+@app.route('/jobs/<job_id>/status')
+def job_status(job_id):
+    """State of a job as JSON (see job_event), for clients that poll."""
+    job = job_queue.store.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    return jsonify(job_event(job))
+
+
+def job_event(job):
+    """Public state of a job: status, progress, messages so far and error."""
+    return {'id': job['id'], 'status': job['status'], 'progress': job['progress'],
+            'messages': job['messages'], 'error': job['error']}
+
+
+@app.route('/jobs/<job_id>/events')
+def job_events(job_id):
+    """
+    Server-sent events with the state of a job (see job_event), sent
+    whenever it changes, until the job is done or failed.
+    """
+    if job_queue.store.get(job_id) is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    
+    def events():
+        deadline = time.monotonic() + app.config['EVENT_STREAM_SECONDS']
+        last = None
+        yield 'retry: 1000\n\n'
+        while time.monotonic() < deadline:
+            job = job_queue.store.get(job_id)
+            if job is None:
+                return
+            if job['updated'] != last:
+                last = job['updated']
+                yield f"data: {json.dumps(job_event(job))}\n\n"
+            if job['status'] in (DONE, FAILED):
+                return
+            time.sleep(0.25)
+    
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@app.route('/select')
+def select_layer():
+    """Show the layer selection page of the current multi-layer upload again."""
+    zip_path = session.get('zip_path')
+    if not zip_path or not os.path.exists(zip_path):
+        flash('Session expired, please upload the file again', 'error')
+        return redirect(url_for('index'))
+    return render_template('select_shapefile.html', shapefiles=find_shapefiles(zip_path),
+                           original_params=session.get('original_params', {}))
+
+
+@app.route('/layer_summaries')
+def layer_summaries():
+    """Area summaries of the layers of the current upload computed so far (null if pending)."""
+    temp_dir = session.get('temp_dir')
+    zip_path = session.get('zip_path')
+    if not temp_dir or not zip_path or not os.path.exists(zip_path):
+        return jsonify({'layers': []}), 404
+    cache_dir = os.path.join(temp_dir, 'areas')
+    layers = [read_summary(cache_dir, index) for index in range(len(find_shapefiles(zip_path)))]
+    return jsonify({'layers': layers})
+
+
+# JSON API (version 1): the results dict of results.html, without the HTML
+
+def api_error(message, status=400, **extra):
+    """JSON error response of the API."""
+    return jsonify(dict(extra, error=message)), status
+
+
+KIND_NAMES = {float: 'a number', int: 'an integer', bool: 'true or false', str: 'a string'}
+
+
+def api_parameters(data, defaults=None):
+    """
+    Estimation and mLS parameters of a JSON request, on top of defaults.
+    
+    Numbers must be JSON numbers and flags JSON booleans; plots are only
+    rendered if 'plot' is true.
+    
+    Raises:
+    -------
+    ValueError
+        If a parameter has the wrong type or is rejected by check_parameters
+    """
+    parameters = dict(defaults or {'plot': False})
+    kinds = {'cutoff': float, 'beta': float, 'beta_error': float, 'cutoff_error': float,
+             'estimation_method': str, 'uncertainty_method': str, 'n_bootstrap': int,
+             'goodness_of_fit': bool, 'plot': bool}
+    for name, kind in kinds.items():
+        value = data.get(name)
+        if value is None:
+            continue
+        if kind is float and isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = float(value)
+        elif not isinstance(value, kind) or (kind is int and isinstance(value, bool)):
+            raise ValueError(f"'{name}' must be {KIND_NAMES[kind]}")
+        parameters[name] = value
+    
+    check_parameters(parameters)
+    return parameters
+
+
+def is_long(parameters):
+    """Whether parameters ask for bootstrap refits or a goodness-of-fit test."""
+    return bool(parameters.get('n_bootstrap')) or bool(parameters.get('goodness_of_fit'))
+
+
+def api_areas(data, parameters):
+    """Analyse one JSON area array: {'result', 'messages'}."""
+    if not isinstance(data.get('areas'), list):
+        raise ValueError("'areas' must be a list of numbers")
+    messages = []
+    try:
+        result = run_areas(result_cache, data['areas'], parameters, messages)
+    except ArithmeticError as error:
+        raise ValueError(f'The mLS could not be computed: {error}')
+    return {'result': result, 'messages': messages}
+
+
+@app.route('/api/v1/mls', methods=['POST'])
+def api_mls():
+    """
+    mLS of one inventory.
+    
+    A JSON body {"areas": [...], <parameters>} is analysed at once (200),
+    unless it asks for bootstrap refits or a goodness-of-fit test: those
+    are queued as a job (202) like uploads. A multipart upload ('inventory':
+    ZIP, GeoPackage, FlatGeobuf or GeoParquet file; 'layer' picks a
+    shapefile of a ZIP; parameters as form fields) is always queued as a
+    job; its result is at the returned status URL.
+    """
+    if request.is_json:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return api_error('Expected a JSON object')
+        try:
+            parameters = api_parameters(data)
+            if is_long(parameters):
+                if not isinstance(data.get('areas'), list):
+                    raise ValueError("'areas' must be a list of numbers")
+                return api_job_accepted(submit_job(run_areas, result_cache, data['areas'],
+                                                   parameters, info={'shapefile_name': 'areas'}))
+            return jsonify(api_areas(data, parameters))
+        except QueueFull as error:
+            return api_error(str(error), 503)
+        except (ValueError, ImportError) as error:
+            return api_error(str(error))
+    
+    file = request.files.get('inventory')
+    if file is None or file.filename == '':
+        return api_error("Send JSON with 'areas' or upload an 'inventory' file")
+    if not allowed_file(file.filename):
+        return api_error('Upload a ZIP file containing shapefiles, or a GeoPackage, '
+                         'FlatGeobuf or GeoParquet file')
+    
+    try:
+        parameters = parse_parameters(request.form)
+    except ValueError as error:
+        return api_error(str(error))
+    parameters['plot'] = request.form.get('plot', '').lower() in ('1', 'true', 'yes')
+    
+    temp_dir, filepath, upload_hash = save_upload(file)
+    try:
+        layer = None
+        path = filepath
+        if filepath.endswith('.zip'):
+            shp_files = find_shapefiles(filepath)
+            layer = request.form.get('layer') or (shp_files[0] if len(shp_files) == 1 else None)
+            if layer not in shp_files:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+                return api_error("Choose one of the shapefiles with 'layer'", layers=shp_files)
+            path = zip_member_path(filepath, layer)
+        
+        area_field = request.form.get('area_field', '').strip() or None
+        options = read_options(area_field, not request.form.get('trust_area_field'))
+        cache_key = areas_key(upload_hash, layer, options)
+        job_id = submit_job(
+            run_layer, result_cache, cache_key, path, options, parameters, None, None, temp_dir,
+            info={'shapefile_name': layer or os.path.basename(filepath), 'cache_key': cache_key}
+        )
+    except Exception as error:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        return api_error(str(error), 503 if isinstance(error, QueueFull) else 400)
+    
+    return api_job_accepted(job_id)
+
+
+def api_job_accepted(job_id):
+    """202 response pointing at the status URL of a queued job."""
+    status_url = url_for('api_job', job_id=job_id)
+    return jsonify({'job_id': job_id, 'status_url': status_url}), 202, {'Location': status_url}
+
+
+LONG_BATCH_ERROR = ("'n_bootstrap' and 'goodness_of_fit' are not available in batches; "
+                    "send the inventory to /api/v1/mls to run them as a job")
+
+
+@app.route('/api/v1/mls/batch', methods=['POST'])
+def api_mls_batch():
+    """
+    mLS of many area arrays: {"inventories": [{"areas": [...], <parameters>}, ...],
+    <parameters shared by all>}. Returns {"results": [...]}, one
+    {'result', 'messages'} or {'error'} per inventory, in order. Bootstrap
+    refits and goodness-of-fit tests take too long for one request and are
+    rejected; send those inventories to /api/v1/mls one by one.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not isinstance(data.get('inventories'), list):
+        return api_error("Expected a JSON object with an 'inventories' list")
+    if len(data['inventories']) > app.config['MAX_BATCH_SIZE']:
+        return api_error(f"At most {app.config['MAX_BATCH_SIZE']} inventories per request", 413)
+    try:
+        shared = api_parameters(data)
+        if is_long(shared):
+            raise ValueError(LONG_BATCH_ERROR)
+    except ValueError as error:
+        return api_error(str(error))
+    
+    results = []
+    for inventory in data['inventories']:
+        try:
+            if not isinstance(inventory, dict):
+                raise ValueError("Each inventory must be a JSON object with 'areas'")
+            parameters = api_parameters(inventory, shared)
+            if is_long(parameters):
+                raise ValueError(LONG_BATCH_ERROR)
+            results.append(api_areas(inventory, parameters))
+        except (ValueError, ImportError) as error:
+            results.append({'error': str(error)})
+    return jsonify({'results': results})
+
+
+@app.route('/api/v1/jobs/<job_id>')
+def api_job(job_id):
+    """State of an upload job (see job_event), with its 'result' once done."""
+    job = job_queue.store.get(job_id)
+    if job is None:
+        return api_error('Unknown job', 404)
+    return jsonify(dict(job_event(job), result=job['result'], info=job['info']))
+
+
 @app.route('/about')
 def about():
     """Render the about page with methodology information."""
@@ -0,0 +1,121 @@
+"""
+Sorted landslide area inventory shared by the estimators and the mLS calculator.
+
+An AreaInventory is built once per inventory: the areas are filtered and
+sorted a single time, and the quantities the power-law fit and the mLS
+calculation need (maximum, log-areas, suffix sums of the logs) are computed
+on first use and kept. Both estimate_powerlaw_parameters and calculate_mls
+accept an AreaInventory in place of an area array and use it without
+copying or sorting again.
+"""
+
+import numpy as np
+
+
+class AreaInventory:
+    """
+    Landslide areas sorted once, with cached summary arrays.
+
+    Parameters:
+    -----------
+    areas : array-like
+        Landslide areas in square meters. NaN and non-positive areas are
+        dropped.
+    min_area : float, optional
+        Areas smaller than this are dropped as well
+    assume_sorted : bool, optional
+        Skip sorting if the areas are already sorted in ascending order
+
+    Attributes:
+    -----------
+    areas : ndarray
+        Contiguous, read-only, ascending float64 array of the areas
+    count : int
+        Number of areas
+    max_area, min_area : float
+        Largest and smallest area (NaN if the inventory is empty)
+    """
+
+    def __init__(self, areas, min_area=None, assume_sorted=False):
+        areas = np.asarray(areas, dtype=np.float64).ravel()
+        keep = areas > 0
+        if min_area is not None:
+            keep &= areas >= min_area
+        if not keep.all():
+            areas = areas[keep]
+        if not assume_sorted:
+            areas = np.sort(areas)
+
+        self.areas = np.ascontiguousarray(areas).view()
+        self.areas.flags.writeable = False
+        self.count = len(self.areas)
+        self.max_area = float(self.areas[-1]) if self.count else np.nan
+        self.min_area = float(self.areas[0]) if self.count else np.nan
+
+        self._log_areas = None
+        self._suffix_log_sum = None
+        self._first_index = None
+
+    def __len__(self):
+        return self.count
+
+    def __array__(self, dtype=None, copy=None):
+        if dtype is None or np.dtype(dtype) == self.areas.dtype:
+            return self.areas.copy() if copy else self.areas
+        return self.areas.astype(dtype)
+
+    @property
+    def log_areas(self):
+        """Natural logarithm of the sorted areas."""
+        if self._log_areas is None:
+            self._log_areas = np.log(self.areas)
+            self._log_areas.flags.writeable = False
+        return self._log_areas
+
+    @property
+    def suffix_log_sum(self):
+        """suffix_log_sum[i] = sum(log_areas[i:]), with a trailing 0 (length count + 1)."""
+        if self._suffix_log_sum is None:
+            self._suffix_log_sum = np.zeros(self.count + 1)
+            self._suffix_log_sum[:-1] = np.cumsum(self.log_areas[::-1])[::-1]
+            self._suffix_log_sum.flags.writeable = False
+        return self._suffix_log_sum
+
+    @property
+    def first_index(self):
+        """Index of the first occurrence of each area, so tied areas share it."""
+        if self._first_index is None:
+            self._first_index = np.searchsorted(self.areas, self.areas, side='left')
+            self._first_index.flags.writeable = False
+        return self._first_index
+
+    @property
+    def total_area(self):
+        """Sum of the areas."""
+        return float(np.sum(self.areas))
+
+    @property
+    def mean_area(self):
+        """Mean area (NaN if the inventory is empty)."""
+        return self.total_area / self.count if self.count else np.nan
+
+    @property
+    def median_area(self):
+        """Median area, read directly from the sorted array."""
+        if not self.count:
+            return np.nan
+        middle = self.count // 2
+        if self.count % 2:
+            return float(self.areas[middle])
+        return float((self.areas[middle - 1] + self.areas[middle]) / 2)
+
+    def tail(self, xmin):
+        """Sorted areas greater than or equal to xmin (a view, no copy)."""
+        return self.areas[np.searchsorted(self.areas, xmin, side='left'):]
+
+
+def as_inventory(areas):
+    """Return areas as an AreaInventory, reusing it if it already is one."""
+    if isinstance(areas, AreaInventory):
+        return areas
+    return AreaInventory(areas)
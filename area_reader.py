@@ -0,0 +1,726 @@
+"""
+Streaming polygon area extraction for landslide inventories.
+
+Only the geometries are read (attribute columns are skipped), in chunks of
+a fixed number of features, through pyogrio or Fiona. Each chunk is
+repaired, reprojected and reduced to its areas before the next one is
+read, so memory stays bounded by the chunk size plus the output array of
+areas, whatever the size of the file. With workers > 1 the chunks are
+repaired, reprojected and measured in a process pool (passed as WKB)
+while the next ones are read.
+
+Layers are read from disk or directly from inside a ZIP archive through
+GDAL's /vsizip/ file system (see find_zip_shapefiles and zip_member_path).
+"""
+
+import itertools
+import json
+import os
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+import shapely
+from pyproj import CRS, Transformer
+
+from powerlaw_estimator import _resolve_workers
+
+try:
+    import pyogrio
+    PYOGRIO_AVAILABLE = True
+except ImportError:
+    PYOGRIO_AVAILABLE = False
+
+try:
+    import fiona
+    FIONA_AVAILABLE = True
+except ImportError:
+    FIONA_AVAILABLE = False
+
+try:
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Features read at a time
+DEFAULT_CHUNK_SIZE = 50000
+
+# Polygons smaller than this (m²) are dropped, as in the web application
+MIN_AREA = 1.0
+
+# Attribute names recognised as an area in m² (case-insensitive, in order of preference)
+AREA_FIELD_NAMES = ('area_m2', 'area_sqm', 'area_sq_m', 'shape_area', 'area')
+
+# Limits on uploaded ZIP archives, checked from the central directory
+MAX_ZIP_MEMBERS = 1000
+MAX_ZIP_UNCOMPRESSED_SIZE = 2 * 1024 ** 3
+
+# Features whose geometric area is checked against an area attribute, and
+# the relative difference accepted
+AREA_VERIFY_SAMPLE = 100
+AREA_TOLERANCE = 0.01
+
+
+def is_parquet(path):
+    """Whether a path names a (Geo)Parquet file, read with pyarrow rather than GDAL."""
+    return str(path).lower().endswith(('.parquet', '.geoparquet'))
+
+
+def _resolve_engine(engine, path=None):
+    """Pick the reader library ('pyogrio' preferred, then 'fiona'; 'pyarrow' for Parquet)."""
+    if engine == 'pyarrow' or (path is not None and is_parquet(path)):
+        if not PYARROW_AVAILABLE:
+            raise ImportError("Reading GeoParquet needs pyarrow: pip install pyarrow")
+        return 'pyarrow'
+    if engine == 'auto':
+        if PYOGRIO_AVAILABLE:
+            return 'pyogrio'
+        if FIONA_AVAILABLE:
+            return 'fiona'
+        raise ImportError("Reading shapefiles needs pyogrio or fiona: pip install pyogrio")
+    if engine == 'pyogrio' and not PYOGRIO_AVAILABLE:
+        raise ImportError("pyogrio is not installed: pip install pyogrio")
+    if engine == 'fiona' and not FIONA_AVAILABLE:
+        raise ImportError("fiona is not installed: pip install fiona")
+    if engine not in ('pyogrio', 'fiona'):
+        raise ValueError(f"Unknown engine '{engine}'. Use 'auto', 'pyogrio' or 'fiona'")
+    return engine
+
+
+def find_zip_shapefiles(zip_path, max_members=MAX_ZIP_MEMBERS,
+                        max_uncompressed_size=MAX_ZIP_UNCOMPRESSED_SIZE):
+    """
+    Shapefiles inside a ZIP archive, found from its member list alone.
+
+    Only the central directory is read; nothing is extracted. Archives
+    with too many members or too large an uncompressed size are rejected
+    before any member is decompressed.
+
+    Parameters:
+    -----------
+    zip_path : str
+        Path to the ZIP archive
+    max_members : int, optional
+        Largest accepted number of members (default: 1000)
+    max_uncompressed_size : int, optional
+        Largest accepted total uncompressed size in bytes (default: 2 GB)
+
+    Returns:
+    --------
+    shp_files : list of str
+        Archive paths of the .shp members, in archive order
+    """
+    with zipfile.ZipFile(zip_path) as archive:
+        members = archive.infolist()
+    if len(members) > max_members:
+        raise ValueError(f"ZIP archive has {len(members)} files, more than the "
+                         f"limit of {max_members}")
+    uncompressed_size = sum(member.file_size for member in members)
+    if uncompressed_size > max_uncompressed_size:
+        raise ValueError(f"ZIP archive expands to {uncompressed_size / 1024 ** 2:.1f} MB, "
+                         f"more than the limit of {max_uncompressed_size / 1024 ** 2:.1f} MB")
+
+    shp_files = [member.filename for member in members
+                 if not member.is_dir() and member.filename.lower().endswith('.shp')
+                 and not member.filename.startswith('__MACOSX/')]
+    if not shp_files:
+        raise ValueError("No .shp file found in the uploaded zip")
+    return shp_files
+
+
+def zip_member_path(zip_path, member):
+    """GDAL /vsizip/ path reading a member (and its sidecar files) inside a ZIP."""
+    return f"/vsizip/{os.path.abspath(zip_path)}/{member}"
+
+
+def _geoparquet_geometry(parquet_file):
+    """
+    Primary geometry column, CRS and bounding box (or None) of a GeoParquet file.
+
+    Follows the GeoParquet 'geo' metadata: a column without a 'crs' entry
+    is in OGC:CRS84, an explicit null CRS is unknown.
+    """
+    metadata = parquet_file.schema_arrow.metadata or {}
+    if b'geo' not in metadata:
+        raise ValueError("Parquet file has no GeoParquet 'geo' metadata")
+    geo = json.loads(metadata[b'geo'])
+    column = geo['primary_column']
+    info = geo['columns'][column]
+    if info.get('encoding', 'WKB').upper() != 'WKB':
+        raise ValueError(f"GeoParquet geometry encoding '{info['encoding']}' is not "
+                         f"supported; write the geometries as WKB")
+    if 'crs' not in info:
+        crs = CRS.from_user_input('OGC:CRS84')
+    elif info['crs'] is None:
+        crs = None
+    else:
+        crs = CRS.from_user_input(info['crs'])
+    return column, crs, info.get('bbox')
+
+
+def layer_info(path, engine='auto'):
+    """
+    CRS and feature count of a vector layer, without reading features.
+
+    Returns:
+    --------
+    crs : pyproj.CRS or None
+        Coordinate reference system of the layer
+    feature_count : int
+        Number of features
+    """
+    engine = _resolve_engine(engine, path)
+    if engine == 'pyarrow':
+        parquet_file = pq.ParquetFile(path)
+        _, crs, _ = _geoparquet_geometry(parquet_file)
+        return crs, parquet_file.metadata.num_rows
+    if engine == 'pyogrio':
+        info = pyogrio.read_info(path)
+        crs = CRS.from_user_input(info['crs']) if info['crs'] else None
+        return crs, int(info['features'])
+
+    with fiona.open(path) as source:
+        crs = CRS.from_wkt(source.crs_wkt) if source.crs_wkt else None
+        return crs, len(source)
+
+
+def iter_wkb_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE, engine='auto'):
+    """
+    Yield the geometries of a vector layer as WKB in chunks, without attributes.
+
+    With pyarrow installed, pyogrio streams layers other than shapefiles
+    (GeoPackage, FlatGeobuf, ...) as Arrow record batches, and GeoParquet
+    files are read batch by batch with pyarrow, handing the WKB over in
+    bulk. Shapefiles are read in feature ranges, which seek directly and
+    are faster for them.
+
+    Parameters:
+    -----------
+    path : str
+        Path to the shapefile (or any OGR-readable layer, or a GeoParquet file)
+    chunk_size : int, optional
+        Number of features per chunk
+    engine : str, optional
+        'auto' (default), 'pyogrio' or 'fiona'
+
+    Yields:
+    -------
+    wkb : ndarray
+        WKB of the next chunk's geometries (None for empty geometries)
+    """
+    engine = _resolve_engine(engine, path)
+    if engine == 'pyarrow':
+        parquet_file = pq.ParquetFile(path)
+        column, _, _ = _geoparquet_geometry(parquet_file)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=[column]):
+            yield batch.column(0).to_numpy(zero_copy_only=False)
+        return
+    if engine == 'pyogrio' and PYARROW_AVAILABLE and not str(path).lower().endswith('.shp'):
+        with pyogrio.raw.open_arrow(path, columns=[], batch_size=chunk_size,
+                                    use_pyarrow=True) as (meta, reader):
+            column = meta['geometry_name'] or 'wkb_geometry'
+            for batch in reader:
+                yield batch.column(column).to_numpy(zero_copy_only=False)
+        return
+    if engine == 'pyogrio':
+        _, feature_count = layer_info(path, engine)
+        for skip in range(0, feature_count, chunk_size):
+            _, _, wkb, _ = pyogrio.raw.read(path, columns=[], skip_features=skip,
+                                            max_features=chunk_size)
+            yield wkb
+        return
+
+    with fiona.open(path) as source:
+        features = iter(source)
+        while True:
+            chunk = list(itertools.islice(features, chunk_size))
+            if not chunk:
+                return
+            geometries = np.array([shapely.geometry.shape(feature['geometry'])
+                                   if feature['geometry'] is not None else None
+                                   for feature in chunk], dtype=object)
+            yield shapely.to_wkb(geometries)
+
+
+def iter_geometry_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE, engine='auto'):
+    """
+    Yield the geometries of a vector layer in chunks, without attributes.
+
+    Same parameters as iter_wkb_chunks; yields arrays of shapely geometries.
+    """
+    for wkb in iter_wkb_chunks(path, chunk_size, engine):
+        yield shapely.from_wkb(wkb)
+
+
+def _map_chunks(function, chunks, workers, *args):
+    """
+    Yield function(chunk, *args) for every chunk, in order.
+
+    With more than one worker the calls run in a process pool; at most
+    two chunks per worker are in flight, so memory stays bounded.
+    """
+    if workers <= 1:
+        for chunk in chunks:
+            yield function(chunk, *args)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(function, chunk, *args))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def repair_geometries(geometries, strategy='buffer'):
+    """
+    Repair invalid geometries, leaving valid ones untouched.
+
+    Validity is checked for the whole array at once and only the invalid
+    geometries are repaired, which is much cheaper than buffering every
+    polygon. Valid polygons keep exactly the area buffer(0) would give.
+
+    Parameters:
+    -----------
+    geometries : ndarray
+        Shapely geometries (None for empty geometries)
+    strategy : str, optional
+        'buffer' (default): buffer(0) on invalid geometries
+        'make_valid': shapely.make_valid on invalid geometries
+        'always': buffer(0) on every geometry, as earlier versions did
+
+    Returns:
+    --------
+    geometries : ndarray
+        Repaired geometries
+    n_repaired : int
+        Number of geometries that were invalid (for 'always', all
+        non-empty geometries)
+    """
+    if strategy == 'always':
+        return shapely.buffer(geometries, 0), int(np.sum(~shapely.is_missing(geometries)))
+    if strategy not in ('buffer', 'make_valid'):
+        raise ValueError(
+            f"Unknown repair strategy '{strategy}'. Use 'buffer', 'make_valid' or 'always'"
+        )
+
+    invalid = ~shapely.is_valid(geometries) & ~shapely.is_missing(geometries)
+    n_repaired = int(np.sum(invalid))
+    if n_repaired:
+        geometries = geometries.copy()
+        if strategy == 'buffer':
+            geometries[invalid] = shapely.buffer(geometries[invalid], 0)
+        else:
+            geometries[invalid] = shapely.make_valid(geometries[invalid])
+    return geometries, n_repaired
+
+
+def _utm_proj_string(zone, hemisphere):
+    """PROJ string of a WGS84 UTM zone ('north' or 'south' hemisphere)."""
+    return f"+proj=utm +zone={zone} +{hemisphere} +ellps=WGS84 +datum=WGS84 +units=m +no_defs"
+
+
+def utm_crs_for(lon, lat):
+    """
+    UTM CRS of the zone containing a longitude/latitude.
+
+    Returns:
+    --------
+    crs : pyproj.CRS
+        UTM projection on WGS84
+    zone : int
+        UTM zone number
+    hemisphere : str
+        'north' or 'south'
+    """
+    zone = min(int((lon + 180) / 6) + 1, 60)
+    hemisphere = 'north' if lat >= 0 else 'south'
+    return CRS.from_user_input(_utm_proj_string(zone, hemisphere)), zone, hemisphere
+
+
+def utm_zone_labels(zones):
+    """Readable labels ('32N', '33S', ...) of signed zone codes (negative in the south)."""
+    return [f"{abs(code)}{'S' if code < 0 else 'N'}"
+            for code in sorted(zones, key=lambda code: (abs(code), code < 0))]
+
+
+def utm_zone_codes(lon, lat):
+    """
+    Signed UTM zone code of each longitude/latitude (vectorized).
+
+    The code is the zone number, negated in the southern hemisphere, so one
+    integer identifies the projection.
+    """
+    zone = np.clip(np.floor((np.asarray(lon) + 180) / 6).astype(int) + 1, 1, 60)
+    return np.where(np.asarray(lat) >= 0, zone, -zone)
+
+
+def equal_area_crs_for(bounds):
+    """
+    Lambert azimuthal equal-area CRS centred on a longitude/latitude extent.
+
+    Areas are exact anywhere in this projection (only shapes are distorted
+    away from the centre), so one CRS serves inventories of any extent.
+    """
+    lon = (bounds[0] + bounds[2]) / 2
+    lat = (bounds[1] + bounds[3]) / 2
+    return CRS.from_user_input(
+        f"+proj=laea +lat_0={lat} +lon_0={lon} +ellps=WGS84 +datum=WGS84 +units=m +no_defs"
+    )
+
+
+def layer_bounds(path, engine='auto'):
+    """
+    Extent (xmin, ymin, xmax, ymax) of a vector layer, from its header.
+
+    Shapefiles store the extent in the header, so no feature is read;
+    GeoParquet files without a 'bbox' in their metadata are scanned.
+    """
+    engine = _resolve_engine(engine, path)
+    if engine == 'pyarrow':
+        _, _, bbox = _geoparquet_geometry(pq.ParquetFile(path))
+        if bbox is not None:
+            return tuple(bbox[:4]) if len(bbox) == 4 else (bbox[0], bbox[1], bbox[3], bbox[4])
+        bounds = np.array([shapely.total_bounds(shapely.from_wkb(wkb))
+                           for wkb in iter_wkb_chunks(path, engine=engine)])
+        return (np.nanmin(bounds[:, 0]), np.nanmin(bounds[:, 1]),
+                np.nanmax(bounds[:, 2]), np.nanmax(bounds[:, 3]))
+    if engine == 'pyogrio':
+        return tuple(pyogrio.read_info(path, force_total_bounds=True)['total_bounds'])
+
+    with fiona.open(path) as source:
+        return tuple(source.bounds)
+
+
+@lru_cache(maxsize=128)
+def _transformer(source_crs, target_crs):
+    """pyproj Transformer between two CRS given as WKT, built once per process."""
+    return Transformer.from_crs(CRS.from_wkt(source_crs), CRS.from_wkt(target_crs),
+                                always_xy=True)
+
+
+@lru_cache(maxsize=128)
+def _utm_wkt(code):
+    """WKT of the UTM CRS of a signed zone code."""
+    hemisphere = 'south' if code < 0 else 'north'
+    return CRS.from_user_input(_utm_proj_string(abs(code), hemisphere)).to_wkt()
+
+
+def _project_by_zone(geometries, source_crs):
+    """
+    Project each geometry to the UTM zone of its own bounding-box centre.
+
+    Geometries are grouped by zone and each group is transformed in one
+    vectorized call. Returns the projected geometries and the zone codes
+    used.
+    """
+    present = ~shapely.is_missing(geometries)
+    bounds = shapely.bounds(geometries[present])
+    codes = utm_zone_codes((bounds[:, 0] + bounds[:, 2]) / 2, (bounds[:, 1] + bounds[:, 3]) / 2)
+    index = np.flatnonzero(present)
+    geometries = geometries.copy()
+    zones = np.unique(codes)
+    for code in zones:
+        group = index[codes == code]
+        transformer = _transformer(source_crs, _utm_wkt(int(code)))
+        geometries[group] = shapely.transform(geometries[group], transformer.transform,
+                                              interleaved=False)
+    return geometries, [int(code) for code in zones]
+
+
+def _project(geometries, source_crs, target_crs):
+    """
+    Project geometries from source_crs to target_crs (WKT strings).
+
+    target_crs None leaves them as they are; 'utm_zones' projects each to
+    its own UTM zone. Returns the geometries and the UTM zone codes used.
+    """
+    if target_crs == 'utm_zones':
+        return _project_by_zone(geometries, source_crs)
+    if target_crs is not None:
+        transformer = _transformer(source_crs, target_crs)
+        geometries = shapely.transform(geometries, transformer.transform, interleaved=False)
+    return geometries, []
+
+
+def _chunk_areas(wkb, source_crs, target_crs, min_area, repair):
+    """
+    Repaired, projected areas of one WKB chunk, smaller areas dropped.
+
+    source_crs and target_crs are WKT strings; with target_crs None the
+    coordinates are already projected, with target_crs 'utm_zones' each
+    geometry goes to its own UTM zone. Returns the areas, the number of
+    repaired geometries and the UTM zone codes used.
+    """
+    geometries, n_repaired = repair_geometries(shapely.from_wkb(wkb), repair)
+    geometries, zones = _project(geometries, source_crs, target_crs)
+    areas = shapely.area(geometries)
+    return areas[areas >= min_area], n_repaired, zones
+
+
+def _projection_plan(path, crs, engine, projection):
+    """
+    Source and target CRS (WKT) for a layer, the CRS of the areas and notes.
+
+    The target is None for projected layers and 'utm_zones' for per-feature
+    UTM zones.
+    """
+    if projection not in ('utm', 'utm_zones', 'equal_area'):
+        raise ValueError(
+            f"Unknown projection '{projection}'. Use 'utm', 'utm_zones' or 'equal_area'"
+        )
+
+    messages = []
+    source_crs, target_crs = crs.to_wkt(), None
+    if crs.is_geographic and projection == 'utm_zones':
+        target_crs, crs = 'utm_zones', None
+    elif crs.is_geographic:
+        bounds = layer_bounds(path, engine)
+        if projection == 'equal_area':
+            crs = equal_area_crs_for(bounds)
+            messages.append(('Shapefile reprojected to a Lambert azimuthal equal-area '
+                             'projection for area calculation', 'info'))
+        else:
+            crs, zone, hemisphere = utm_crs_for((bounds[0] + bounds[2]) / 2,
+                                                (bounds[1] + bounds[3]) / 2)
+            messages.append((f'Shapefile reprojected to UTM Zone {zone}{hemisphere[0].upper()} '
+                             f'for area calculation', 'info'))
+        target_crs = crs.to_wkt()
+    return source_crs, target_crs, crs, messages
+
+
+def layer_fields(path, engine='auto'):
+    """Names of the attribute fields of a vector layer."""
+    engine = _resolve_engine(engine, path)
+    if engine == 'pyarrow':
+        parquet_file = pq.ParquetFile(path)
+        column, _, _ = _geoparquet_geometry(parquet_file)
+        return [name for name in parquet_file.schema_arrow.names if name != column]
+    if engine == 'pyogrio':
+        return [str(name) for name in pyogrio.read_info(path)['fields']]
+
+    with fiona.open(path) as source:
+        return list(source.schema['properties'])
+
+
+def find_area_field(path, engine='auto'):
+    """Name of the layer's area attribute (see AREA_FIELD_NAMES), or None."""
+    fields = {name.lower(): name for name in layer_fields(path, engine)}
+    for name in AREA_FIELD_NAMES:
+        if name in fields:
+            return fields[name]
+    return None
+
+
+def read_field(path, field, engine='auto', return_fids=False):
+    """
+    Values of one numeric attribute of every feature, without reading geometries.
+
+    Missing values are returned as NaN. With return_fids, the feature ids
+    (as read_wkb takes them) are returned too.
+    """
+    engine = _resolve_engine(engine, path)
+    if field not in layer_fields(path, engine):
+        raise ValueError(f"Attribute '{field}' not found in the layer")
+    if engine == 'pyarrow':
+        column = pq.read_table(path, columns=[field]).column(0)
+        values = np.asarray(column.to_pandas(), dtype=np.float64)
+        fids = np.arange(len(values))
+    elif engine == 'pyogrio':
+        _, fids, _, (values,) = pyogrio.raw.read(path, columns=[field], read_geometry=False,
+                                                 return_fids=True)
+        values = np.asarray(values, dtype=np.float64)
+    else:
+        with fiona.open(path) as source:
+            fids, values = [], []
+            for fid, feature in source.items():
+                fids.append(int(fid))
+                values.append(np.nan if feature['properties'][field] is None
+                              else feature['properties'][field])
+        fids, values = np.array(fids), np.array(values, dtype=np.float64)
+    return (values, fids) if return_fids else values
+
+
+def read_wkb(path, fids, engine='auto'):
+    """WKB of the features with the given ids (see read_field), in that order."""
+    engine = _resolve_engine(engine, path)
+    if engine == 'pyarrow':
+        parquet_file = pq.ParquetFile(path)
+        column, _, _ = _geoparquet_geometry(parquet_file)
+        fids = np.asarray(fids)
+        starts = np.cumsum([0] + [parquet_file.metadata.row_group(group).num_rows
+                                  for group in range(parquet_file.num_row_groups)])
+        groups = np.searchsorted(starts, fids, side='right') - 1
+        wkb = np.empty(len(fids), dtype=object)
+        for group in np.unique(groups):
+            rows = parquet_file.read_row_group(int(group), columns=[column]).column(0)
+            selected = groups == group
+            wkb[selected] = rows.take(fids[selected] - starts[group]).to_numpy(
+                zero_copy_only=False)
+        return wkb
+    if engine == 'pyogrio':
+        _, _, wkb, _ = pyogrio.raw.read(path, columns=[], fids=np.asarray(fids))
+        return wkb
+
+    with fiona.open(path) as source:
+        return shapely.to_wkb(np.array(
+            [shapely.geometry.shape(source[int(fid)]['geometry']) for fid in fids],
+            dtype=object))
+
+
+def _attribute_areas(path, field, engine, min_area, verify_sample, tolerance, source_crs,
+                     target_crs, repair):
+    """
+    Areas read from an attribute, or None if a sample disagrees with the geometries.
+
+    The geometric areas of verify_sample random features (repaired and
+    projected as read_areas would) must match the attribute within the
+    relative tolerance. A sample with no geometric area of at least
+    min_area verifies nothing, so it gives None too.
+    """
+    values, fids = read_field(path, field, engine, return_fids=True)
+    if verify_sample and len(values):
+        rng = np.random.default_rng(0)
+        rows = np.sort(rng.choice(len(values), min(verify_sample, len(values)), replace=False))
+        wkb = read_wkb(path, fids[rows], engine)
+        geometries, _ = repair_geometries(shapely.from_wkb(wkb), repair)
+        measured = shapely.area(_project(geometries, source_crs, target_crs)[0])
+        checked = measured >= min_area
+        if not checked.any():
+            return None
+        difference = np.abs(values[rows][checked] - measured[checked]) / measured[checked]
+        if not np.all(difference <= tolerance):
+            return None
+    return values[values >= min_area]
+
+
+def read_areas(path, chunk_size=DEFAULT_CHUNK_SIZE, engine='auto', min_area=MIN_AREA,
+               workers=1, repair='buffer', projection='utm', area_field=None,
+               verify_sample=AREA_VERIFY_SAMPLE, area_tolerance=AREA_TOLERANCE, progress=None):
+    """
+    Stream polygon areas (m²) out of a shapefile, chunk by chunk.
+
+    Gives the same areas as reading the whole layer with geopandas,
+    repairing with buffer(0) (only the invalid geometries), reprojecting
+    geographic layers and taking .area, but holds only one chunk of
+    geometries at a time (two per worker in parallel mode). The projection
+    of geographic layers is chosen from the layer extent in the file header,
+    so every layer is read once.
+
+    Parameters:
+    -----------
+    path : str
+        Path to the shapefile (or any OGR-readable layer)
+    chunk_size : int, optional
+        Number of features per chunk (default: 50,000)
+    engine : str, optional
+        'auto' (default: pyogrio if installed, else fiona), 'pyogrio' or 'fiona'
+    min_area : float, optional
+        Smaller areas are dropped (default: 1 m²)
+    workers : int, optional
+        Processes used to repair, reproject and measure the chunks
+        (default: 1, in this process; None for one per CPU). The results
+        do not depend on it.
+    repair : str, optional
+        Repair strategy for invalid geometries: 'buffer' (default),
+        'make_valid' or 'always' (see repair_geometries)
+    projection : str, optional
+        How geographic layers are projected:
+        'utm' (default): the UTM zone of the centre of the layer extent
+        'utm_zones': every feature to the UTM zone of its own centre,
+        for inventories spanning several zones
+        'equal_area': Lambert azimuthal equal-area centred on the layer
+        extent, exact areas at any extent
+    area_field : str, optional
+        Read the areas (m²) from this numeric attribute instead of the
+        geometries, skipping geometry parsing, repair and projection;
+        'auto' looks for a field named as in AREA_FIELD_NAMES. Default
+        None: always measure the geometries.
+    verify_sample : int, optional
+        Number of random features whose geometric area is compared with
+        the attribute (default: 100; 0 trusts the attribute). If any
+        differs by more than area_tolerance, the geometries are measured
+        instead and a warning is added to the messages.
+    area_tolerance : float, optional
+        Largest accepted relative difference (default: 0.01)
+    progress : callable, optional
+        Called as progress('read', done, feature_count) as features are
+        read, repaired, reprojected and measured (once per chunk)
+
+    Returns:
+    --------
+    result : dict
+        'areas' (float64 array of the kept areas, in file order),
+        'feature_count' (features in the layer), 'repaired_count'
+        (geometries repaired), 'crs' (CRS of the areas, None for
+        'utm_zones'), 'utm_zones' (labels of the per-feature UTM zones,
+        e.g. ['32N', '33N'], empty for the other projections),
+        'area_field' (attribute the areas were read from, or None) and
+        'messages', a list of (message, category) notes for the user
+    """
+    crs, feature_count = layer_info(path, engine)
+
+    # Check if CRS is projected (for accurate area calculation)
+    if crs is None:
+        raise ValueError("Shapefile has no coordinate reference system (CRS) defined")
+
+    source_crs, target_crs, crs, messages = _projection_plan(path, crs, engine, projection)
+    if progress is not None:
+        progress('read', 0, feature_count)
+
+    if area_field is not None:
+        field = find_area_field(path, engine) if area_field == 'auto' else area_field
+        if field is not None:
+            result = _attribute_areas(path, field, engine, min_area, verify_sample,
+                                      area_tolerance, source_crs, target_crs, repair)
+            if result is not None:
+                if progress is not None:
+                    progress('read', feature_count, feature_count)
+                return {'areas': result, 'feature_count': feature_count, 'repaired_count': 0,
+                        'crs': crs, 'utm_zones': [], 'area_field': field,
+                        'messages': [(f"Areas read from the '{field}' attribute", 'info')]}
+            messages.append((f"The '{field}' attribute does not match the polygon areas; "
+                             f"areas computed from the geometries instead", 'warning'))
+
+    workers = _resolve_workers(workers)
+    # Sizes of the chunks in flight, in order, to count the features done
+    chunk_sizes = deque()
+
+    def counted(chunks):
+        for chunk in chunks:
+            chunk_sizes.append(len(chunk))
+            yield chunk
+
+    chunks = counted(iter_wkb_chunks(path, chunk_size, engine))
+    areas, repaired_count, zones, done = [], 0, set(), 0
+    for chunk_areas, n_repaired, chunk_zones in _map_chunks(_chunk_areas, chunks, workers,
+                                                            source_crs, target_crs, min_area,
+                                                            repair):
+        areas.append(chunk_areas)
+        repaired_count += n_repaired
+        zones.update(chunk_zones)
+        done += chunk_sizes.popleft()
+        if progress is not None:
+            progress('read', done, feature_count)
+    zones = utm_zone_labels(zones)
+    if zones:
+        messages.append((f'Features reprojected to their own UTM zones ({", ".join(zones)}) '
+                         f'for area calculation', 'info'))
+    if repaired_count and repair != 'always':
+        messages.append((f'Repaired {repaired_count} invalid geometries '
+                         f'({"make_valid" if repair == "make_valid" else "buffer(0)"})', 'info'))
+
+    return {
+        'areas': np.concatenate(areas) if areas else np.empty(0),
+        'feature_count': feature_count,
+        'repaired_count': repaired_count,
+        'crs': crs,
+        'utm_zones': zones,
+        'area_field': None,
+        'messages': messages,
+    }
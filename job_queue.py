@@ -0,0 +1,318 @@
+"""
+Local job queue for the web application.
+
+Long computations run as jobs in a bounded pool of worker processes, so
+an HTTP request only submits the work and returns a job ID. Job state
+(queued, running, done or failed), progress, results and messages are
+kept in a SQLite database, shared by every web worker and pool process;
+clients poll it through a status endpoint or follow it as server-sent
+events. No external broker is needed.
+"""
+
+import json
+import os
+import sqlite3
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing, contextmanager
+
+from result_cache import json_default
+
+QUEUED, RUNNING, DONE, FAILED = 'queued', 'running', 'done', 'failed'
+
+# Smallest interval (s) between two progress writes of a job within a stage
+PROGRESS_INTERVAL = 0.25
+
+# Columns added after the first release, created on databases that lack them
+_ADDED_COLUMNS = {'progress': 'TEXT', 'batch': 'TEXT', 'owner': 'TEXT'}
+
+
+def _process_alive(pid):
+    """
+    Whether a process is running. Without POSIX signals only the current
+    process is known to be.
+    """
+    if pid == os.getpid():
+        return True
+    if os.name != 'posix':
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobStore:
+    """
+    Job records in a SQLite database.
+
+    Parameters:
+    -----------
+    path : str
+        Database file (created if needed)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, status TEXT NOT NULL, created REAL NOT NULL, "
+                "updated REAL NOT NULL, info TEXT, result TEXT, messages TEXT, error TEXT)"
+            )
+            columns = {row['name'] for row in connection.execute("PRAGMA table_info(jobs)")}
+            for name, kind in _ADDED_COLUMNS.items():
+                if name not in columns:
+                    connection.execute(f"ALTER TABLE jobs ADD COLUMN {name} {kind}")
+            connection.execute("CREATE INDEX IF NOT EXISTS jobs_batch ON jobs (batch)")
+
+    @contextmanager
+    def _connect(self):
+        """Connection committed on success and closed afterwards."""
+        with closing(sqlite3.connect(self.path, timeout=30)) as connection:
+            connection.row_factory = sqlite3.Row
+            with connection:
+                yield connection
+
+    def _update(self, job_id, **columns):
+        columns['updated'] = time.time()
+        assignments = ', '.join(f'{name} = ?' for name in columns)
+        with self._connect() as connection:
+            connection.execute(f"UPDATE jobs SET {assignments} WHERE id = ?",
+                               [*columns.values(), job_id])
+
+    def create(self, info=None, batch=None, owner=None):
+        """
+        Add a queued job and return its ID; info is kept with it (JSON).
+        Jobs created with the same batch ID are listed together by batch().
+        owner ('pid:token') identifies the process running the job (see
+        fail_abandoned).
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT INTO jobs (id, status, created, updated, info, batch, owner) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, QUEUED, now, now, json.dumps(info or {}, default=json_default), batch,
+                 owner)
+            )
+        return job_id
+
+    def start(self, job_id):
+        """Mark a job as running."""
+        self._update(job_id, status=RUNNING)
+
+    def report(self, job_id, progress, messages=()):
+        """Store the progress ({'stage', 'done', 'total'}) and messages so far of a job."""
+        self._update(job_id, progress=json.dumps(progress, default=json_default),
+                     messages=json.dumps(list(messages), default=json_default))
+
+    def finish(self, job_id, result, messages=()):
+        """Store the result and messages of a job and mark it done."""
+        self._update(job_id, status=DONE, result=json.dumps(result, default=json_default),
+                     messages=json.dumps(list(messages), default=json_default))
+
+    def fail(self, job_id, error, messages=()):
+        """Store the error of a job and mark it failed."""
+        self._update(job_id, status=FAILED, error=str(error),
+                     messages=json.dumps(list(messages), default=json_default))
+
+    def get(self, job_id):
+        """
+        Record of a job, or None.
+
+        Returns:
+        --------
+        job : dict or None
+            'id', 'status', 'created', 'updated', 'info', 'result',
+            'messages' (list of (message, category)), 'error',
+            'progress' (last reported {'stage', 'done', 'total'}, or None)
+            and 'batch'
+        """
+        with self._connect() as connection:
+            row = connection.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._decode(row) if row is not None else None
+
+    def batch(self, batch_id):
+        """Records of the jobs of a batch (see get), in the order they were created."""
+        with self._connect() as connection:
+            rows = connection.execute("SELECT * FROM jobs WHERE batch = ? ORDER BY created, rowid",
+                                      (batch_id,)).fetchall()
+        return [self._decode(row) for row in rows]
+
+    @staticmethod
+    def _decode(row):
+        job = dict(row)
+        for name in ('info', 'result', 'messages', 'progress'):
+            job[name] = json.loads(job[name]) if job[name] is not None else None
+        job['messages'] = job['messages'] or []
+        return job
+
+    def count(self, *statuses):
+        """Number of jobs in the given states."""
+        marks = ', '.join('?' for _ in statuses)
+        with self._connect() as connection:
+            return connection.execute(f"SELECT COUNT(*) FROM jobs WHERE status IN ({marks})",
+                                      statuses).fetchone()[0]
+
+    def delete_older_than(self, seconds):
+        """
+        Forget jobs last updated more than seconds ago, including queued or
+        running ones that stalled.
+        """
+        with self._connect() as connection:
+            connection.execute("DELETE FROM jobs WHERE updated < ?", (time.time() - seconds,))
+
+    def fail_abandoned(self, owner, error="Interrupted by a server restart"):
+        """
+        Fail the queued or running jobs left behind by processes that exited.
+
+        owner ('pid:token') is the calling process. A job is abandoned if its
+        owner has another token and its pid is not running, or is the
+        caller's own pid (reused after a restart). Jobs without an owner
+        predate owners and are abandoned too.
+
+        Returns:
+        --------
+        count : int
+            Number of jobs failed
+        """
+        pid, token = owner.split(':')
+        with self._connect() as connection:
+            rows = connection.execute("SELECT id, owner FROM jobs WHERE status IN (?, ?)",
+                                      (QUEUED, RUNNING)).fetchall()
+        abandoned = []
+        for row in rows:
+            if row['owner'] is None:
+                abandoned.append(row['id'])
+                continue
+            job_pid, job_token = row['owner'].split(':')
+            if job_token != token and (job_pid == pid or not _process_alive(int(job_pid))):
+                abandoned.append(row['id'])
+        for job_id in abandoned:
+            self.fail(job_id, error)
+        return len(abandoned)
+
+
+class _ProgressReporter:
+    """
+    Progress callback of a running job, writing to the store.
+
+    Writes are throttled to one per PROGRESS_INTERVAL within a stage; the
+    start and end of every stage are always written, together with the
+    messages collected so far.
+    """
+
+    def __init__(self, store, job_id, messages):
+        self.store = store
+        self.job_id = job_id
+        self.messages = messages
+        self._stage = None
+        self._written = 0.0
+
+    def __call__(self, stage, done, total):
+        now = time.monotonic()
+        if (stage == self._stage and done < total
+                and now - self._written < PROGRESS_INTERVAL):
+            return
+        self._stage, self._written = stage, now
+        self.store.report(self.job_id, {'stage': stage, 'done': done, 'total': total},
+                          self.messages)
+
+
+def _run_job(store_path, job_id, function, args):
+    """
+    Run one job in a pool process, recording its state in the store.
+
+    function(*args, messages=messages, progress=progress) returns the
+    result or raises; it appends (message, category) notes for the user
+    to messages and calls progress(stage, done, total) as it goes. The
+    exception message becomes the job's error.
+    """
+    store = JobStore(store_path)
+    store.start(job_id)
+    messages = []
+    try:
+        result = function(*args, messages=messages,
+                          progress=_ProgressReporter(store, job_id, messages))
+    except Exception as error:
+        store.fail(job_id, error, messages)
+        return
+    store.finish(job_id, result, messages)
+
+
+class QueueFull(RuntimeError):
+    """Raised when too many jobs are already waiting."""
+
+
+class JobQueue:
+    """
+    Bounded pool of worker processes running jobs recorded in a JobStore.
+
+    Parameters:
+    -----------
+    store : JobStore
+        Where the jobs are recorded
+    max_workers : int, optional
+        Worker processes (default: 2)
+    max_pending : int, optional
+        Largest number of queued or running jobs; beyond it submit raises
+        QueueFull (default: 100)
+
+    Jobs that earlier processes left queued or running are failed when the
+    queue is created (see JobStore.fail_abandoned); one queue per process
+    should use a store.
+    """
+
+    def __init__(self, store, max_workers=2, max_pending=100):
+        self.store = store
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._pool = None
+        self._token = uuid.uuid4().hex
+        store.fail_abandoned(self._owner())
+
+    def _owner(self):
+        return f'{os.getpid()}:{self._token}'
+
+    def _submit(self, job_id, function, args):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        future = self._pool.submit(_run_job, self.store.path, job_id, function, args)
+        future.add_done_callback(lambda done: self._check(job_id, done))
+        return future
+
+    def _check(self, job_id, future):
+        """Record jobs whose worker process died (the job could not record it)."""
+        if future.exception() is not None:
+            self.store.fail(job_id, f"Worker failed: {future.exception()}")
+
+    def submit(self, function, *args, info=None, after=None, batch=None):
+        """
+        Queue function(*args) as a job and return its ID immediately.
+
+        function must be importable by the worker processes; it is called
+        as function(*args, messages=list, progress=callable) and returns a
+        JSON-serializable result. With after (a Future), the job waits in
+        the queue until that future is done. batch groups jobs (see
+        JobStore.batch).
+        """
+        if self.store.count(QUEUED, RUNNING) >= self.max_pending:
+            raise QueueFull("Too many jobs are waiting, please try again later")
+        job_id = self.store.create(info, batch, self._owner())
+        if after is None or after.done():
+            self._submit(job_id, function, args)
+        else:
+            after.add_done_callback(lambda _: self._submit(job_id, function, args))
+        return job_id
+
+    def shutdown(self, wait=True):
+        """Stop the worker processes."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
@@ -0,0 +1,148 @@
+"""
+Precomputed polygon areas for the layers of a multi-layer upload.
+
+When an upload holds several layers, the areas of all of them are
+computed right away, in parallel, and each layer is saved next to the
+upload as two files: its areas (.npy) and a JSON summary (feature count,
+CRS, size statistics, reader messages and the read options used). The
+selection page shows the summaries as they arrive, and selecting a layer,
+or switching to another one, loads the saved areas instead of reading
+the layer again.
+
+The JSON file is written last, so its presence marks a complete entry.
+Given a content-addressed ResultCache, layers already read from an
+identical upload are taken from it instead of being read again.
+"""
+
+import json
+import os
+
+import numpy as np
+
+from area_inventory import AreaInventory
+from area_reader import read_areas
+from result_cache import _write_atomic
+
+
+def _entry_paths(cache_dir, index):
+    """Paths of the .npy areas and the .json summary of layer number index."""
+    base = os.path.join(cache_dir, f'layer_{index}')
+    return base + '.npy', base + '.json'
+
+
+def read_layer_areas(path, options, result_cache=None, cache_key=None, progress=None):
+    """
+    Areas of a layer, from the content-addressed cache if it holds them.
+
+    Parameters:
+    -----------
+    path : str
+        Layer path (a file or a /vsizip/ path)
+    options : dict
+        Keyword arguments of area_reader.read_areas
+    result_cache : ResultCache, optional
+        Cache of the 'areas' stage; the areas read are stored in it
+    cache_key : str, optional
+        Key of the layer in result_cache
+    progress : callable, optional
+        Progress callback of read_areas
+
+    Returns:
+    --------
+    areas : ndarray
+        Polygon areas (memory-mapped when they come from the cache)
+    meta : dict
+        'feature_count', 'crs' (as text) and 'messages' of the reader
+    """
+    if result_cache is not None:
+        entry = result_cache.get_array('areas', cache_key)
+        if entry is not None:
+            return entry
+
+    result = read_areas(path, progress=progress, **options)
+    crs = result['crs']
+    if crs is None:
+        crs = 'UTM zones ' + ', '.join(result['utm_zones'])
+    meta = {'feature_count': result['feature_count'], 'crs': str(crs),
+            'messages': result['messages']}
+    if result_cache is not None:
+        result_cache.put_array('areas', cache_key, result['areas'], meta)
+    return result['areas'], meta
+
+
+def compute_layer(path, cache_dir, index, options, result_cache=None, cache_key=None,
+                  progress=None):
+    """
+    Read the areas of one layer and save them with their summary.
+
+    Errors are saved in the summary ('error') instead of raised, so one
+    unreadable layer does not hide the others.
+
+    Parameters:
+    -----------
+    path : str
+        Layer path (a file or a /vsizip/ path)
+    cache_dir : str
+        Directory of the saved entries
+    index : int
+        Number of the layer in the upload
+    options : dict
+        Keyword arguments of area_reader.read_areas; saved with the entry
+        so a later request with other options reads the layer again
+    result_cache, cache_key, progress : optional
+        As for read_layer_areas
+
+    Returns:
+    --------
+    summary : dict
+        The saved summary
+    """
+    areas_path, summary_path = _entry_paths(cache_dir, index)
+    summary = {'index': index, 'options': options}
+    try:
+        areas, meta = read_layer_areas(path, options, result_cache, cache_key, progress)
+        inventory = AreaInventory(areas)
+        summary.update({
+            'feature_count': meta['feature_count'],
+            'count': inventory.count,
+            'min_area': inventory.min_area if inventory.count else None,
+            'max_area': inventory.max_area if inventory.count else None,
+            'median_area': inventory.median_area if inventory.count else None,
+            'total_area': inventory.total_area,
+            'crs': meta['crs'],
+            'messages': meta['messages'],
+        })
+        _write_atomic(areas_path, lambda handle: np.save(handle, areas))
+    except Exception as error:
+        summary['error'] = str(error)
+
+    _write_atomic(summary_path, lambda handle: handle.write(json.dumps(summary).encode()))
+    return summary
+
+
+def read_summary(cache_dir, index):
+    """Saved summary of a layer, or None if it is not computed yet."""
+    _, summary_path = _entry_paths(cache_dir, index)
+    if not os.path.exists(summary_path):
+        return None
+    with open(summary_path) as handle:
+        return json.load(handle)
+
+
+def load_layer(cache_dir, index, options):
+    """
+    Saved areas and summary of a layer read with the given options.
+
+    Returns:
+    --------
+    areas : ndarray or None
+        The areas, or None if the layer is not saved yet, failed, or was
+        read with other options
+    summary : dict or None
+        Its summary
+    """
+    summary = read_summary(cache_dir, index)
+    if summary is None or 'error' in summary or summary['options'] != options:
+        return None, summary
+    areas_path, _ = _entry_paths(cache_dir, index)
+    return np.load(areas_path), summary
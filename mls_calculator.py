@@ -10,21 +10,583 @@ The original MATLAB code has not been modified. This is a new Python implementat
 """
 
 import numpy as np
-import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend for web server
-import matplotlib.pyplot as plt
+from dataclasses import dataclass
+from functools import lru_cache
 from scipy import stats
+from scipy.special import ndtri
+from scipy.stats import qmc
 import io
 import base64
+import time
 
+from area_inventory import AreaInventory
 
-def calculate_mls(area, cutoff, beta, beta_error=None, cutoff_error=None):
+# Reference values from the Northridge inventory (Tanyas et al., 2018)
+REF_MIDX = 4.876599623713225e+04
+REF_MIDY = 8.364725347860417e-04
+REF_COUNT = 11111
+
+
+class LogBinning:
+    """
+    Geometric bins used for the frequency density of landslide areas.
+    
+    Edges follow x[0] = start, x[i] = x[i-1] * ratio, as in mLS.m, and are
+    built once per parameter set (see get_binning). Because the series is
+    geometric, the bin of each area can also be computed directly as
+    floor(log(a / start) / log(ratio)).
+    
+    Parameters:
+    -----------
+    start : float, optional
+        First bin edge (default 2 m²)
+    ratio : float, optional
+        Ratio between successive edges (default 1.2)
+    n_edges : int, optional
+        Number of edges (default 120, i.e. 119 bins)
+    """
+    
+    def __init__(self, start=2.0, ratio=1.2, n_edges=120):
+        self.start = float(start)
+        self.ratio = float(ratio)
+        
+        # Sequential products, identical to the loop in mLS.m
+        factors = np.full(n_edges, self.ratio)
+        factors[0] = self.start
+        self.edges = np.cumprod(factors)
+        
+        # Bin intervals as in mLS.m: internal(i) = x1(i) - x1(i-1), with
+        # the first interval equal to the first edge
+        self.widths = np.empty(n_edges - 1)
+        self.widths[0] = self.edges[0]
+        self.widths[1:] = np.diff(self.edges[:-1])
+        
+        self.centers = (self.edges[:-1] + self.edges[1:]) / 2
+        self._log_ratio = np.log(self.ratio)
+        
+        for array in (self.edges, self.widths, self.centers):
+            array.flags.writeable = False
+    
+    @property
+    def n_bins(self):
+        """Number of bins."""
+        return len(self.edges) - 1
+    
+    def bin_index(self, areas):
+        """
+        Bin index of each area, computed directly from its logarithm.
+        
+        Returns:
+        --------
+        index : ndarray
+            Bin of every area; -1 below the first edge (and for NaN or
+            non-positive areas), n_bins above the last edge. The last bin
+            is closed, as in np.histogram
+        """
+        return self._shifted_index(areas) - 1
+    
+    def _shifted_index(self, areas):
+        """Bin index plus one, in [0, n_bins + 1]."""
+        areas = np.asarray(areas, dtype=np.float64)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = np.log(areas)
+            t -= np.log(self.start)
+            t /= self._log_ratio
+            
+            # Areas whose logarithm is within rounding of an edge are placed
+            # by comparison against the exact edges below
+            near = np.flatnonzero(np.abs(t - np.rint(t)) < 1e-9)
+        
+        np.floor(t, out=t)
+        np.fmax(t, -1, out=t)  # also maps NaN to -1
+        np.fmin(t, self.n_bins, out=t)
+        t += 1
+        index = t.astype(np.intp)
+        
+        if len(near) > 0:
+            exact = areas[near]
+            shifted = np.searchsorted(self.edges, exact, side='right')
+            shifted[exact == self.edges[-1]] = self.n_bins
+            index[near] = shifted
+        return index
+    
+    def histogram(self, areas, method='search'):
+        """
+        Count areas per bin, matching np.histogram(areas, bins=self.edges).
+        
+        Parameters:
+        -----------
+        areas : array-like
+            Landslide areas in square meters
+        method : str, optional
+            'search' (default): np.histogram with the cached edges
+            'direct': bin index from the logarithm of each area, then
+            np.bincount (no search or sort)
+            'sorted': areas are already sorted ascending; only the edges
+            are located, in O(n_bins log n)
+            
+        Returns:
+        --------
+        freq : ndarray
+            Number of areas in each bin
+        """
+        if method == 'search':
+            return np.histogram(areas, bins=self.edges)[0]
+        if method == 'direct':
+            counts = np.bincount(self._shifted_index(areas), minlength=self.n_bins + 2)
+            return counts[1:-1]
+        if method == 'sorted':
+            positions = np.searchsorted(areas, self.edges, side='left')
+            # The last bin includes its right edge
+            positions[-1] = np.searchsorted(areas, self.edges[-1], side='right')
+            return np.diff(positions)
+        raise ValueError(
+            f"Unknown histogram method '{method}'. Use 'search', 'direct' or 'sorted'"
+        )
+    
+    def frequency_density(self, freq):
+        """Frequency density for bin counts."""
+        return freq / self.widths
+
+
+@lru_cache(maxsize=None)
+def get_binning(start=2.0, ratio=1.2, n_edges=120):
+    """Return a shared LogBinning, built once per (start, ratio, n_edges)."""
+    return LogBinning(start, ratio, n_edges)
+
+
+def uncertainty_distributions(cutoff, beta, beta_error, cutoff_error):
+    """
+    Normal distributions for cutoff and beta used in the mLS uncertainty.
+    
+    As in mLS.m, the mean and standard deviation are those of 500 evenly
+    spaced values across each error interval, with the cutoff interval
+    clipped at the smallest bin edge (2 m²).
+    
+    Returns:
+    --------
+    cutoff_mean, cutoff_std, beta_mean, beta_std : float
+    """
+    beta_interval = (beta - beta_error, beta + beta_error)
+    cutoff_interval = (max(cutoff - cutoff_error, 2), cutoff + cutoff_error)
+    
+    return (_linspace_mean(*cutoff_interval), _linspace_std(*cutoff_interval),
+            _linspace_mean(*beta_interval), _linspace_std(*beta_interval))
+
+
+def _linspace_mean(start, stop):
+    """Mean of np.linspace(start, stop, 500)."""
+    return (start + stop) / 2
+
+
+def _linspace_std(start, stop, num=500):
+    """Standard deviation of np.linspace(start, stop, num), in closed form."""
+    return abs(stop - start) / (num - 1) * np.sqrt((num ** 2 - 1) / 12)
+
+
+def mls_samples(cutoff_sim, beta_sim, max_area, midy):
     """
-    Calculate landslide-event magnitude (mLS).
+    Evaluate mLS for arrays of simulated cutoff and beta values.
+    
+    The frequency density at the midpoint (midy) is held at its observed
+    value while midx and the reference constant follow the simulated
+    parameters, exactly as in the Monte Carlo loop of mLS.m.
+    
+    Parameters:
+    -----------
+    cutoff_sim : ndarray
+        Simulated cutoff values
+    beta_sim : ndarray
+        Simulated (negative) beta values
+    max_area : float
+        Largest landslide area of the inventory
+    midy : float
+        Observed frequency density at the midpoint
+        
+    Returns:
+    --------
+    mls_sim : ndarray
+        mLS for every sample (non-finite where the sample is invalid)
+    """
+    dtype = np.result_type(cutoff_sim, beta_sim)
+    max_area = dtype.type(max_area)
+    midy = dtype.type(midy)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        midx_sim = 10 ** ((np.log10(max_area) + np.log10(cutoff_sim)) / 2)
+        ac_sim = dtype.type(REF_MIDY) / (REF_COUNT * (dtype.type(REF_MIDX) ** beta_sim))
+        return np.log10(midy / (ac_sim * (midx_sim ** beta_sim)))
+
+
+def monte_carlo_mls_error(max_area, midy, cutoff, beta, beta_error, cutoff_error,
+                          n_samples=10000, seed=None, dtype=np.float64):
+    """
+    Monte Carlo estimate of the uncertainty in mLS.
+    
+    All (cutoff, beta) pairs are drawn at once from a single
+    numpy.random.Generator and mLS is evaluated as one vector expression.
     
     Parameters:
     -----------
-    area : array-like
+    max_area : float
+        Largest landslide area of the inventory
+    midy : float
+        Observed frequency density at the midpoint
+    cutoff : float
+        Cutoff value (in square meters)
+    beta : float
+        Power-law exponent (negative)
+    beta_error : float
+        Uncertainty in beta value
+    cutoff_error : float
+        Uncertainty in cutoff value
+    n_samples : int, optional
+        Number of Monte Carlo draws
+    seed : int or numpy.random.Generator, optional
+        Seed for the draws (random if None)
+    dtype : numpy dtype, optional
+        np.float64 (default) or np.float32
+        
+    Returns:
+    --------
+    error : float
+        Standard deviation of the finite simulated mLS values
+    """
+    rng = np.random.default_rng(seed)
+    distributions = uncertainty_distributions(cutoff, beta, beta_error, cutoff_error)
+    mls_sim = _draw_mls_samples(rng, n_samples, distributions, max_area, midy, dtype)
+    
+    return np.std(mls_sim, dtype=np.float64)
+
+
+def adaptive_monte_carlo_mls_error(max_area, midy, cutoff, beta, beta_error, cutoff_error,
+                                   tolerance=1e-3, time_budget=None, block_size=1000,
+                                   min_samples=2000, max_samples=1000000,
+                                   seed=None, dtype=np.float64, progress=None):
+    """
+    Monte Carlo estimate of the uncertainty in mLS that stops once converged.
+    
+    Samples are drawn in blocks and merged into running mean/variance
+    accumulators (Chan et al. parallel form of Welford's algorithm).
+    Sampling stops when the standard error of the estimated standard
+    deviation, sigma / sqrt(2 (n - 1)), drops below the tolerance, when the
+    wall-clock budget is spent, or when max_samples is reached.
+    
+    Parameters:
+    -----------
+    max_area, midy, cutoff, beta, beta_error, cutoff_error :
+        As for monte_carlo_mls_error
+    tolerance : float, optional
+        Target standard error of the mLS uncertainty (in mLS units)
+    time_budget : float, optional
+        Wall-clock limit in seconds (no limit if None)
+    block_size : int, optional
+        Number of draws per block
+    min_samples : int, optional
+        Draws made before convergence is first checked
+    max_samples : int, optional
+        Hard limit on the number of draws
+    seed : int or numpy.random.Generator, optional
+        Seed for the draws (random if None)
+    dtype : numpy dtype, optional
+        np.float64 (default) or np.float32
+    progress : callable, optional
+        Called as progress('uncertainty', n_drawn, max_samples) after each
+        block
+        
+    Returns:
+    --------
+    result : dict
+        'error' (standard deviation of mLS), 'standard_error',
+        'n_samples' (finite samples used), 'converged' and 'elapsed' (s)
+    """
+    start = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    distributions = uncertainty_distributions(cutoff, beta, beta_error, cutoff_error)
+    
+    n = 0
+    n_drawn = 0
+    mean = 0.0
+    m2 = 0.0
+    standard_error = np.inf
+    converged = False
+    
+    while n_drawn < max_samples:
+        size = min(block_size, max_samples - n_drawn)
+        block = _draw_mls_samples(rng, size, distributions, max_area, midy, dtype)
+        n_drawn += size
+        
+        if len(block) > 0:
+            block = block.astype(np.float64)
+            n_block = len(block)
+            mean_block = np.mean(block)
+            m2_block = np.sum((block - mean_block) ** 2)
+            
+            total = n + n_block
+            delta = mean_block - mean
+            mean += delta * n_block / total
+            m2 += m2_block + delta ** 2 * n * n_block / total
+            n = total
+        
+        if progress is not None:
+            progress('uncertainty', n_drawn, max_samples)
+        
+        if n > 1:
+            standard_error = np.sqrt(m2 / n) / np.sqrt(2 * (n - 1))
+            if n_drawn >= min_samples and standard_error <= tolerance:
+                converged = True
+                break
+        
+        if time_budget is not None and time.perf_counter() - start >= time_budget:
+            break
+    
+    return {
+        'error': float(np.sqrt(m2 / n)) if n > 0 else np.nan,
+        'standard_error': float(standard_error),
+        'n_samples': n,
+        'converged': converged,
+        'elapsed': time.perf_counter() - start,
+    }
+
+
+def delta_mls_error(max_area, cutoff, beta, beta_error, cutoff_error):
+    """
+    Closed-form (delta-method) estimate of the uncertainty in mLS.
+    
+    With midy held at its observed value, the simulated mLS reduces to
+    
+        mLS = K + beta * h(cutoff),
+        h(c) = log10(ref_midx) - (log10(max_area) + log10(c)) / 2
+    
+    so it is linear in beta and only log10(cutoff) needs expanding. Its
+    mean and variance are taken to second order in r = sd_c / mu_c,
+    
+        E[ln c] = ln mu_c - r^2 / 2,    Var[ln c] = r^2 + 5 r^4 / 2,
+    
+    and, for independent beta and h, the variance of the product is exact
+    given those moments:
+    
+        Var = mu_b^2 sd_h^2 + mu_h^2 sd_b^2 + sd_b^2 sd_h^2
+    
+    Parameters:
+    -----------
+    max_area : float
+        Largest landslide area of the inventory
+    cutoff, beta, beta_error, cutoff_error : float
+        As for monte_carlo_mls_error
+        
+    Returns:
+    --------
+    error : float
+        Standard deviation of mLS
+    """
+    cutoff_mean, cutoff_std, beta_mean, beta_std = uncertainty_distributions(
+        cutoff, beta, beta_error, cutoff_error
+    )
+    
+    r2 = (cutoff_std / cutoff_mean) ** 2
+    log_cutoff_mean = (np.log(cutoff_mean) - r2 / 2) / np.log(10)
+    log_cutoff_std = np.sqrt(r2 + 2.5 * r2 ** 2) / np.log(10)
+    
+    h_mean = np.log10(REF_MIDX) - (np.log10(max_area) + log_cutoff_mean) / 2
+    h_std = log_cutoff_std / 2
+    
+    variance = (beta_mean ** 2 * h_std ** 2 + h_mean ** 2 * beta_std ** 2
+                + beta_std ** 2 * h_std ** 2)
+    return float(np.sqrt(variance))
+
+
+def sobol_mls_error(max_area, midy, cutoff, beta, beta_error, cutoff_error,
+                    n_samples=512, seed=None):
+    """
+    Quasi-Monte Carlo estimate of the uncertainty in mLS.
+    
+    A scrambled Sobol sequence in two dimensions is mapped through the
+    normal inverse CDF, giving a few hundred low-discrepancy (cutoff, beta)
+    pairs in place of thousands of pseudo-random ones.
+    
+    Parameters:
+    -----------
+    max_area, midy, cutoff, beta, beta_error, cutoff_error :
+        As for monte_carlo_mls_error
+    n_samples : int, optional
+        Number of points, rounded up to a power of two
+    seed : int or numpy.random.Generator, optional
+        Seed for the scrambling (random if None)
+        
+    Returns:
+    --------
+    error : float
+        Standard deviation of the finite simulated mLS values
+    """
+    cutoff_mean, cutoff_std, beta_mean, beta_std = uncertainty_distributions(
+        cutoff, beta, beta_error, cutoff_error
+    )
+    
+    m = int(np.ceil(np.log2(max(n_samples, 2))))
+    points = qmc.Sobol(d=2, scramble=True, seed=seed).random_base2(m)
+    z = ndtri(points)
+    
+    cutoff_sim = cutoff_mean + cutoff_std * z[:, 0]
+    beta_sim = beta_mean + beta_std * z[:, 1]
+    
+    mls_sim = mls_samples(cutoff_sim, beta_sim, max_area, midy)
+    return float(np.std(mls_sim[np.isfinite(mls_sim)]))
+
+
+def mls_uncertainty(max_area, midy, cutoff, beta, beta_error, cutoff_error,
+                    method='montecarlo', n_samples=None, seed=None, dtype=np.float64,
+                    tolerance=None, time_budget=None, progress=None):
+    """
+    Estimate the uncertainty in mLS with the requested method.
+    
+    Parameters:
+    -----------
+    max_area, midy, cutoff, beta, beta_error, cutoff_error :
+        As for monte_carlo_mls_error
+    method : str, optional
+        'montecarlo' (default): pseudo-random sampling, as in mLS.m
+        'delta': closed-form error propagation
+        'sobol': quasi-random sampling
+    n_samples : int, optional
+        Number of draws (10,000 for 'montecarlo', 512 for 'sobol' if None)
+    seed : int or numpy.random.Generator, optional
+        Seed for the sampling methods
+    dtype : numpy dtype, optional
+        Precision of the Monte Carlo samples
+    tolerance, time_budget : float, optional
+        Switch 'montecarlo' to adaptive sampling
+        (see adaptive_monte_carlo_mls_error)
+    progress : callable, optional
+        Called as progress('uncertainty', done, total) when the calculation
+        starts and ends (and after each block of adaptive sampling)
+        
+    Returns:
+    --------
+    details : dict
+        'error', 'method', 'n_samples' (samples used, 0 for 'delta'),
+        'converged' (None unless adaptive) and 'elapsed' (s)
+    """
+    start = time.perf_counter()
+    converged = None
+    if progress is not None:
+        progress('uncertainty', 0, 1)
+    
+    if method == 'montecarlo':
+        if tolerance is not None or time_budget is not None:
+            details = adaptive_monte_carlo_mls_error(
+                max_area, midy, cutoff, beta, beta_error, cutoff_error,
+                tolerance=tolerance if tolerance is not None else 0.0,
+                time_budget=time_budget, seed=seed, dtype=dtype, progress=progress
+            )
+            error = details['error']
+            n_samples = details['n_samples']
+            converged = details['converged']
+        else:
+            n_samples = n_samples if n_samples is not None else 10000
+            error = monte_carlo_mls_error(
+                max_area, midy, cutoff, beta, beta_error, cutoff_error,
+                n_samples=n_samples, seed=seed, dtype=dtype
+            )
+    elif method == 'delta':
+        error = delta_mls_error(max_area, cutoff, beta, beta_error, cutoff_error)
+        n_samples = 0
+    elif method == 'sobol':
+        n_samples = n_samples if n_samples is not None else 512
+        n_samples = 2 ** int(np.ceil(np.log2(max(n_samples, 2))))
+        error = sobol_mls_error(
+            max_area, midy, cutoff, beta, beta_error, cutoff_error,
+            n_samples=n_samples, seed=seed
+        )
+    else:
+        raise ValueError(
+            f"Unknown uncertainty method '{method}'. "
+            "Use 'montecarlo', 'delta' or 'sobol'"
+        )
+    if progress is not None:
+        progress('uncertainty', 1, 1)
+    
+    return {
+        'error': float(error),
+        'method': method,
+        'n_samples': int(n_samples),
+        'converged': converged,
+        'elapsed': time.perf_counter() - start,
+    }
+
+
+def _draw_mls_samples(rng, n_samples, distributions, max_area, midy, dtype):
+    """Draw (cutoff, beta) pairs and return the finite simulated mLS values."""
+    cutoff_mean, cutoff_std, beta_mean, beta_std = distributions
+    
+    cutoff_sim = cutoff_mean + cutoff_std * rng.standard_normal(n_samples, dtype=dtype)
+    beta_sim = beta_mean + beta_std * rng.standard_normal(n_samples, dtype=dtype)
+    
+    mls_sim = mls_samples(cutoff_sim, beta_sim, max_area, midy)
+    return mls_sim[np.isfinite(mls_sim)]
+
+
+@dataclass
+class MLSResult:
+    """
+    Plot-free result of an mLS calculation.
+    
+    Attributes:
+    -----------
+    mls : float
+        Landslide-event magnitude
+    error : float or str
+        Uncertainty in mLS (or '?' if not calculated)
+    cutoff : float
+        Cutoff used (in square meters)
+    beta : float
+        Power-law exponent used (negative)
+    max_area : float
+        Largest landslide area of the inventory
+    frequency : ndarray
+        Landslide count in each bin
+    frequency_density : ndarray
+        Frequency density in each bin
+    bin_centers : ndarray
+        Centers of the 119 bins
+    fit_x, fit_y : ndarray
+        Power-law fit evaluated at the bin centers from the cutoff onwards
+    constant : float
+        Power-law constant at x = cutoff
+    midx, midy : float
+        Midpoint of the power-law segment
+    ac : float
+        Reference constant from the Northridge inventory
+    uncertainty : dict or None
+        The mls_uncertainty result (None if no uncertainty was calculated)
+    """
+    mls: float
+    error: object
+    cutoff: float
+    beta: float
+    max_area: float
+    frequency: np.ndarray
+    frequency_density: np.ndarray
+    bin_centers: np.ndarray
+    fit_x: np.ndarray
+    fit_y: np.ndarray
+    constant: float
+    midx: float
+    midy: float
+    ac: float
+    uncertainty: dict = None
+
+
+def compute_mls(area, cutoff, beta, beta_error=None, cutoff_error=None,
+                n_samples=None, seed=None, dtype=np.float64,
+                tolerance=None, time_budget=None, uncertainty_method='montecarlo',
+                binning=None, progress=None):
+    """
+    Calculate landslide-event magnitude (mLS) without plotting.
+    
+    Parameters:
+    -----------
+    area : array-like or AreaInventory
         Landslide areas in square meters
     cutoff : float
         Smallest area that follows power law (in square meters)
@@ -34,123 +596,284 @@ def calculate_mls(area, cutoff, beta, beta_error=None, cutoff_error=None):
         Uncertainty in beta value
     cutoff_error : float, optional
         Uncertainty in cutoff value
+    n_samples : int, optional
+        Number of draws used for the uncertainty
+        (default 10,000 for 'montecarlo', 512 for 'sobol')
+    seed : int or numpy.random.Generator, optional
+        Seed for the uncertainty draws (random if None)
+    dtype : numpy dtype, optional
+        Floating point precision of the Monte Carlo samples
+        (np.float64 or np.float32)
+    tolerance : float, optional
+        If given, sample adaptively until the standard error of the mLS
+        uncertainty is below this value (n_samples is then ignored)
+    time_budget : float, optional
+        Wall-clock limit in seconds for adaptive sampling
+    uncertainty_method : str, optional
+        'montecarlo' (default), 'delta' or 'sobol' (see mls_uncertainty)
+    binning : LogBinning, optional
+        Bins for the frequency density (default: start 2 m², ratio 1.2)
+    progress : callable, optional
+        Called as progress(stage, done, total) during the uncertainty
+        calculation (see mls_uncertainty)
         
     Returns:
     --------
-    mls_value : float
-        Landslide-event magnitude
-    error : float or str
-        Uncertainty in mLS (or '?' if not calculated)
-    plot_base64 : str
-        Base64 encoded plot image
+    result : MLSResult
+        mLS, its uncertainty and the frequency-area distribution
     """
     
-    # Convert area to numpy array
-    area = np.array(area)
-    
-    # Define bins with increasing sizes
-    x1 = np.zeros(120)
-    x1[0] = 2
-    for i in range(1, 120):
-        x1[i] = x1[i-1] * 1.2
+    # Bins with increasing sizes (cached edges, widths and centers)
+    if binning is None:
+        binning = get_binning()
     
     # Calculate frequency for each bin
-    freq = np.histogram(area, bins=x1)[0]
+    if isinstance(area, AreaInventory):
+        # Already sorted: counts come from the positions of the bin edges
+        freq = binning.histogram(area.areas, method='sorted')
+        max_area = area.max_area
+    else:
+        area = np.asarray(area)
+        freq = binning.histogram(area)
+        max_area = np.max(area)
     
-    # Calculate bin intervals
-    internal = np.zeros(len(x1) - 1)
-    for i in range(len(internal)):
-        if i == 0:
-            internal[i] = x1[0]
-        else:
-            internal[i] = x1[i] - x1[i-1]
+    return compute_mls_from_histogram(
+        freq, max_area, cutoff, beta, beta_error, cutoff_error,
+        n_samples=n_samples, seed=seed, dtype=dtype, tolerance=tolerance,
+        time_budget=time_budget, uncertainty_method=uncertainty_method,
+        binning=binning, progress=progress
+    )
+
+
+def compute_mls_from_histogram(freq, max_area, cutoff, beta, beta_error=None,
+                               cutoff_error=None, n_samples=None, seed=None,
+                               dtype=np.float64, tolerance=None, time_budget=None,
+                               uncertainty_method='montecarlo', binning=None, progress=None):
+    """
+    Calculate mLS from binned landslide counts.
+    
+    mLS depends on the inventory only through the bin counts and the
+    largest area, so it can be computed without the raw areas (see
+    HistogramAccumulator).
+    
+    Parameters:
+    -----------
+    freq : array-like
+        Landslide count in each bin of binning
+    max_area : float
+        Largest landslide area of the inventory
+    cutoff, beta, beta_error, cutoff_error, n_samples, seed, dtype,
+    tolerance, time_budget, uncertainty_method, binning, progress :
+        As for compute_mls
+        
+    Returns:
+    --------
+    result : MLSResult
+    """
+    if binning is None:
+        binning = get_binning()
     
     # Calculate frequency density
-    fd = freq / internal
+    freq = np.asarray(freq)
+    fd = binning.frequency_density(freq)
     
     # Use bin centers for x1 (for plotting consistency with MATLAB)
-    x1_centers = np.zeros(len(x1) - 1)
-    for i in range(len(x1_centers)):
-        x1_centers[i] = (x1[i] + x1[i+1]) / 2
-    x1 = x1_centers
+    x1 = binning.centers
     
     # Find index closest to cutoff value
     x1_rev = np.abs(x1 - cutoff)
     index_midpoint = np.argmin(x1_rev)
     
-    # Define x and y arrays for frequency-size distribution
-    x = x1[index_midpoint:]
+    # Define y array for frequency-size distribution
     y = fd[index_midpoint:]
     
     # Beta value must be negative
     if beta > 0:
         beta = -1 * beta
-    beta_stored = beta
     
     # Calculate constant along the power-law where x=cutoff
     constant = y[0] / (cutoff ** beta)
     
-    # Calculate frequency-density values for power-law fit
-    fit_y = constant * (x1 ** beta)
-    fit_y_stored = fit_y.copy()
+    # Power-law fit in the power-law region (from cutoff onwards)
+    fit_x = x1[x1 >= cutoff]
+    fit_y = constant * (fit_x ** beta)
     
     # Calculate midpoint values
-    midx = 10 ** ((np.log10(max(area)) + np.log10(cutoff)) / 2)
+    midx = 10 ** ((np.log10(max_area) + np.log10(cutoff)) / 2)
     midy = constant * (midx ** beta)
     
     # Reference values from Northridge inventory
-    ref_midx = 4.876599623713225e+04
-    ref_midy = 8.364725347860417e-04
-    ac = ref_midy / (11111 * (ref_midx ** beta))
+    ac = REF_MIDY / (REF_COUNT * (REF_MIDX ** beta))
     
     # Calculate mLS
     mls_value = np.log10(midy / (ac * (midx ** beta)))
-    mls_stored = mls_value
     
     # Calculate uncertainty if error parameters provided
     error = '?'
+    details = None
     if beta_error is not None and cutoff_error is not None:
-        # Create arrays of uniformly distributed beta and cutoff values
-        beta_interval = np.linspace(beta_stored - beta_error, 
-                                   beta_stored + beta_error, 500)
-        
-        cutoff_min = max(cutoff - cutoff_error, 2)
-        cutoff_max = cutoff + cutoff_error
-        cutoff_interval = np.linspace(cutoff_min, cutoff_max, 500)
-        
-        beta_mean = np.mean(beta_interval)
-        beta_std = np.std(beta_interval)
-        cutoff_mean = np.mean(cutoff_interval)
-        cutoff_std = np.std(cutoff_interval)
-        
-        # Monte Carlo simulation (10,000 iterations)
-        mls_array = []
-        for _ in range(10000):
-            cutoff_sim = np.random.normal(cutoff_mean, cutoff_std)
-            beta_sim = np.random.normal(beta_mean, beta_std)
+        details = mls_uncertainty(
+            max_area, midy, cutoff, beta, beta_error, cutoff_error,
+            method=uncertainty_method, n_samples=n_samples, seed=seed, dtype=dtype,
+            tolerance=tolerance, time_budget=time_budget, progress=progress
+        )
+        error = details['error']
+    
+    return MLSResult(
+        mls=mls_value,
+        error=error,
+        cutoff=cutoff,
+        beta=beta,
+        max_area=max_area,
+        frequency=freq,
+        frequency_density=fd,
+        bin_centers=x1,
+        fit_x=fit_x,
+        fit_y=fit_y,
+        constant=constant,
+        midx=midx,
+        midy=midy,
+        ac=ac,
+        uncertainty=details,
+    )
+
+
+class HistogramAccumulator:
+    """
+    Running binned summary of a landslide inventory for incremental mLS.
+    
+    Holds only the per-bin counts, the largest area, the number of areas
+    and their sum, so inventories can grow batch by batch (or be split
+    across workers and merged) without keeping the raw area array.
+    
+    Parameters:
+    -----------
+    binning : LogBinning, optional
+        Bins for the frequency density (default: start 2 m², ratio 1.2)
+    """
+    
+    def __init__(self, binning=None):
+        self.binning = binning if binning is not None else get_binning()
+        self.counts = np.zeros(self.binning.n_bins, dtype=np.int64)
+        self.count = 0
+        self.max_area = -np.inf
+        self.total_area = 0.0
+    
+    def add(self, areas):
+        """
+        Add a batch of landslide areas (in square meters); NaN and
+        non-positive areas are dropped, as in AreaInventory.
+        
+        Returns:
+        --------
+        self : HistogramAccumulator
+        """
+        areas = np.asarray(areas, dtype=np.float64).ravel()
+        areas = areas[areas > 0]
+        if len(areas) == 0:
+            return self
+        
+        self.counts += self.binning.histogram(areas)
+        self.count += len(areas)
+        self.max_area = max(self.max_area, float(np.max(areas)))
+        self.total_area += float(np.sum(areas))
+        return self
+    
+    def add_polygons(self, geometries):
+        """
+        Add a batch of polygons in a projected CRS with metre units.
+        
+        Parameters:
+        -----------
+        geometries : array-like of shapely geometries or GeoSeries
+            Landslide polygons
             
-            constant_sim = y[0] / (cutoff_sim ** beta_sim)
-            midx_sim = 10 ** ((np.log10(max(area)) + np.log10(cutoff_sim)) / 2)
-            ac_sim = ref_midy / (11111 * (ref_midx ** beta_sim))
-            mls_sim = np.log10(midy / (ac_sim * (midx_sim ** beta_sim)))
+        Returns:
+        --------
+        self : HistogramAccumulator
+        """
+        import shapely
+        
+        geometries = getattr(geometries, 'values', geometries)
+        return self.add(shapely.area(np.asarray(geometries)))
+    
+    def merge(self, other):
+        """
+        Merge another accumulator (e.g. from a parallel worker) into this one.
+        
+        Returns:
+        --------
+        self : HistogramAccumulator
+        """
+        if not np.array_equal(self.binning.edges, other.binning.edges):
+            raise ValueError("Cannot merge accumulators with different bins")
+        
+        self.counts += other.counts
+        self.count += other.count
+        self.max_area = max(self.max_area, other.max_area)
+        self.total_area += other.total_area
+        return self
+    
+    @property
+    def mean_area(self):
+        """Mean landslide area."""
+        return self.total_area / self.count if self.count else np.nan
+    
+    def compute_mls(self, cutoff, beta, beta_error=None, cutoff_error=None, **kwargs):
+        """
+        Calculate mLS from the accumulated histogram.
+        
+        Parameters:
+        -----------
+        cutoff, beta, beta_error, cutoff_error :
+            As for compute_mls
+        **kwargs :
+            Uncertainty options of compute_mls
             
-            if not np.isinf(mls_sim):
-                mls_array.append(mls_sim)
+        Returns:
+        --------
+        result : MLSResult
+        """
+        if self.count == 0:
+            raise ValueError("No landslide areas have been added")
         
-        error = np.std(mls_array)
+        return compute_mls_from_histogram(
+            self.counts, self.max_area, cutoff, beta, beta_error, cutoff_error,
+            binning=self.binning, **kwargs
+        )
+
+
+def render_mls_plot(result, dpi=150):
+    """
+    Render the frequency-area distribution of an mLS result.
+    
+    Uses the matplotlib Figure API directly, so matplotlib is only
+    imported when a plot is requested and no pyplot global state is touched.
+    
+    Parameters:
+    -----------
+    result : MLSResult
+        Output of compute_mls
+    dpi : int, optional
+        Resolution of the PNG image
+        
+    Returns:
+    --------
+    plot_base64 : str
+        Base64 encoded PNG image
+    """
+    from matplotlib.figure import Figure
     
-    # Create plot
-    fig, ax = plt.subplots(figsize=(6, 5))
+    fig = Figure(figsize=(6, 5))
+    ax = fig.subplots()
     
     # Plot all frequency density points (blue circles)
-    ax.loglog(x1, fd, 'o', markersize=5, markerfacecolor='b', 
-              markeredgecolor='k', label='Observed data density')
+    ax.loglog(result.bin_centers, result.frequency_density, 'o', markersize=5,
+              markerfacecolor='b', markeredgecolor='k', label='Observed data density')
     
     # Plot power-law fit ONLY in the power-law region (from cutoff onwards)
-    # Create x values for the fit line from cutoff to max area
-    x_fit = x1[x1 >= cutoff]
-    y_fit = constant * (x_fit ** beta_stored)
-    ax.loglog(x_fit, y_fit, '-', linewidth=2, color='r', label='Fitted distribution')
+    ax.loglog(result.fit_x, result.fit_y, '-', linewidth=2, color='r',
+              label='Fitted distribution')
     
     ax.set_xlim([1, 1e7])
     ax.set_ylim([1e-6, 1000])
@@ -160,30 +883,77 @@ def calculate_mls(area, cutoff, beta, beta_error=None, cutoff_error=None):
     ax.legend(loc='upper right')
     
     # Add text with beta and mLS values
-    if isinstance(error, str):
-        text_str = f'β = {beta_stored:.2f}\nmLS = {mls_stored:.2f} ± {error}'
+    if isinstance(result.error, str):
+        text_str = f'β = {result.beta:.2f}\nmLS = {result.mls:.2f} ± {result.error}'
     else:
-        text_str = f'β = {beta_stored:.2f}\nmLS = {mls_stored:.2f} ± {error:.2f}'
+        text_str = f'β = {result.beta:.2f}\nmLS = {result.mls:.2f} ± {result.error:.2f}'
     
     # Position text at bottom left
-    fd_nonzero = fd[fd > 0]
+    fd_nonzero = result.frequency_density[result.frequency_density > 0]
     if len(fd_nonzero) > 0:
         y_pos = min(fd_nonzero) * 10
     else:
         y_pos = 1e-5
-    ax.text(x1[0], y_pos, text_str, fontsize=12, 
+    ax.text(result.bin_centers[0], y_pos, text_str, fontsize=12,
             bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
     
-    plt.tight_layout()
+    fig.tight_layout()
     
     # Convert plot to base64 string
     buffer = io.BytesIO()
-    plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
+    fig.savefig(buffer, format='png', dpi=dpi, bbox_inches='tight')
     buffer.seek(0)
-    plot_base64 = base64.b64encode(buffer.read()).decode()
-    plt.close()
+    return base64.b64encode(buffer.read()).decode()
+
+
+def calculate_mls(area, cutoff, beta, beta_error=None, cutoff_error=None,
+                  n_samples=None, seed=None, dtype=np.float64,
+                  tolerance=None, time_budget=None, return_details=False,
+                  uncertainty_method='montecarlo', binning=None, progress=None):
+    """
+    Calculate landslide-event magnitude (mLS) and plot the distribution.
+    
+    Thin wrapper around compute_mls and render_mls_plot; callers that only
+    need the numbers should use compute_mls directly.
+    
+    Parameters:
+    -----------
+    area, cutoff, beta, beta_error, cutoff_error, n_samples, seed, dtype,
+    tolerance, time_budget, uncertainty_method, binning :
+        As for compute_mls
+    progress : callable, optional
+        Called as progress(stage, done, total) for the 'uncertainty' and
+        'render' stages
+    return_details : bool, optional
+        Also return a dict describing the uncertainty calculation
+        
+    Returns:
+    --------
+    mls_value : float
+        Landslide-event magnitude
+    error : float or str
+        Uncertainty in mLS (or '?' if not calculated)
+    plot_base64 : str
+        Base64 encoded plot image
+    details : dict
+        Only if return_details is True: the mls_uncertainty result
+        (None if no uncertainty was calculated)
+    """
+    result = compute_mls(
+        area, cutoff, beta, beta_error, cutoff_error,
+        n_samples=n_samples, seed=seed, dtype=dtype, tolerance=tolerance,
+        time_budget=time_budget, uncertainty_method=uncertainty_method,
+        binning=binning, progress=progress
+    )
+    if progress is not None:
+        progress('render', 0, 1)
+    plot_base64 = render_mls_plot(result)
+    if progress is not None:
+        progress('render', 1, 1)
     
-    return mls_stored, error, plot_base64
+    if return_details:
+        return result.mls, result.error, plot_base64, result.uncertainty
+    return result.mls, result.error, plot_base64
 
 
 if __name__ == "__main__":
@@ -0,0 +1,307 @@
+"""
+Analysis pipeline of the web application, independent of Flask.
+
+Reads the areas of one layer, estimates the power-law parameters unless
+they are given, and computes mLS with its plot, reusing every stage held
+in the content-addressed ResultCache. Notes for the user are collected in
+a list instead of being flashed, so the pipeline runs the same inside a
+request or as a job in a worker process (see job_queue).
+"""
+
+import dataclasses
+import hashlib
+import shutil
+import time
+
+import numpy as np
+
+from area_inventory import AreaInventory
+from layer_cache import compute_layer, load_layer, read_layer_areas
+from mls_calculator import calculate_mls, compute_mls, render_mls_plot
+from powerlaw_estimator import estimate_powerlaw_parameters, goodness_of_fit
+from result_cache import ResultCache
+
+# Estimation and mLS parameters of a run, with their defaults
+PARAMETER_DEFAULTS = {
+    'cutoff': None,
+    'beta': None,
+    'beta_error': None,
+    'cutoff_error': None,
+    'estimation_method': 'auto',
+    'uncertainty_method': 'montecarlo',
+    'n_bootstrap': 0,
+    'goodness_of_fit': False,
+    'plot': True,
+}
+
+# Names of the estimation methods in the messages
+METHOD_NAMES = {
+    'auto': 'automatic',
+    'native': 'native Clauset et al. (2009)',
+    'official': 'Clauset et al. (2009)',
+    'simplified': 'simplified',
+}
+
+
+def areas_key(upload_hash, layer, options):
+    """Cache key of a layer's areas: upload content, layer and read options."""
+    options = {name: value for name, value in options.items() if name != 'workers'}
+    return ResultCache.key('areas', upload_hash, layer, options)
+
+
+def analyse_layer(result_cache, cache_key, load_areas, parameters, messages, progress=None):
+    """
+    Estimate the power-law parameters (unless given) and compute mLS.
+
+    Each stage is looked up in the result cache first: the rendered
+    results by every calculate_mls input, the fit by the estimation
+    settings, and the areas are only loaded (load_areas) if a stage has
+    to run.
+
+    Parameters:
+    -----------
+    result_cache : ResultCache
+        Stage cache
+    cache_key : str
+        Key of the layer's areas (see areas_key)
+    load_areas : callable
+        Returns (areas, feature_count, crs) of the layer (crs None for
+        raw areas)
+    parameters : dict
+        Estimation and mLS parameters (see PARAMETER_DEFAULTS)
+    messages : list
+        (message, category) notes for the user are appended to it
+    progress : callable, optional
+        Called as progress(stage, done, total) by the estimation,
+        goodness-of-fit, uncertainty and plotting stages
+
+    Returns:
+    --------
+    results : dict or None
+        Values for results.html ('plot' is None unless parameters['plot']),
+        or None if the layer has no valid polygons
+    """
+    parameters = dict(PARAMETER_DEFAULTS, **parameters)
+    result_key = ResultCache.key('result', cache_key, parameters)
+    results = result_cache.get('result', result_key)
+    if results is not None:
+        messages.append(('Results reused from an identical earlier run', 'info'))
+        return results
+
+    areas, feature_count, crs = load_areas()
+
+    # Sort once; the estimator and the mLS calculation share the inventory
+    inventory = AreaInventory(areas)
+    if inventory.count == 0:
+        return None
+
+    cutoff, beta = parameters['cutoff'], parameters['beta']
+    beta_error, cutoff_error = parameters['beta_error'], parameters['cutoff_error']
+    estimation_method = parameters['estimation_method']
+    uncertainty_method = parameters['uncertainty_method']
+
+    # If parameters not provided, estimate them
+    method_used = None
+    given = cutoff is not None and beta is not None
+    if cutoff is None or beta is None:
+        fit_key = ResultCache.key('fit', cache_key, estimation_method, parameters['n_bootstrap'])
+        fit = result_cache.get('fit', fit_key)
+        if fit is None:
+            method_name = METHOD_NAMES.get(estimation_method, 'automatic')
+            messages.append((f'Estimating power-law parameters using {method_name} method...',
+                             'info'))
+            fit = estimate_powerlaw_parameters(
+                inventory, method=estimation_method, n_bootstrap=parameters['n_bootstrap'],
+                progress=progress
+            )
+            result_cache.put('fit', fit_key, fit)
+        estimated_cutoff, estimated_beta, est_cutoff_err, est_beta_err, method_used = fit
+        messages.append((f'Parameters estimated using {method_used} method', 'success'))
+
+        if cutoff is None:
+            cutoff = estimated_cutoff
+        if beta is None:
+            beta = estimated_beta
+        if beta_error is None:
+            beta_error = est_beta_err
+        if cutoff_error is None:
+            cutoff_error = est_cutoff_err
+
+    # Optional goodness-of-fit test: a given power law is tested as it is,
+    # an estimated one with Clauset's refit of every synthetic dataset
+    gof = None
+    if parameters['goodness_of_fit']:
+        if given:
+            gof = goodness_of_fit(inventory, progress=progress, xmin=cutoff, alpha=abs(beta))
+        else:
+            gof = goodness_of_fit(inventory, progress=progress)
+
+    # Calculate mLS, rendering the plot only if it is wanted
+    if parameters['plot']:
+        mls_value, error, plot_base64 = calculate_mls(
+            inventory, cutoff, beta, beta_error, cutoff_error,
+            uncertainty_method=uncertainty_method, progress=progress
+        )
+    else:
+        result = compute_mls(inventory, cutoff, beta, beta_error, cutoff_error,
+                             uncertainty_method=uncertainty_method, progress=progress)
+        mls_value, error, plot_base64 = result.mls, result.error, None
+    if not np.isfinite(mls_value) or (error != '?' and not np.isfinite(error)):
+        raise ValueError(f'The mLS is not finite for cutoff {cutoff:g} and beta {beta:g}')
+
+    # Prepare results
+    results = {
+        'mls': float(mls_value),
+        'error': float(error) if isinstance(error, (int, float)) else error,
+        'beta': float(beta),
+        'cutoff': float(cutoff),
+        'beta_error': float(beta_error) if beta_error is not None else None,
+        'cutoff_error': float(cutoff_error) if cutoff_error is not None else None,
+        'estimation_method': method_used,
+        'uncertainty_method': uncertainty_method if error != '?' else None,
+        'goodness_of_fit': gof,
+        'feature_count': int(feature_count),
+        'valid_areas_count': inventory.count,
+        'min_area': inventory.min_area,
+        'max_area': inventory.max_area,
+        'mean_area': inventory.mean_area,
+        'median_area': inventory.median_area,
+        'total_area': inventory.total_area,
+        'crs': str(crs) if crs is not None else None,
+        'plot': plot_base64,
+    }
+    result_cache.put('result', result_key, results)
+    return results
+
+
+def run_layer(result_cache, cache_key, path, options, parameters, layer_cache_dir=None,
+              layer_index=None, cleanup_dir=None, messages=None, progress=None):
+    """
+    Full analysis of one layer, as a job (see job_queue.JobQueue.submit).
+
+    Parameters:
+    -----------
+    result_cache : ResultCache
+        Stage cache
+    cache_key : str
+        Key of the layer's areas (see areas_key)
+    path : str
+        Layer path (a file or a /vsizip/ path)
+    options : dict
+        Keyword arguments of area_reader.read_areas
+    parameters : dict
+        Estimation and mLS parameters (see PARAMETER_DEFAULTS)
+    layer_cache_dir, layer_index : optional
+        Entry of the layer precomputed at upload (see layer_cache)
+    cleanup_dir : str, optional
+        Directory deleted once the analysis is over (the upload)
+    messages : list, optional
+        (message, category) notes for the user are appended to it
+    progress : callable, optional
+        Called as progress(stage, done, total) by every stage that runs
+        ('read', 'estimate', 'bootstrap', 'goodness_of_fit', 'uncertainty',
+        'render')
+
+    Returns:
+    --------
+    results : dict
+        Values for results.html, plus 'timings': seconds spent loading the
+        areas ('read'), in the other stages ('analysis') and in total
+    """
+    messages = [] if messages is None else messages
+    start = time.perf_counter()
+    read_seconds = 0.0
+
+    def load_areas():
+        nonlocal read_seconds
+        read_start = time.perf_counter()
+        if layer_cache_dir is not None:
+            areas, meta = load_layer(layer_cache_dir, layer_index, options)
+            if areas is None:
+                meta = compute_layer(path, layer_cache_dir, layer_index, options, result_cache,
+                                     cache_key, progress)
+                if 'error' in meta:
+                    raise ValueError(meta['error'])
+                areas, meta = load_layer(layer_cache_dir, layer_index, options)
+        else:
+            areas, meta = read_layer_areas(path, options, result_cache, cache_key, progress)
+        messages.extend(meta['messages'])
+        read_seconds = time.perf_counter() - read_start
+        return areas, meta['feature_count'], meta['crs']
+
+    try:
+        results = analyse_layer(result_cache, cache_key, load_areas, parameters, messages,
+                                progress)
+    finally:
+        if cleanup_dir is not None:
+            shutil.rmtree(cleanup_dir, ignore_errors=True)
+    if results is None:
+        raise ValueError('No valid polygons found in shapefile')
+    total_seconds = time.perf_counter() - start
+    return dict(results, timings={'read': read_seconds, 'analysis': total_seconds - read_seconds,
+                                  'total': total_seconds})
+
+
+def run_areas(result_cache, areas, parameters, messages=None, progress=None):
+    """
+    Analysis of a raw array of areas (m²), cached by the bytes of the array.
+
+    Parameters:
+    -----------
+    result_cache : ResultCache
+        Stage cache
+    areas : array-like
+        Landslide areas in square meters; NaN and non-positive areas are
+        dropped
+    parameters : dict
+        Estimation and mLS parameters (see PARAMETER_DEFAULTS)
+    messages : list, optional
+        (message, category) notes for the user are appended to it
+    progress : callable, optional
+        As for run_layer
+
+    Returns:
+    --------
+    results : dict
+        As for run_layer, with 'crs' None
+    """
+    messages = [] if messages is None else messages
+    try:
+        areas = np.asarray(areas, dtype=np.float64)
+    except (TypeError, ValueError):
+        raise ValueError('Areas must be a list of numbers')
+    if areas.ndim != 1:
+        raise ValueError('Areas must be a flat list of numbers')
+    if np.isinf(areas).any():
+        raise ValueError('Areas must be finite')
+
+    cache_key = ResultCache.key('areas-array', hashlib.sha256(areas.tobytes()).hexdigest())
+    results = analyse_layer(result_cache, cache_key, lambda: (areas, len(areas), None),
+                            parameters, messages, progress)
+    if results is None:
+        raise ValueError('No positive areas given')
+    return results
+
+
+def plot_results(areas, results):
+    """
+    Plot of finished results, rendered on demand.
+
+    mLS follows from the areas and the fitted cutoff and beta, so only the
+    frequency-area distribution is recomputed; the uncertainty shown is
+    the one of the results, not a new Monte Carlo draw.
+
+    Parameters:
+    -----------
+    areas : array-like
+        Landslide areas of the layer
+    results : dict
+        Results of analyse_layer, run_layer or run_areas
+
+    Returns:
+    --------
+    plot_base64 : str
+        Base64 encoded PNG image
+    """
+    result = compute_mls(AreaInventory(areas), results['cutoff'], results['beta'])
+    return render_mls_plot(dataclasses.replace(result, error=results['error']))
@@ -2,22 +2,394 @@
 Power-law parameter estimation for landslide frequency-area distributions.
 
 This module provides functionality to estimate cutoff and beta parameters
-using the official powerlaw package (Clauset et al. 2009 implementation)
-with a simplified fallback method.
+using a built-in Clauset et al. (2009) fitter, the official powerlaw package
+(optional) or a simplified method.
 """
 
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
 import numpy as np
 from scipy import stats
 from scipy.optimize import minimize_scalar
 
+from area_inventory import AreaInventory, as_inventory
+
 # Try to import the official powerlaw package
 try:
     import powerlaw
     POWERLAW_AVAILABLE = True
 except ImportError:
     POWERLAW_AVAILABLE = False
-    print("Warning: 'powerlaw' package not installed. Using simplified estimation method.")
-    print("For more accurate results, install it with: pip install powerlaw")
+
+
+def _tail_statistics(areas):
+    """
+    Sorted positive areas with their logarithms and suffix sums of logs.
+    
+    Taken from the AreaInventory (built first if areas is an array).
+    
+    Returns:
+    --------
+    x : ndarray
+        Sorted positive areas
+    log_x : ndarray
+        Natural logarithm of x
+    suffix_log_sum : ndarray
+        suffix_log_sum[i] = sum(log_x[i:]), with a trailing 0 (length n + 1)
+    """
+    inventory = as_inventory(areas)
+    return inventory.areas, inventory.log_areas, inventory.suffix_log_sum
+
+
+def _ks_distance(log_tail, log_xmin, alpha, ranks):
+    """
+    Exact KS distance between a sorted tail and a continuous power law.
+    
+    The empirical CDF steps at the data points, so the supremum is found
+    among F(x_k) - k/m and (k+1)/m - F(x_k), with F(x) = 1 - (x/xmin)^(1-alpha).
+    """
+    m = len(log_tail)
+    # e = 1 - F(x_k)
+    e = log_tail - log_xmin
+    e *= 1 - alpha
+    np.exp(e, out=e)
+    
+    # r = k/m + 1 - F(x_k), so F - k/m = 1 - r and (k+1)/m - F = r - 1 + 1/m
+    r = ranks[:m] * (1.0 / m)
+    r += e
+    return max(1 - r.min(), r.max() - 1 + 1.0 / m)
+
+
+def scan_xmin(areas, candidates=None, xmin_range=None, min_tail=50, max_candidates=1000):
+    """
+    Fit a continuous power law above each candidate xmin.
+    
+    The areas are sorted once. The maximum-likelihood exponents of all
+    candidates come at once from suffix sums of the log-areas,
+    
+        alpha = 1 + m / (sum(log(x_i)) - m log(xmin))   over the m areas >= xmin,
+    
+    and the KS distance is evaluated exactly at the data points of the
+    tail. That costs O(m) per candidate, so the scan is O(n) per candidate
+    overall; the default candidate set is capped at max_candidates to keep
+    it linear in the number of areas. For the exact best xmin over every
+    unique area, use fit_clauset, which prunes candidates instead.
+    
+    Parameters:
+    -----------
+    areas : array-like or AreaInventory
+        Landslide areas in square meters
+    candidates : array-like, optional
+        xmin values to try (default: every unique area in xmin_range, or
+        max_candidates of them evenly spaced in rank if there are more)
+    xmin_range : tuple, optional
+        (min, max) range for the default candidates (all areas if None)
+    min_tail : int, optional
+        Candidates with fewer areas above them are skipped (KS is NaN)
+    max_candidates : int, optional
+        Largest number of default candidates (default: 1000); ignored when
+        candidates are given
+        
+    Returns:
+    --------
+    scan : dict
+        'xmin', 'alpha' (positive exponent of the density), 'ks' and
+        'n_tail' arrays over the candidates, and 'best', the index of the
+        smallest KS distance (None if no candidate has enough data)
+    """
+    x, log_x, suffix_log_sum = _tail_statistics(areas)
+    n = len(x)
+    
+    if candidates is None:
+        candidates = np.unique(x)
+        if xmin_range is not None:
+            candidates = candidates[(candidates >= xmin_range[0]) &
+                                    (candidates <= xmin_range[1])]
+        if len(candidates) > max_candidates:
+            candidates = candidates[np.linspace(0, len(candidates) - 1, max_candidates).round()
+                                    .astype(int)]
+    candidates = np.asarray(candidates, dtype=np.float64)
+    
+    start = np.searchsorted(x, candidates, side='left')
+    n_tail = n - start
+    log_candidates = np.log(candidates)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        alpha = 1 + n_tail / (suffix_log_sum[start] - n_tail * log_candidates)
+    
+    ks = np.full(len(candidates), np.nan)
+    ranks = np.arange(n, dtype=np.float64)
+    for j in np.flatnonzero(n_tail >= max(min_tail, 1)):
+        ks[j] = _ks_distance(log_x[start[j]:], log_candidates[j], alpha[j], ranks)
+    
+    fitted = ~np.isnan(ks)
+    alpha[~fitted] = np.nan
+    best = int(np.nanargmin(ks)) if np.any(fitted) else None
+    
+    return {
+        'xmin': candidates,
+        'alpha': alpha,
+        'ks': ks,
+        'n_tail': n_tail,
+        'best': best,
+    }
+
+
+def _clauset_ks_distance(log_tail, tail_ranks, log_xmin, alpha):
+    """
+    KS distance in the Clauset et al. (2009) / powerlaw package convention.
+
+    The empirical CDF of the tail is k/m at its k-th smallest value (tied
+    values share the rank of their first occurrence), and D = max|k/m - F(x_k)|.
+    """
+    m = len(log_tail)
+    # d = F(x_k) - k/m, with F(x) = 1 - (x/xmin)^(1-alpha)
+    d = log_tail - log_xmin
+    d *= 1 - alpha
+    np.exp(d, out=d)
+    np.subtract(1.0, d, out=d)
+    d -= tail_ranks * (1.0 / m)
+    return max(d.max(), -d.min())
+
+
+def _ks_lower_bounds(log_x, first_rank, start, log_candidates, alpha, n_probes,
+                     block_size):
+    """
+    Lower bounds on the Clauset KS distance of each candidate xmin.
+    
+    The distance is a maximum over the tail, so |k/m - F(x_k)| at any
+    single area x_k of the tail bounds it from below. The bounds use
+    n_probes fixed quantiles of the data and are computed for blocks of
+    candidates at once.
+    """
+    n = len(log_x)
+    n_tail = n - start
+    probes = np.unique(np.linspace(0, n - 1, n_probes).astype(np.int64))
+    probe_rank = first_rank[probes]
+    log_probes = log_x[probes]
+    
+    bound = np.empty(len(start))
+    for b in range(0, len(start), block_size):
+        block = slice(b, b + block_size)
+        s = start[block, None]
+        cdf = 1 - np.exp((1 - alpha[block, None]) *
+                         (log_probes[None, :] - log_candidates[block, None]))
+        gap = np.abs((probe_rank[None, :] - s) / n_tail[block, None] - cdf)
+        gap[probes[None, :] < s] = 0
+        bound[block] = gap.max(axis=1)
+    return bound
+
+
+def _search_candidates(log_x, first_rank, start, log_candidates, alpha, valid, index,
+                       n_probes, block_size):
+    """
+    Exact Clauset KS minimum over the candidates in index (ascending).
+    
+    Candidates are evaluated in increasing order of their lower bound until
+    the bound exceeds the best distance found, which gives the same answer
+    as evaluating all of them. Returns (best, best_ks, n_evaluated); best
+    is an index into the candidates.
+    """
+    index = index[valid[index]]
+    bound = _ks_lower_bounds(log_x, first_rank, start[index], log_candidates[index],
+                             alpha[index], n_probes, block_size)
+    
+    best, best_ks = None, np.inf
+    n_evaluated = 0
+    for position in np.argsort(bound, kind='stable'):
+        if bound[position] > best_ks:
+            break
+        j = index[position]
+        ks = _clauset_ks_distance(log_x[start[j]:], first_rank[start[j]:] - start[j],
+                                  log_candidates[j], alpha[j])
+        n_evaluated += 1
+        if ks < best_ks or (ks == best_ks and j < best):
+            best, best_ks = j, ks
+    return best, best_ks, n_evaluated
+
+
+def fit_clauset(areas, xmin_range=None, exact=True, n_subsample=50000, refine_width=5,
+                n_probes=256, block_size=4096):
+    """
+    Continuous power-law fit of Clauset et al. (2009), as done by powerlaw.Fit.
+
+    Candidate xmins, exponents, standard errors and KS distances follow
+    powerlaw.Fit: every unique area in [min, max) of xmin_range except the
+    largest is a candidate, alpha is the maximum-likelihood exponent, fits
+    with alpha outside (0, 3) are rejected, and the xmin with the smallest
+    KS distance wins (ties go to the smaller xmin).
+
+    The areas are sorted once and the exponents of all candidates come from
+    suffix sums of the log-areas. Evaluating the KS distance of a candidate
+    costs O(m) for a tail of m areas, so instead of evaluating all of them,
+    a lower bound on every candidate's distance is computed in vectorized
+    blocks from n_probes fixed quantiles of the data. Candidates are then
+    evaluated exactly in increasing order of their bound until the bound
+    exceeds the best distance found, which gives the same answer as the
+    full scan.
+    
+    With exact=False (for quick previews of very large inventories) the
+    search is coarse-to-fine: a coarse xmin is fitted on a stratified
+    subsample of about n_subsample areas (every k-th sorted area), then
+    refined on the full data over the candidates near it. The result may
+    miss the exact minimum; 'ks_gap' bounds how far its KS distance can be
+    above it, using cheap lower bounds for all candidates.
+
+    Parameters:
+    -----------
+    areas : array-like or AreaInventory
+        Landslide areas in square meters
+    xmin_range : tuple, optional
+        (min, max) range for the candidate xmins (all areas if None)
+    exact : bool, optional
+        Search all candidates (default: True) or run the approximate
+        coarse-to-fine search
+    n_subsample : int, optional
+        Size of the subsample of the approximate search; inventories up to
+        this size are always searched exactly
+    refine_width : int, optional
+        The approximate search refines over the full-data candidates within
+        refine_width subsample spacings of the coarse xmin
+    n_probes : int, optional
+        Number of quantiles used for the lower bounds
+    block_size : int, optional
+        Number of candidates per vectorized lower-bound block
+
+    Returns:
+    --------
+    fit : dict
+        'xmin', 'alpha' (positive exponent of the density), 'sigma'
+        (standard error of alpha, (alpha - 1)/sqrt(n_tail)), 'ks', 'n_tail',
+        'n_candidates', 'n_evaluated' (candidates whose KS distance was
+        computed exactly), 'exact' and 'ks_gap' (upper bound on ks minus
+        the exact minimum; 0 for the exact search). xmin and the fitted
+        values are NaN if there are fewer than 2 candidates.
+    """
+    inventory = as_inventory(areas)
+    x, log_x, suffix_log_sum = _tail_statistics(inventory)
+    n = len(x)
+
+    if xmin_range is None:
+        xmin_range = (x[0], x[-1]) if n else (0, 0)
+    lo, hi = min(xmin_range), max(xmin_range)
+    candidates = np.unique(x[(x >= lo) & (x < hi)])[:-1]
+
+    fit = {
+        'xmin': np.nan, 'alpha': np.nan, 'sigma': np.nan, 'ks': np.nan,
+        'n_tail': 0, 'n_candidates': len(candidates), 'n_evaluated': 0,
+        'exact': exact, 'ks_gap': np.nan,
+    }
+    if len(candidates) < 2:
+        return fit
+
+    # Rank of the first occurrence of each area, so ties share a CDF step
+    first_rank = inventory.first_index
+
+    start = np.searchsorted(x, candidates, side='left')
+    n_tail = n - start
+    log_candidates = np.log(candidates)
+    alpha = 1 + n_tail / (suffix_log_sum[start] - n_tail * log_candidates)
+
+    # Only fits with alpha inside the default powerlaw range compete; if
+    # none does, powerlaw.Fit falls back to the plain minimum
+    valid = (alpha > 0) & (alpha < 3)
+    if not valid.any():
+        valid[:] = True
+
+    search = (log_x, first_rank, start, log_candidates, alpha, valid)
+    step = int(np.ceil(n / n_subsample))
+    if exact or step <= 1:
+        best, best_ks, n_evaluated = _search_candidates(
+            *search, np.arange(len(candidates)), n_probes, block_size
+        )
+        ks_gap = 0.0
+    else:
+        # Coarse xmin from an evenly spaced (stratified) subsample of the
+        # sorted areas, which covers the log-area range like the data
+        coarse = fit_clauset(AreaInventory(x[::step], assume_sorted=True), xmin_range,
+                             exact=True, n_probes=n_probes, block_size=block_size)
+        if np.isnan(coarse['xmin']):
+            return fit_clauset(inventory, xmin_range, exact=True, n_probes=n_probes,
+                               block_size=block_size)
+        
+        # Refine on the full data over the candidates within refine_width
+        # subsample spacings of the coarse xmin
+        position = np.searchsorted(candidates, coarse['xmin'])
+        width = refine_width * step
+        neighbourhood = np.arange(max(position - width, 0),
+                                  min(position + width + 1, len(candidates)))
+        if not valid[neighbourhood].any():
+            neighbourhood = np.arange(len(candidates))
+        best, best_ks, n_evaluated = _search_candidates(*search, neighbourhood,
+                                                        n_probes, block_size)
+        
+        # Certified gap to the exact minimum from cheap bounds on all candidates
+        bound = _ks_lower_bounds(log_x, first_rank, start[valid], log_candidates[valid],
+                                 alpha[valid], 32, block_size)
+        ks_gap = max(0.0, float(best_ks - bound.min()))
+
+    fit.update({
+        'xmin': float(candidates[best]),
+        'alpha': float(alpha[best]),
+        'sigma': float((alpha[best] - 1) / np.sqrt(n_tail[best])),
+        'ks': float(best_ks),
+        'n_tail': int(n_tail[best]),
+        'n_evaluated': n_evaluated,
+        'ks_gap': ks_gap,
+    })
+    return fit
+
+
+def estimate_powerlaw_parameters_native(areas, xmin_range=None, exact=True):
+    """
+    Estimate power-law parameters with the built-in Clauset et al. (2009) fitter.
+
+    Gives the same cutoff, exponent and standard error as the official
+    powerlaw package (see fit_clauset) without depending on it.
+
+    Parameters:
+    -----------
+    areas : array-like or AreaInventory
+        Landslide areas in square meters
+    xmin_range : tuple, optional
+        (min, max) range for cutoff search
+    exact : bool, optional
+        If False, use the approximate coarse-to-fine search of fit_clauset
+        (faster on very large inventories)
+
+    Returns:
+    --------
+    cutoff : float
+        Estimated cutoff value (xmin)
+    beta : float
+        Estimated power-law exponent (negative)
+    cutoff_error : float
+        Estimated error in cutoff
+    beta_error : float
+        Estimated error in beta
+    method : str
+        Method used ('native')
+    """
+    inventory = as_inventory(areas)
+
+    # Same xmin search range as the official method: 5th to 50th percentile
+    if xmin_range is None:
+        xmin_range = (np.percentile(inventory.areas, 5), np.percentile(inventory.areas, 50))
+
+    fit = fit_clauset(inventory, xmin_range, exact=exact)
+    if np.isnan(fit['xmin']):
+        raise ValueError("Not enough distinct areas in the cutoff search range")
+
+    cutoff = fit['xmin']
+    beta = -fit['alpha']
+    beta_error = fit['sigma']
+
+    # Estimate cutoff error (use ~10% as rough estimate)
+    cutoff_error = cutoff * 0.1
+
+    return cutoff, beta, cutoff_error, beta_error, 'native'
 
 
 def estimate_powerlaw_parameters_official(areas, xmin_range=None):
@@ -29,7 +401,7 @@ def estimate_powerlaw_parameters_official(areas, xmin_range=None):
     
     Parameters:
     -----------
-    areas : array-like
+    areas : array-like or AreaInventory
         Landslide areas in square meters
     xmin_range : tuple, optional
         (min, max) range for cutoff search
@@ -47,9 +419,7 @@ def estimate_powerlaw_parameters_official(areas, xmin_range=None):
     method : str
         Method used ('official' or 'simplified')
     """
-    areas = np.array(areas)
-    areas = areas[areas > 0]
-    areas_sorted = np.sort(areas)
+    areas = as_inventory(areas).areas
     
     # Fit power-law using official package
     # Provide xmin search range - from 5th to 50th percentile
@@ -87,11 +457,12 @@ def estimate_powerlaw_parameters_simplified(areas, xmin_range=None):
     Estimate power-law parameters using simplified KS-based method.
     
     This is a faster but less accurate implementation based on
-    Clauset et al. (2009) principles.
+    Clauset et al. (2009) principles: 50 evenly spaced cutoff candidates
+    are evaluated with scan_xmin.
     
     Parameters:
     -----------
-    areas : array-like
+    areas : array-like or AreaInventory
         Landslide areas in square meters
     xmin_range : tuple, optional
         (min, max) range for cutoff search
@@ -110,9 +481,8 @@ def estimate_powerlaw_parameters_simplified(areas, xmin_range=None):
         Method used ('official' or 'simplified')
     """
     
-    areas = np.array(areas)
-    areas = areas[areas > 0]  # Remove zero or negative values
-    areas = np.sort(areas)
+    inventory = as_inventory(areas)  # Positive areas, sorted once
+    areas = inventory.areas
     
     if xmin_range is None:
         # Search between 10th percentile and median
@@ -120,44 +490,15 @@ def estimate_powerlaw_parameters_simplified(areas, xmin_range=None):
     
     best_cutoff = None
     best_beta = None
-    best_ks = float('inf')
     
-    # Try different cutoff values
+    # Try different cutoff values; MLE and exact KS for all of them at once
     cutoff_candidates = np.linspace(xmin_range[0], xmin_range[1], 50)
+    scan = scan_xmin(inventory, candidates=cutoff_candidates, min_tail=50)
     
-    for cutoff in cutoff_candidates:
-        # Filter data above cutoff
-        data = areas[areas >= cutoff]
-        
-        if len(data) < 50:  # Need enough data points
-            continue
-        
-        # Estimate beta using maximum likelihood
-        # For discrete power law: beta = 1 + n / sum(ln(x/xmin))
-        n = len(data)
-        if np.all(data > 0):
-            beta_est = 1 + n / np.sum(np.log(data / cutoff))
-            
-            # Make beta negative (as used in the mLS code)
-            beta_est = -abs(beta_est)
-            
-            # Calculate KS statistic
-            # Generate theoretical CDF
-            x_theory = np.linspace(cutoff, max(data), 1000)
-            # For power law: P(X >= x) = (x/xmin)^(-alpha) where alpha = beta - 1
-            alpha = abs(beta_est) - 1
-            cdf_theory = 1 - (x_theory / cutoff) ** (-alpha)
-            
-            # Empirical CDF
-            empirical_cdf = np.searchsorted(data, x_theory, side='right') / len(data)
-            
-            # KS statistic
-            ks = np.max(np.abs(cdf_theory - empirical_cdf))
-            
-            if ks < best_ks:
-                best_ks = ks
-                best_cutoff = cutoff
-                best_beta = beta_est
+    if scan['best'] is not None:
+        best_cutoff = scan['xmin'][scan['best']]
+        # Make beta negative (as used in the mLS code)
+        best_beta = -abs(scan['alpha'][scan['best']])
     
     # If no good fit found, use simple heuristics
     if best_cutoff is None or best_beta is None:
@@ -167,7 +508,7 @@ def estimate_powerlaw_parameters_simplified(areas, xmin_range=None):
         data = areas[areas >= best_cutoff]
         
         # Create bins
-        bins = np.logspace(np.log10(best_cutoff), np.log10(max(data)), 30)
+        bins = np.logspace(np.log10(best_cutoff), np.log10(np.max(data)), 30)
         hist, bin_edges = np.histogram(data, bins=bins)
         bin_centers = (bin_edges[:-1] + bin_edges[1:]) / 2
         
@@ -184,7 +525,7 @@ def estimate_powerlaw_parameters_simplified(areas, xmin_range=None):
     
     # Estimate errors (simplified approach)
     # In practice, use bootstrap or methods from Clauset et al.
-    data = areas[areas >= best_cutoff]
+    data = inventory.tail(best_cutoff)
     n = len(data)
     
     # Standard error for beta (approximate)
@@ -196,23 +537,333 @@ def estimate_powerlaw_parameters_simplified(areas, xmin_range=None):
     return best_cutoff, best_beta, cutoff_error, beta_error, 'simplified'
 
 
-def estimate_powerlaw_parameters(areas, xmin_range=None, method='auto'):
+# Estimators by method name
+ESTIMATORS = {
+    'native': estimate_powerlaw_parameters_native,
+    'official': estimate_powerlaw_parameters_official,
+    'simplified': estimate_powerlaw_parameters_simplified,
+}
+
+
+# Areas shared with the bootstrap workers; set once per worker process by
+# _init_worker so the array is not pickled with every task
+_WORKER_AREAS = None
+
+
+def _init_worker(areas):
+    """Process pool initializer: keep the areas in the worker."""
+    global _WORKER_AREAS
+    _WORKER_AREAS = areas
+
+
+def _resolve_workers(workers, n_tasks=None):
+    """
+    Number of worker processes to use (1 means run in this process).
+
+    None means one per CPU; with n_tasks, never more than the tasks.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, int(workers))
+    return workers if n_tasks is None else max(1, min(workers, n_tasks))
+
+
+@contextmanager
+def _task_runner(areas, workers, n_tasks):
+    """
+    Yield run(function, tasks), which applies function(areas, task) to
+    every task and returns the results in order.
+    
+    With more than one worker the tasks are spread over a process pool
+    whose workers receive the areas once, through the initializer; the
+    pool is kept for every call made inside the with block.
+    """
+    workers = _resolve_workers(workers, n_tasks)
+    if workers == 1:
+        yield lambda function, tasks: [function(areas, task) for task in tasks]
+        return
+    
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(areas,)) as pool:
+        def run(function, tasks):
+            chunksize = max(1, len(tasks) // (4 * workers))
+            return list(pool.map(_call_with_worker_areas, [function] * len(tasks), tasks,
+                                 chunksize=chunksize))
+        yield run
+
+
+def _call_with_worker_areas(function, task):
+    """Run one task against the areas held by this worker."""
+    return function(_WORKER_AREAS, task)
+
+
+def _bootstrap_fit(areas, task):
+    """Refit (cutoff, beta) on one resample drawn with its own seed."""
+    seed, method, xmin_range = task
+    rng = np.random.default_rng(seed)
+    resample = areas[rng.integers(0, len(areas), len(areas))]
+    try:
+        cutoff, beta, _, _, _ = ESTIMATORS[method](resample, xmin_range)
+    except ValueError:
+        return np.nan, np.nan
+    return cutoff, beta
+
+
+def bootstrap_parameters(areas, n_resamples=200, method='native', xmin_range=None,
+                         seed=None, workers=None, progress=None):
+    """
+    Nonparametric bootstrap of the cutoff and beta estimates.
+    
+    Each resample draws len(areas) areas with replacement and repeats the
+    whole fit, including the cutoff search. Resample i uses the i-th child
+    of np.random.SeedSequence(seed), so the results do not depend on the
+    number of workers.
+    
+    Parameters:
+    -----------
+    areas : array-like or AreaInventory
+        Landslide areas in square meters
+    n_resamples : int, optional
+        Number of bootstrap resamples (default: 200)
+    method : str, optional
+        Estimator refitted on each resample ('native', 'simplified' or
+        'official'; default: 'native')
+    xmin_range : tuple, optional
+        (min, max) range for cutoff search (estimator default if None)
+    seed : int, optional
+        Seed for reproducible resamples
+    workers : int, optional
+        Number of worker processes (default: number of CPUs; 1 runs in
+        this process)
+    progress : callable, optional
+        Called as progress('bootstrap', done, n_resamples) as the refits
+        finish (in about 20 steps)
+        
+    Returns:
+    --------
+    bootstrap : dict
+        'cutoff_error' and 'beta_error' (standard deviations over the
+        resamples), 'cutoff' and 'beta' arrays of the refitted values
+        (NaN where a resample could not be fitted) and 'n_resamples'
+    """
+    if method not in ESTIMATORS:
+        raise ValueError(f"Unknown estimation method: {method}")
+    
+    areas = as_inventory(areas).areas
+    
+    seeds = np.random.SeedSequence(seed).spawn(n_resamples)
+    tasks = [(child, method, xmin_range) for child in seeds]
+    # Without progress reporting, all refits are spread over the pool at once
+    step = len(tasks) if progress is None else max(1, -(-len(tasks) // 20))
+    fits = []
+    with _task_runner(areas, workers, len(tasks)) as run:
+        for start in range(0, len(tasks), step):
+            fits.extend(run(_bootstrap_fit, tasks[start:start + step]))
+            if progress is not None:
+                progress('bootstrap', len(fits), n_resamples)
+    fits = np.array(fits, dtype=np.float64).reshape(-1, 2)
+    
+    return {
+        'cutoff_error': float(np.nanstd(fits[:, 0], ddof=1)),
+        'beta_error': float(np.nanstd(fits[:, 1], ddof=1)),
+        'cutoff': fits[:, 0],
+        'beta': fits[:, 1],
+        'n_resamples': n_resamples,
+    }
+
+
+def _fixed_ks(sorted_areas, xmin, alpha):
+    """KS distance between the areas above xmin and a given power law."""
+    log_tail = np.log(sorted_areas[np.searchsorted(sorted_areas, xmin):])
+    if len(log_tail) == 0:
+        return np.inf
+    return _ks_distance(log_tail, np.log(xmin), alpha, np.arange(len(log_tail)))
+
+
+def _synthetic_ks(areas, task):
+    """
+    KS distance of the power law on one semi-parametric synthetic
+    dataset (Clauset et al. 2009, section 4.1).
+    
+    Each synthetic area is, with probability n_tail/n, drawn from the
+    fitted power law above xmin, and otherwise drawn uniformly from the
+    observed areas below xmin. The synthetic dataset is then fitted like
+    the data, cutoff search included, or, if refit is False, compared with
+    the generating power law itself.
+    """
+    seed, xmin, alpha, xmin_range, refit = task
+    rng = np.random.default_rng(seed)
+    
+    n = len(areas)
+    below = areas[:np.searchsorted(areas, xmin)]  # areas are sorted
+    n_tail = rng.binomial(n, 1 - len(below) / n)
+    
+    synthetic = np.empty(n)
+    synthetic[:n_tail] = xmin * (1 - rng.random(n_tail)) ** (-1 / (alpha - 1))
+    if n_tail < n:
+        synthetic[n_tail:] = below[rng.integers(0, len(below), n - n_tail)]
+    
+    if not refit:
+        return _fixed_ks(np.sort(synthetic), xmin, alpha)
+    if xmin_range is None:
+        xmin_range = (np.percentile(synthetic, 5), np.percentile(synthetic, 50))
+    return fit_clauset(synthetic, xmin_range)['ks']
+
+
+def goodness_of_fit(areas, xmin_range=None, significance=0.1, max_synthetic=1000,
+                    batch_size=50, confidence=0.99, early_stop=True, seed=None,
+                    workers=None, progress=None, xmin=None, alpha=None):
+    """
+    Semi-parametric bootstrap p-value of the power-law fit (Clauset et al. 2009).
+    
+    The p-value is the fraction of synthetic datasets, generated from the
+    fitted model and refitted with fit_clauset, whose KS distance is at
+    least the observed one. The power law is plausible if p > significance.
+    
+    If xmin and alpha are given, that power law is tested instead of the
+    fit_clauset one: the data and every synthetic dataset are compared with
+    it as it stands, without refitting. This is only valid for parameters
+    not fitted to the same data; fitted ones need the refit, or the
+    p-value is biased upward.
+    
+    Synthetic datasets are generated in batches of batch_size, spread over
+    worker processes. After each batch a Clopper-Pearson interval at the
+    given confidence level is computed for the p-value, and the test stops
+    as soon as the interval lies entirely above or below the significance
+    threshold. Synthetic dataset i uses the i-th child of
+    np.random.SeedSequence(seed), so the result does not depend on the
+    number of workers.
+    
+    Parameters:
+    -----------
+    areas : array-like or AreaInventory
+        Landslide areas in square meters
+    xmin_range : tuple, optional
+        (min, max) range for cutoff search (5th to 50th percentile if None)
+    significance : float, optional
+        Threshold below which the power law is rejected (default: 0.1)
+    max_synthetic : int, optional
+        Maximum number of synthetic datasets (default: 1000)
+    batch_size : int, optional
+        Synthetic datasets between early-stopping checks (default: 50)
+    confidence : float, optional
+        Confidence level of the early-stopping interval (default: 0.99)
+    early_stop : bool, optional
+        Stop once the interval excludes the threshold (default: True);
+        if False, all max_synthetic datasets are generated
+    seed : int, optional
+        Seed for reproducible synthetic datasets
+    workers : int, optional
+        Number of worker processes (default: number of CPUs; 1 runs in
+        this process)
+    progress : callable, optional
+        Called as progress('goodness_of_fit', n_synthetic, max_synthetic)
+        after each batch
+    xmin : float, optional
+        Cutoff of the power law to test (fitted if None)
+    alpha : float, optional
+        Positive exponent of the power law to test (fitted if None)
+        
+    Returns:
+    --------
+    gof : dict
+        'p_value', 'p_interval' (confidence interval of the p-value),
+        'plausible' (p_value > significance), 'decided' (True if stopped
+        early or the interval excludes the threshold), 'n_synthetic',
+        'significance', the tested power law on the data: 'xmin', 'alpha',
+        'ks', and 'fitted' (False if xmin and alpha were given)
+    """
+    inventory = as_inventory(areas)
+    areas = inventory.areas
+    
+    refit = xmin is None or alpha is None
+    if refit:
+        data_range = xmin_range
+        if data_range is None:
+            data_range = (np.percentile(areas, 5), np.percentile(areas, 50))
+        fit = fit_clauset(inventory, data_range)
+        if np.isnan(fit['xmin']):
+            raise ValueError("Not enough distinct areas in the cutoff search range")
+    else:
+        if not (np.isfinite(xmin) and xmin > 0 and np.isfinite(alpha) and alpha > 1):
+            raise ValueError("xmin must be positive and alpha greater than 1")
+        if xmin > areas[-1]:
+            raise ValueError("No areas above xmin")
+        fit = {'xmin': float(xmin), 'alpha': float(alpha),
+               'ks': float(_fixed_ks(areas, xmin, alpha))}
+    
+    seeds = np.random.SeedSequence(seed).spawn(max_synthetic)
+    tail = (1 - confidence) / 2
+    n_synthetic = n_exceed = 0
+    low, high = 0.0, 1.0
+    
+    with _task_runner(areas, workers, batch_size) as run:
+        while n_synthetic < max_synthetic:
+            batch = seeds[n_synthetic:n_synthetic + batch_size]
+            tasks = [(child, fit['xmin'], fit['alpha'], xmin_range, refit)
+                     for child in batch]
+            distances = np.array(run(_synthetic_ks, tasks))
+            n_exceed += int(np.sum(distances >= fit['ks']))
+            n_synthetic += len(batch)
+            if progress is not None:
+                progress('goodness_of_fit', n_synthetic, max_synthetic)
+            
+            # Clopper-Pearson interval for the p-value
+            low = stats.beta.ppf(tail, n_exceed, n_synthetic - n_exceed + 1) if n_exceed else 0.0
+            high = (stats.beta.ppf(1 - tail, n_exceed + 1, n_synthetic - n_exceed)
+                    if n_exceed < n_synthetic else 1.0)
+            if early_stop and (low > significance or high < significance):
+                break
+    
+    p_value = n_exceed / n_synthetic
+    return {
+        'p_value': p_value,
+        'p_interval': (float(low), float(high)),
+        'plausible': p_value > significance,
+        'decided': bool(low > significance or high < significance),
+        'n_synthetic': n_synthetic,
+        'significance': significance,
+        'xmin': fit['xmin'],
+        'alpha': fit['alpha'],
+        'ks': fit['ks'],
+        'fitted': refit,
+    }
+
+
+def estimate_powerlaw_parameters(areas, xmin_range=None, method='auto', n_bootstrap=0,
+                                 seed=None, workers=None, exact=True, progress=None):
     """
     Estimate power-law parameters (cutoff and beta) for area distribution.
     
-    Automatically uses the official powerlaw package if available,
-    otherwise falls back to simplified method.
+    By default the built-in Clauset et al. (2009) fitter is used, which
+    does not need the powerlaw package.
     
     Parameters:
     -----------
-    areas : array-like
+    areas : array-like or AreaInventory
         Landslide areas in square meters
     xmin_range : tuple, optional
         (min, max) range for cutoff search
     method : str, optional
-        'auto' (default): Use official if available, else simplified
+        'auto' (default): Use the native fitter
+        'native': Built-in Clauset et al. (2009) fitter
         'official': Force use of official powerlaw package
         'simplified': Force use of simplified method
+        Other names raise ValueError
+    n_bootstrap : int, optional
+        If positive, cutoff_error and beta_error are the standard deviations
+        of n_bootstrap bootstrap refits (see bootstrap_parameters) instead of
+        the 10% cutoff rule and the asymptotic beta error
+    seed : int, optional
+        Seed for reproducible bootstrap resamples
+    workers : int, optional
+        Number of worker processes for the bootstrap (default: number of CPUs)
+    exact : bool, optional
+        With the native method, False runs the approximate coarse-to-fine
+        cutoff search (fast previews of very large inventories)
+    progress : callable, optional
+        Called as progress(stage, done, total) when the fit ('estimate')
+        starts and ends, and as the bootstrap refits finish ('bootstrap')
         
     Returns:
     --------
@@ -225,7 +876,7 @@ def estimate_powerlaw_parameters(areas, xmin_range=None, method='auto'):
     beta_error : float
         Estimated error in beta
     method_used : str
-        Method actually used ('official' or 'simplified')
+        Method actually used ('native', 'official' or 'simplified')
     """
     
     if method == 'official' and not POWERLAW_AVAILABLE:
@@ -234,10 +885,34 @@ def estimate_powerlaw_parameters(areas, xmin_range=None, method='auto'):
             "Install it with: pip install powerlaw"
         )
     
-    if method == 'simplified' or (method == 'auto' and not POWERLAW_AVAILABLE):
-        return estimate_powerlaw_parameters_simplified(areas, xmin_range)
+    if method == 'auto':
+        method = 'native'
+    elif method not in ESTIMATORS:
+        raise ValueError(
+            f"Unknown estimation method '{method}'. "
+            "Use 'auto', 'native', 'official' or 'simplified'"
+        )
+    # Sort once; the estimator and the bootstrap share the inventory
+    areas = as_inventory(areas)
+    if progress is not None:
+        progress('estimate', 0, 1)
+    
+    if method == 'native':
+        estimate = estimate_powerlaw_parameters_native(areas, xmin_range, exact=exact)
     else:
-        return estimate_powerlaw_parameters_official(areas, xmin_range)
+        estimate = ESTIMATORS[method](areas, xmin_range)
+    cutoff, beta, cutoff_error, beta_error, method_used = estimate
+    if progress is not None:
+        progress('estimate', 1, 1)
+    
+    if n_bootstrap > 0:
+        bootstrap = bootstrap_parameters(areas, n_bootstrap, method, xmin_range,
+                                         seed=seed, workers=workers, progress=progress)
+        cutoff_error = bootstrap['cutoff_error']
+        beta_error = bootstrap['beta_error']
+    
+    return cutoff, beta, cutoff_error, beta_error, method_used
+
 
 
 if __name__ == "__main__":
@@ -268,6 +943,14 @@ if __name__ == "__main__":
     print(f"  Cutoff: {cutoff_est:.2f} ± {cutoff_err:.2f}")
     print(f"  Beta: {beta_est:.2f} ± {beta_err:.2f}")
     
+    if POWERLAW_AVAILABLE:
+        cutoff_est3, beta_est3, cutoff_err3, beta_err3, method3 = estimate_powerlaw_parameters(
+            synthetic_areas, method='official'
+        )
+        print(f"\nOfficial method:")
+        print(f"  Cutoff: {cutoff_est3:.2f} ± {cutoff_err3:.2f}")
+        print(f"  Beta: {beta_est3:.2f} ± {beta_err3:.2f}")
+    
     # Test simplified method explicitly
     cutoff_est2, beta_est2, cutoff_err2, beta_err2, method2 = estimate_powerlaw_parameters(
         synthetic_areas, method='simplified'
@@ -0,0 +1,210 @@
+"""
+Content-addressed cache of the processing stages of the web application.
+
+Entries are keyed by the SHA-256 of the uploaded bytes plus the
+parameters of each stage, so re-uploading the same inventory with other
+settings reuses every stage whose inputs did not change:
+
+- 'areas': polygon areas of a layer (hash, layer, read options), stored
+  as .npy and memory-mapped on reuse, with a JSON sidecar (feature
+  count, CRS, reader messages)
+- 'fit': estimated power-law parameters (areas key, method, bootstrap)
+- 'result': the rendered results (areas key and every calculate_mls input)
+- 'plot': plots rendered on demand for results computed without one
+
+Entries live in one directory, shared by all processes, and are evicted
+least recently used first once they exceed the disk budget. JSON entries
+are also kept in a per-process LRU under a memory budget.
+"""
+
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+# Bytes read at a time when hashing uploads
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def save_with_sha256(stream, path, chunk_size=HASH_CHUNK_SIZE):
+    """
+    Copy a binary stream to a file, hashing it on the way.
+
+    Returns:
+    --------
+    digest : str
+        Hexadecimal SHA-256 of the bytes written
+    """
+    sha256 = hashlib.sha256()
+    with open(path, 'wb') as handle:
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            sha256.update(chunk)
+            handle.write(chunk)
+    return sha256.hexdigest()
+
+
+def file_sha256(path, chunk_size=HASH_CHUNK_SIZE):
+    """Hexadecimal SHA-256 of a file, read in chunks."""
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def json_default(value):
+    """json.dumps fallback for numpy scalars and arrays."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _write_atomic(path, write):
+    """Write a file through a temporary name, so readers never see it half written."""
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'wb') as handle:
+        write(handle)
+    os.replace(temp_path, path)
+
+
+class ResultCache:
+    """
+    Stage cache on disk with LRU eviction.
+
+    Parameters:
+    -----------
+    root : str
+        Cache directory (created if needed)
+    max_disk_bytes : int, optional
+        Disk budget; least recently used entries are deleted beyond it
+        (default: 1 GB)
+    max_memory_bytes : int, optional
+        Budget of the in-process copy of JSON entries (default: 64 MB)
+    """
+
+    def __init__(self, root, max_disk_bytes=1024 ** 3, max_memory_bytes=64 * 1024 ** 2):
+        self.root = root
+        self.max_disk_bytes = max_disk_bytes
+        self.max_memory_bytes = max_memory_bytes
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        os.makedirs(root, exist_ok=True)
+
+    def __getstate__(self):
+        # Worker processes get the disk cache only
+        state = self.__dict__.copy()
+        state['_memory'], state['_memory_bytes'] = OrderedDict(), 0
+        return state
+
+    @staticmethod
+    def key(*parts):
+        """SHA-256 of the canonical JSON of the key parts."""
+        text = json.dumps(parts, sort_keys=True, default=json_default)
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def _path(self, stage, key, extension):
+        return os.path.join(self.root, f'{stage}-{key}{extension}')
+
+    def _touch(self, *paths):
+        """Mark entries as recently used."""
+        for path in paths:
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+
+    def _remember(self, path, text):
+        """Keep a JSON entry in memory, evicting the oldest beyond the budget."""
+        if path in self._memory:
+            self._memory_bytes -= len(self._memory.pop(path))
+        if len(text) > self.max_memory_bytes:
+            return
+        self._memory[path] = text
+        self._memory_bytes += len(text)
+        while self._memory_bytes > self.max_memory_bytes:
+            _, old = self._memory.popitem(last=False)
+            self._memory_bytes -= len(old)
+
+    def _read_json(self, path):
+        if path in self._memory and os.path.exists(path):
+            self._memory.move_to_end(path)
+            return json.loads(self._memory[path])
+        try:
+            with open(path) as handle:
+                text = handle.read()
+        except OSError:
+            return None
+        self._remember(path, text)
+        return json.loads(text)
+
+    def get(self, stage, key):
+        """JSON value of an entry, or None."""
+        path = self._path(stage, key, '.json')
+        value = self._read_json(path)
+        if value is not None:
+            self._touch(path)
+        return value
+
+    def put(self, stage, key, value):
+        """Store a JSON-serializable value."""
+        path = self._path(stage, key, '.json')
+        text = json.dumps(value, default=json_default)
+        _write_atomic(path, lambda handle: handle.write(text.encode()))
+        self._remember(path, text)
+        self.evict()
+
+    def get_array(self, stage, key):
+        """
+        Memory-mapped array and JSON metadata of an entry, or None.
+
+        Returns:
+        --------
+        entry : tuple or None
+            (array, metadata); the array is read-only and paged in from
+            disk on use
+        """
+        array_path = self._path(stage, key, '.npy')
+        meta_path = self._path(stage, key, '.json')
+        meta = self._read_json(meta_path)
+        if meta is None:
+            return None
+        try:
+            array = np.load(array_path, mmap_mode='r')
+        except OSError:
+            return None
+        self._touch(array_path, meta_path)
+        return array, meta
+
+    def put_array(self, stage, key, array, meta):
+        """Store an array (as .npy) with JSON metadata."""
+        _write_atomic(self._path(stage, key, '.npy'),
+                      lambda handle: np.save(handle, np.asarray(array)))
+        # The metadata is written last: its presence marks a complete entry
+        self.put(stage, key, meta)
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits its disk budget."""
+        entries = []
+        with os.scandir(self.root) as scan:
+            for entry in scan:
+                if entry.is_file() and not entry.name.endswith('.tmp'):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            if path in self._memory:
+                self._memory_bytes -= len(self._memory.pop(path))
+            total -= size
@@ -0,0 +1,75 @@
+"""
+Benchmark the area reader with 1, 2, 4, ... worker processes.
+
+Writes a synthetic inventory of circular polygons with attribute columns
+(projected, and optionally a geographic copy) to a temporary directory,
+then times area_reader.read_areas for each worker count and prints a
+markdown table with the speed-up over one worker.
+
+Usage: python tests/benchmark_area_reader.py [n_polygons] [--geographic]
+                                            [--workers=1,2,4]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import geopandas as gpd
+import shapely
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from area_reader import read_areas  # noqa: E402
+
+
+def write_inventory(path, n_polygons, geographic=False, seed=0):
+    """Write n_polygons circular landslides with power-law radii."""
+    rng = np.random.default_rng(seed)
+    x = rng.uniform(0, 1e6, n_polygons) + 300000
+    y = rng.uniform(0, 1e6, n_polygons) + 4000000
+    radius = 10 * (1 - rng.uniform(size=n_polygons)) ** (-1 / 1.4)
+    geometry = shapely.buffer(shapely.points(x, y), radius, quad_segs=8)
+
+    columns = {f'attr{i}': rng.normal(size=n_polygons) for i in range(5)}
+    gdf = gpd.GeoDataFrame(columns, geometry=geometry, crs=32633)
+    if geographic:
+        gdf = gdf.to_crs(4326)
+    gdf.to_file(path)
+
+
+def main():
+    """Print a markdown table of read_areas timings per worker count."""
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    n_polygons = int(args[0]) if args else 200000
+    geographic = '--geographic' in sys.argv
+
+    path = os.path.join(tempfile.mkdtemp(), 'benchmark.shp')
+    write_inventory(path, n_polygons, geographic)
+
+    worker_counts = [1]
+    while worker_counts[-1] * 2 <= (os.cpu_count() or 1):
+        worker_counts.append(worker_counts[-1] * 2)
+    for arg in sys.argv[1:]:
+        if arg.startswith('--workers='):
+            worker_counts = [int(w) for w in arg.split('=', 1)[1].split(',')]
+
+    print(f"{n_polygons} polygons ({'geographic' if geographic else 'projected'}), "
+          f"{os.cpu_count()} CPUs")
+    print("| Workers | Time | Speed-up |")
+    print("|---|---|---|")
+    reference = None
+    for workers in worker_counts:
+        start = time.perf_counter()
+        areas = read_areas(path, workers=workers)['areas']
+        elapsed = time.perf_counter() - start
+        if reference is None:
+            reference, reference_areas = elapsed, areas
+        assert np.array_equal(areas, reference_areas)
+        print(f"| {workers} | {elapsed:.2f} s | {reference / elapsed:.2f}x |")
+
+
+if __name__ == "__main__":
+    main()
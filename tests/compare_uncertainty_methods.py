@@ -0,0 +1,70 @@
+"""
+Compare the mLS uncertainty methods on the bundled test inventories.
+
+Reference values are Monte Carlo estimates with 1,000,000 draws; the
+results are summarised in docs/UNCERTAINTY_METHODS.md.
+"""
+
+import os
+import sys
+import zipfile
+import tempfile
+
+import scipy.io as sio
+import geopandas as gpd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from mls_calculator import calculate_mls  # noqa: E402
+from powerlaw_estimator import estimate_powerlaw_parameters  # noqa: E402
+
+TESTS_DIR = os.path.join(ROOT, 'tests')
+MATLAB_DIR = os.path.join(ROOT, 'matlab_original')
+
+
+def load_inventories():
+    """Yield (name, areas, cutoff, beta, beta_error, cutoff_error)."""
+    def scalar(name):
+        return float(sio.loadmat(os.path.join(MATLAB_DIR, name + '.mat'))[name].item())
+
+    area = sio.loadmat(os.path.join(MATLAB_DIR, 'sample_data.mat'))['Area'].flatten()
+    yield ('sample_data.mat', area, scalar('cutoff'), scalar('beta'),
+           scalar('beta_error'), scalar('cutoff_error'))
+
+    shapefiles = [os.path.join(TESTS_DIR, 'test_landslides.shp')]
+    extract_dir = tempfile.mkdtemp()
+    with zipfile.ZipFile(os.path.join(TESTS_DIR, 'multiple_landslides.zip')) as zip_ref:
+        zip_ref.extractall(extract_dir)
+    shapefiles += sorted(os.path.join(extract_dir, f)
+                         for f in os.listdir(extract_dir) if f.endswith('.shp'))
+
+    for path in shapefiles:
+        areas = gpd.read_file(path).geometry.area.values
+        areas = areas[areas >= 1]
+        cutoff, beta, cutoff_error, beta_error, _ = estimate_powerlaw_parameters(
+            areas, method='simplified'
+        )
+        yield os.path.basename(path), areas, cutoff, beta, beta_error, cutoff_error
+
+
+def main():
+    """Print a markdown table comparing the uncertainty methods."""
+    methods = ['montecarlo', 'delta', 'sobol']
+
+    print("| Inventory | Reference (10^6 MC) | Method | Error | Relative difference | Time |")
+    print("|---|---|---|---|---|---|")
+    for name, areas, cutoff, beta, beta_error, cutoff_error in load_inventories():
+        reference = calculate_mls(areas, cutoff, beta, beta_error, cutoff_error,
+                                  n_samples=1000000, seed=0)[1]
+        for method in methods:
+            details = calculate_mls(areas, cutoff, beta, beta_error, cutoff_error,
+                                    uncertainty_method=method, seed=1,
+                                    return_details=True)[3]
+            relative = (details['error'] - reference) / reference
+            print(f"| {name} | {reference:.4f} | {method} | {details['error']:.4f} "
+                  f"| {relative:+.2%} | {details['elapsed'] * 1000:.2f} ms |")
+
+
+if __name__ == "__main__":
+    main()
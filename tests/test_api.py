@@ -0,0 +1,160 @@
+"""
+Tests for the JSON API (version 1) of the web application.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Keep the cache, the job database and the uploads of the tests apart
+os.environ.setdefault('MLS_CACHE_DIR', tempfile.mkdtemp())
+os.environ.setdefault('MLS_JOB_DB', os.path.join(tempfile.mkdtemp(), 'jobs.sqlite3'))
+os.environ.setdefault('MLS_UPLOAD_DIR', tempfile.mkdtemp())
+
+from app import app, job_queue  # noqa: E402
+
+TESTS_DIR = os.path.join(ROOT, 'tests')
+
+
+def synthetic_areas(n_samples=2000, seed=0):
+    """Power-law areas above 100 m² with beta = -2.4."""
+    return list(100 * (1 - np.random.default_rng(seed).random(n_samples)) ** (-1 / 1.4))
+
+
+def test_areas():
+    """Raw areas give the results dict, with the plot only on request."""
+    client = app.test_client()
+    response = client.post('/api/v1/mls', json={'areas': synthetic_areas(),
+                                                'estimation_method': 'simplified'})
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['result']['plot'] is None
+    assert data['result']['valid_areas_count'] == 2000
+    assert data['result']['crs'] is None
+    assert data['messages'][-1][0].startswith('Parameters estimated')
+
+    given = {'areas': synthetic_areas(), 'cutoff': 100, 'beta': 2.4, 'beta_error': 0.05,
+             'cutoff_error': 10, 'uncertainty_method': 'delta'}
+    without_plot = client.post('/api/v1/mls', json=given).get_json()['result']
+    with_plot = client.post('/api/v1/mls', json=dict(given, plot=True)).get_json()['result']
+    assert with_plot['plot'] and with_plot['mls'] == without_plot['mls']
+    assert with_plot['beta'] == 2.4
+
+
+def test_invalid_requests():
+    """Bad parameters and inputs are rejected with a JSON error."""
+    client = app.test_client()
+    for body, text in [({'areas': [1, 2], 'cutoff': 'x'}, "'cutoff' must be a number"),
+                       ({'areas': [1, 2], 'uncertainty_method': 'x'}, 'uncertainty_method'),
+                       ({'areas': 'x'}, "'areas' must be a list"),
+                       ({'areas': [-1, 0]}, 'No positive areas'),
+                       ([1, 2], 'Expected a JSON object'),
+                       ({'areas': [1, 2], 'n_bootstrap': True}, "'n_bootstrap' must be an integer"),
+                       ({'areas': [1, 2], 'n_bootstrap': 10 ** 6}, "'n_bootstrap' must be between"),
+                       ({'areas': [1, 2], 'cutoff': 0}, "'cutoff' must be a positive number"),
+                       ({'areas': [1, 2], 'cutoff': -5}, "'cutoff' must be a positive number"),
+                       ({'areas': [1, 2], 'cutoff': float('nan')}, "'cutoff' must be a positive"),
+                       ({'areas': [1, 2], 'beta': 0}, "'beta' must be a non-zero number"),
+                       ({'areas': [1, 2], 'beta_error': -1}, "'beta_error' must be a positive"),
+                       ({'areas': synthetic_areas(), 'cutoff': 1e300}, 'not finite')]:
+        response = client.post('/api/v1/mls', json=body)
+        assert response.status_code == 400
+        assert text in response.get_json()['error']
+
+
+def test_batch():
+    """A batch gives one result or error per inventory, in order."""
+    client = app.test_client()
+    inventories = [{'areas': synthetic_areas(seed=1)},
+                   {'areas': synthetic_areas(seed=2), 'plot': True},
+                   {'areas': []}]
+    response = client.post('/api/v1/mls/batch', json={'estimation_method': 'simplified',
+                                                      'uncertainty_method': 'delta',
+                                                      'inventories': inventories})
+    results = response.get_json()['results']
+    assert len(results) == 3
+    single = client.post('/api/v1/mls', json=dict(inventories[0], estimation_method='simplified',
+                                                  uncertainty_method='delta'))
+    assert results[0]['result'] == single.get_json()['result']
+    assert results[0]['result']['plot'] is None and results[1]['result']['plot']
+    assert 'error' in results[2]
+
+
+def wait_for_job(client, status_url, timeout=120):
+    """State of a job once it is done or failed."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = client.get(status_url).get_json()
+        if job['status'] in ('done', 'failed'):
+            return job
+        time.sleep(0.2)
+    raise AssertionError(f"{status_url} did not finish")
+
+
+def test_long_work_is_queued():
+    """Bootstrap refits run as a job; batches reject them."""
+    client = app.test_client()
+    body = {'areas': synthetic_areas(), 'estimation_method': 'simplified', 'n_bootstrap': 20,
+            'uncertainty_method': 'delta'}
+    response = client.post('/api/v1/mls', json=body)
+    assert response.status_code == 202
+    job = wait_for_job(client, response.headers['Location'])
+    assert job['status'] == 'done', job['error']
+    assert job['result']['valid_areas_count'] == 2000 and job['result']['beta_error'] > 0
+
+    response = client.post('/api/v1/mls/batch', json={'n_bootstrap': 20, 'inventories': []})
+    assert response.status_code == 400
+    assert 'not available in batches' in response.get_json()['error']
+    response = client.post('/api/v1/mls/batch', json={'inventories': [
+        {'areas': synthetic_areas(), 'goodness_of_fit': True}
+    ]})
+    assert 'not available in batches' in response.get_json()['results'][0]['error']
+
+
+def test_upload_job():
+    """Uploads are queued; the job URL returns the result once done."""
+    client = app.test_client()
+    with open(os.path.join(TESTS_DIR, 'multiple_landslides.zip'), 'rb') as handle:
+        response = client.post('/api/v1/mls', data={'inventory': (handle, 'multiple.zip')},
+                               content_type='multipart/form-data')
+    assert response.status_code == 400
+    assert response.get_json()['layers'] == ['landslides_inventory1.shp',
+                                             'landslides_inventory2.shp']
+
+    with open(os.path.join(TESTS_DIR, 'multiple_landslides.zip'), 'rb') as handle:
+        response = client.post('/api/v1/mls', data={
+            'inventory': (handle, 'multiple.zip'), 'layer': 'landslides_inventory2.shp',
+            'estimation_method': 'simplified', 'uncertainty_method': 'delta'
+        }, content_type='multipart/form-data')
+    assert response.status_code == 202
+    job = wait_for_job(client, response.headers['Location'])
+    assert job['status'] == 'done', job['error']
+    assert job['result']['plot'] is None
+    assert job['info']['shapefile_name'] == 'landslides_inventory2.shp'
+    assert client.get('/api/v1/jobs/missing').status_code == 404
+
+
+def main():
+    """Run all tests."""
+    tests = [test_areas, test_invalid_requests, test_batch, test_long_work_is_queued,
+             test_upload_job]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✅ {test.__name__}")
+        except AssertionError:
+            failed += 1
+            print(f"  ❌ {test.__name__}")
+    job_queue.shutdown()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
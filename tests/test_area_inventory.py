@@ -0,0 +1,105 @@
+"""
+Tests for the shared AreaInventory.
+"""
+
+import os
+import sys
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from area_inventory import AreaInventory, as_inventory  # noqa: E402
+from mls_calculator import compute_mls  # noqa: E402
+from powerlaw_estimator import estimate_powerlaw_parameters, fit_clauset  # noqa: E402
+
+
+def synthetic_areas(n_samples=3000, seed=42):
+    """Lognormal body with a power-law tail above 100 m²."""
+    rng = np.random.default_rng(seed)
+    body = rng.lognormal(3, 1, n_samples // 2)
+    tail = 100 * (1 - rng.uniform(0, 1, n_samples - n_samples // 2)) ** (-1 / 1.3)
+    return np.concatenate([body, tail])
+
+
+def test_sorted_and_filtered():
+    """Areas are sorted once; NaN, non-positive and small areas are dropped."""
+    areas = np.array([5.0, -1.0, 0.0, np.nan, 3.0, 0.5, 8.0])
+    inventory = AreaInventory(areas, min_area=1)
+
+    assert np.array_equal(inventory.areas, [3.0, 5.0, 8.0])
+    assert inventory.count == len(inventory) == 3
+    assert inventory.max_area == 8.0 and inventory.min_area == 3.0
+    assert inventory.median_area == 5.0
+    assert np.isnan(areas[3])  # input untouched
+
+
+def test_cached_arrays():
+    """Log-areas, suffix sums and tie ranks match direct computations."""
+    areas = np.round(synthetic_areas(), 0)
+    inventory = AreaInventory(areas)
+    x = np.sort(areas)
+
+    assert np.array_equal(inventory.log_areas, np.log(x))
+    assert np.allclose(inventory.suffix_log_sum[:-1],
+                       [np.sum(np.log(x[i:])) for i in range(len(x))])
+    assert inventory.suffix_log_sum[-1] == 0
+    assert np.array_equal(inventory.first_index, np.searchsorted(x, x, side='left'))
+    assert inventory.log_areas is inventory.log_areas
+    assert inventory.median_area == np.median(areas)
+
+
+def test_read_only_without_copy():
+    """The inventory is read-only, reused and viewable without copying."""
+    x = np.sort(synthetic_areas())
+    inventory = AreaInventory(x, assume_sorted=True)
+
+    assert not inventory.areas.flags.writeable
+    assert x.flags.writeable
+    assert np.shares_memory(inventory.areas, x)
+    assert np.asarray(inventory) is inventory.areas
+    assert as_inventory(inventory) is inventory
+    assert np.shares_memory(inventory.tail(100), x)
+
+
+def test_estimators_accept_inventory():
+    """Estimators give the same parameters for an inventory and an array."""
+    areas = synthetic_areas()
+    inventory = AreaInventory(areas)
+
+    for method in ['native', 'simplified']:
+        assert (estimate_powerlaw_parameters(inventory, method=method)
+                == estimate_powerlaw_parameters(areas, method=method))
+    assert fit_clauset(inventory) == fit_clauset(areas)
+
+
+def test_compute_mls_accepts_inventory():
+    """compute_mls gives the same result for an inventory and an array."""
+    areas = synthetic_areas()
+    from_array = compute_mls(areas, 100, -2.3, 0.05, 10, seed=0)
+    from_inventory = compute_mls(AreaInventory(areas), 100, -2.3, 0.05, 10, seed=0)
+
+    assert np.array_equal(from_array.frequency, from_inventory.frequency)
+    assert from_array.max_area == from_inventory.max_area
+    assert from_array.mls == from_inventory.mls
+    assert from_array.error == from_inventory.error
+
+
+def main():
+    """Run all tests."""
+    tests = [test_sorted_and_filtered, test_cached_arrays, test_read_only_without_copy,
+             test_estimators_accept_inventory, test_compute_mls_accepts_inventory]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✅ {test.__name__}")
+        except AssertionError:
+            failed += 1
+            print(f"  ❌ {test.__name__}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,285 @@
+"""
+Tests for the streaming area reader in area_reader.
+"""
+
+import os
+import sys
+import tempfile
+import zipfile
+
+import numpy as np
+import geopandas as gpd
+import pandas as pd
+import shapely
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from area_reader import (FIONA_AVAILABLE, PYARROW_AVAILABLE, find_zip_shapefiles,  # noqa: E402
+                         read_areas, zip_member_path)
+
+TESTS_DIR = os.path.join(ROOT, 'tests')
+
+
+def legacy_areas(path):
+    """Areas as the web application computed them with a full GeoDataFrame."""
+    gdf = gpd.read_file(path)
+    gdf['geometry'] = gdf['geometry'].buffer(0)
+    if gdf.crs.is_geographic:
+        xmin, ymin, xmax, ymax = gdf.total_bounds
+        zone = int(((xmin + xmax) / 2 + 180) / 6) + 1
+        hemisphere = 'north' if (ymin + ymax) / 2 >= 0 else 'south'
+        gdf = gdf.to_crs(f"+proj=utm +zone={zone} +{hemisphere} +ellps=WGS84 "
+                         f"+datum=WGS84 +units=m +no_defs")
+    areas = gdf.geometry.area.values
+    return areas[areas >= 1], len(gdf), gdf.crs
+
+
+def sample_shapefiles():
+    """The bundled projected inventories plus a geographic copy of one."""
+    temp_dir = tempfile.mkdtemp()
+    with zipfile.ZipFile(os.path.join(TESTS_DIR, 'multiple_landslides.zip')) as zip_ref:
+        zip_ref.extractall(temp_dir)
+
+    geographic = os.path.join(temp_dir, 'geographic.shp')
+    gpd.read_file(os.path.join(TESTS_DIR, 'test_landslides.shp')).to_crs(4326).to_file(geographic)
+
+    return [os.path.join(TESTS_DIR, 'test_landslides.shp'),
+            os.path.join(temp_dir, 'landslides_inventory1.shp'),
+            geographic]
+
+
+def test_matches_geodataframe():
+    """Streamed areas, feature count and CRS equal the full-frame results."""
+    engines = ['pyogrio', 'fiona'] if FIONA_AVAILABLE else ['pyogrio']
+    for path in sample_shapefiles():
+        areas, feature_count, crs = legacy_areas(path)
+        for engine in engines:
+            for chunk_size in [37, 100000]:
+                result = read_areas(path, chunk_size=chunk_size, engine=engine)
+                assert np.array_equal(result['areas'], areas)
+                assert result['feature_count'] == feature_count
+                assert result['crs'] == crs
+
+
+def test_parallel_matches_serial():
+    """Worker processes give exactly the serial areas."""
+    for path in sample_shapefiles():
+        serial = read_areas(path, chunk_size=50)
+        parallel = read_areas(path, chunk_size=50, workers=2)
+        assert np.array_equal(serial['areas'], parallel['areas'])
+        assert serial['crs'] == parallel['crs']
+
+
+def test_geographic_reprojection_message():
+    """Geographic layers report the UTM zone they were projected to."""
+    result = read_areas(sample_shapefiles()[-1])
+    assert result['crs'].is_projected
+    assert result['messages'][0][0].startswith('Shapefile reprojected to UTM Zone')
+
+
+def write_multi_zone(path):
+    """Geographic inventory of 1 ha squares around 45°N in UTM zones 31, 32 and 33."""
+    parts = []
+    for zone in [31, 32, 33]:
+        x = 500000 + 2000 * np.arange(20)
+        squares = shapely.box(x, 4980000, x + 100, 4980100)
+        parts.append(gpd.GeoSeries(squares, crs=32600 + zone).to_crs(4326))
+    gpd.GeoDataFrame(geometry=pd.concat(parts, ignore_index=True), crs=4326).to_file(path)
+
+
+def test_multi_zone_projection():
+    """Per-feature UTM zones and equal-area keep areas right across zones."""
+    path = os.path.join(tempfile.mkdtemp(), 'multi_zone.shp')
+    write_multi_zone(path)
+
+    zones = read_areas(path, projection='utm_zones', chunk_size=25)
+    assert zones['utm_zones'] == ['31N', '32N', '33N']
+    assert zones['crs'] is None
+    assert np.allclose(zones['areas'], 10000, rtol=1e-6)
+    assert zones['messages'][0][0].startswith('Features reprojected to their own UTM zones')
+    parallel = read_areas(path, projection='utm_zones', chunk_size=25, workers=2)
+    assert np.array_equal(zones['areas'], parallel['areas'])
+
+    # UTM areas are scaled by k0² = 0.9992 on the central meridian
+    equal_area = read_areas(path, projection='equal_area')
+    assert np.allclose(equal_area['areas'], 10000 / 0.9996 ** 2, rtol=1e-4)
+
+    # A single zone distorts the features in the neighbouring zones by about 0.6%
+    single = read_areas(path, projection='utm')
+    assert single['utm_zones'] == []
+    assert np.abs(single['areas'] / 10000 - 1).max() > 0.005
+
+
+def write_with_invalid(path):
+    """Copy of the test inventory with three self-intersecting polygons."""
+    gdf = gpd.read_file(os.path.join(TESTS_DIR, 'test_landslides.shp'))
+    for i in [3, 50, 200]:
+        x, y = gdf.geometry.iloc[i].centroid.coords[0]
+        gdf.loc[i, 'geometry'] = shapely.Polygon(
+            [(x, y), (x + 40, y + 40), (x + 40, y), (x, y + 40)]
+        )
+    gdf.to_file(path)
+
+
+def test_repairs_only_invalid():
+    """Invalid polygons are repaired and counted; areas match blanket buffer(0)."""
+    path = os.path.join(tempfile.mkdtemp(), 'invalid.shp')
+    write_with_invalid(path)
+    areas, _, _ = legacy_areas(path)
+
+    result = read_areas(path)
+    assert result['repaired_count'] == 3
+    assert np.array_equal(result['areas'], areas)
+    assert any(message.startswith('Repaired 3') for message, _ in result['messages'])
+
+    always = read_areas(path, repair='always')
+    assert np.array_equal(always['areas'], areas)
+
+    # make_valid keeps both lobes of each bow-tie (2 x 400 m² instead of 400 m²)
+    made_valid = read_areas(path, repair='make_valid')
+    assert made_valid['repaired_count'] == 3
+    assert np.isclose(made_valid['areas'].sum() - areas.sum(), 3 * 400)
+
+
+def test_attribute_areas():
+    """Area attributes are used when they match a sample of the geometries."""
+    path = os.path.join(TESTS_DIR, 'test_landslides.shp')
+    engines = ['pyogrio', 'fiona'] if FIONA_AVAILABLE else ['pyogrio']
+    measured = read_areas(path)
+    for engine in engines:
+        result = read_areas(path, engine=engine, area_field='auto')
+        assert result['area_field'] == 'area_m2'
+        assert np.allclose(result['areas'], measured['areas'], rtol=1e-9)
+
+    # 'id' is not an area: the geometries are measured instead, with a warning
+    result = read_areas(path, area_field='id')
+    assert result['area_field'] is None
+    assert np.array_equal(result['areas'], measured['areas'])
+    assert any(category == 'warning' for _, category in result['messages'])
+
+    # A sample with nothing above min_area verifies nothing
+    unverified = read_areas(path, area_field='area_m2', min_area=measured['areas'].max() * 2)
+    assert unverified['area_field'] is None and len(unverified['areas']) == 0
+
+    trusted = read_areas(path, area_field='id', verify_sample=0)
+    assert trusted['area_field'] == 'id'
+    assert np.array_equal(trusted['areas'], np.arange(1, 500))
+
+    try:
+        read_areas(path, area_field='missing')
+    except ValueError as error:
+        assert 'missing' in str(error)
+    else:
+        assert False, "expected ValueError"
+
+
+def test_reads_inside_zip():
+    """Layers read in place from a ZIP equal the extracted layers."""
+    zip_path = os.path.join(TESTS_DIR, 'multiple_landslides.zip')
+    shp_files = find_zip_shapefiles(zip_path)
+    assert shp_files == ['landslides_inventory1.shp', 'landslides_inventory2.shp']
+
+    temp_dir = tempfile.mkdtemp()
+    with zipfile.ZipFile(zip_path) as zip_ref:
+        zip_ref.extractall(temp_dir)
+    engines = ['pyogrio', 'fiona'] if FIONA_AVAILABLE else ['pyogrio']
+    for member in shp_files:
+        extracted = read_areas(os.path.join(temp_dir, member))
+        for engine in engines:
+            in_zip = read_areas(zip_member_path(zip_path, member), engine=engine)
+            assert np.array_equal(in_zip['areas'], extracted['areas'])
+            assert in_zip['crs'] == extracted['crs']
+
+
+def test_zip_limits():
+    """Archives over the member or uncompressed-size limit are rejected."""
+    zip_path = os.path.join(TESTS_DIR, 'multiple_landslides.zip')
+    for limits, text in [({'max_members': 5}, 'more than the limit of 5'),
+                         ({'max_uncompressed_size': 1024 ** 2 // 10}, 'expands to')]:
+        try:
+            find_zip_shapefiles(zip_path, **limits)
+        except ValueError as error:
+            assert text in str(error)
+        else:
+            assert False, "expected ValueError"
+
+
+def test_other_formats():
+    """GeoPackage, FlatGeobuf and GeoParquet give the shapefile's areas."""
+    shapefile = os.path.join(TESTS_DIR, 'test_landslides.shp')
+    expected = np.sort(read_areas(shapefile)['areas'])
+    gdf = gpd.read_file(shapefile)
+    temp_dir = tempfile.mkdtemp()
+
+    paths = [os.path.join(temp_dir, 'inventory.gpkg'), os.path.join(temp_dir, 'inventory.fgb')]
+    for path in paths:
+        gdf.to_file(path)
+    if PYARROW_AVAILABLE:
+        paths.append(os.path.join(temp_dir, 'inventory.parquet'))
+        gdf.to_parquet(paths[-1])
+        paths.append(os.path.join(temp_dir, 'geographic.parquet'))
+        gdf.to_crs(4326).to_parquet(paths[-1], write_covering_bbox=False)
+
+    for path in paths:
+        # The geographic copy is measured in the UTM zone of its centre, not in 33N
+        rtol = 1e-2 if 'geographic' in path else 1e-9
+        for chunk_size in [37, 100000]:
+            result = read_areas(path, chunk_size=chunk_size)
+            # FlatGeobuf reorders features along its spatial index
+            assert np.allclose(np.sort(result['areas']), expected, rtol=rtol)
+            assert result['crs'].is_projected
+        attribute = read_areas(path, area_field='auto')
+        assert attribute['area_field'] == 'area_m2'
+        assert np.allclose(np.sort(attribute['areas']), expected, rtol=1e-9)
+
+
+def test_missing_crs():
+    """Layers without a CRS are rejected."""
+    temp_dir = tempfile.mkdtemp()
+    path = os.path.join(temp_dir, 'no_crs.shp')
+    gdf = gpd.read_file(os.path.join(TESTS_DIR, 'test_landslides.shp'))
+    gdf.set_crs(None, allow_override=True).to_file(path)
+    try:
+        read_areas(path)
+    except ValueError as error:
+        assert 'coordinate reference system' in str(error)
+    else:
+        assert False, "expected ValueError"
+
+
+def test_progress():
+    """Reading reports the features done after every chunk, serial or parallel."""
+    path = os.path.join(TESTS_DIR, 'test_landslides.shp')
+    for workers in [1, 2]:
+        calls = []
+        result = read_areas(path, chunk_size=100, workers=workers,
+                            progress=lambda *call: calls.append(call))
+        n = result['feature_count']
+        assert calls == [('read', done, n) for done in [0, 100, 200, 300, 400, n]]
+
+    calls = []
+    read_areas(path, area_field='auto', progress=lambda *call: calls.append(call))
+    assert calls == [('read', 0, n), ('read', n, n)]
+
+
+def main():
+    """Run all tests."""
+    tests = [test_matches_geodataframe, test_parallel_matches_serial,
+             test_geographic_reprojection_message, test_multi_zone_projection,
+             test_repairs_only_invalid, test_attribute_areas, test_reads_inside_zip,
+             test_zip_limits, test_other_formats,
+             test_missing_crs, test_progress]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✅ {test.__name__}")
+        except AssertionError:
+            failed += 1
+            print(f"  ❌ {test.__name__}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
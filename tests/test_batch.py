@@ -0,0 +1,133 @@
+"""
+Tests for processing every layer of a multi-layer upload at once.
+"""
+
+import csv
+import io
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Keep the cache, the job database and the uploads of the tests apart
+os.environ.setdefault('MLS_CACHE_DIR', tempfile.mkdtemp())
+os.environ.setdefault('MLS_JOB_DB', os.path.join(tempfile.mkdtemp(), 'jobs.sqlite3'))
+os.environ.setdefault('MLS_UPLOAD_DIR', tempfile.mkdtemp())
+
+import app as app_module  # noqa: E402
+from app import app, job_queue  # noqa: E402
+from mls_calculator import calculate_mls  # noqa: E402
+from pipeline import plot_results  # noqa: E402
+
+TESTS_DIR = os.path.join(ROOT, 'tests')
+LAYERS = ['landslides_inventory1.shp', 'landslides_inventory2.shp']
+
+
+def wait_for_batch(client, batch_id, timeout=120):
+    """Rows of a batch once every job has finished."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        data = client.get(f'/batches/{batch_id}/rows').get_json()
+        if data['complete']:
+            return data['rows']
+        time.sleep(0.2)
+    raise AssertionError(f"batch {batch_id} did not finish")
+
+
+def test_process_all():
+    """Every layer is analysed; the table, CSV and plots match the single-layer flow."""
+    client = app.test_client()
+    with open(os.path.join(TESTS_DIR, 'multiple_landslides.zip'), 'rb') as handle:
+        response = client.post('/upload', data={'shapefile': (handle, 'multiple.zip')},
+                               content_type='multipart/form-data')
+    assert 'Process All 2 Layers' in response.get_data(as_text=True)
+
+    form = {'selected_shapefile': LAYERS[0], 'estimation_method': 'simplified',
+            'uncertainty_method': 'delta'}
+    response = client.post('/process_all', data=form)
+    assert response.status_code == 302
+    batch_id = response.location.rsplit('/', 1)[-1]
+    assert client.get(f'/batches/{batch_id}').status_code == 200
+
+    rows = wait_for_batch(client, batch_id)
+    assert [row['layer'] for row in rows] == LAYERS
+    assert all(row['status'] == 'done' and row['total_seconds'] > 0 for row in rows)
+
+    # Same numbers as selecting the layer on its own
+    response = client.post('/process_selected', data=dict(form, selected_shapefile=LAYERS[1]))
+    job_id = response.location.rsplit('/', 1)[-1]
+    deadline = time.time() + 120
+    while job_queue.store.get(job_id)['status'] not in ('done', 'failed'):
+        assert time.time() < deadline
+        time.sleep(0.2)
+    single = job_queue.store.get(job_id)['result']
+    assert rows[1]['mls'] == single['mls'] and rows[1]['beta'] == single['beta']
+
+    response = client.get(f'/batches/{batch_id}.csv')
+    assert response.mimetype == 'text/csv'
+    table = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert [line['layer'] for line in table] == LAYERS
+    assert float(table[1]['mls']) == rows[1]['mls']
+    assert int(table[0]['valid_areas_count']) == rows[0]['valid_areas_count']
+
+    # Plots are rendered on first request
+    plot = client.get(f"/jobs/{rows[0]['job_id']}/plot.png")
+    assert plot.status_code == 200 and plot.data.startswith(b'\x89PNG')
+    page = client.get(f"/jobs/{rows[0]['job_id']}").get_data(as_text=True)
+    assert f"/jobs/{rows[0]['job_id']}/plot.png" in page and 'base64,"' not in page
+    assert client.get('/batches/missing/rows').status_code == 404
+
+
+def test_upload_lifetime():
+    """Uploads outlive the next upload and expire once unused; finished layers are forgotten."""
+    client = app.test_client()
+    uploads = []
+    for _ in range(2):
+        with open(os.path.join(TESTS_DIR, 'multiple_landslides.zip'), 'rb') as handle:
+            client.post('/upload', data={'shapefile': (handle, 'multiple.zip')},
+                        content_type='multipart/form-data')
+        with client.session_transaction() as session:
+            uploads.append(session['temp_dir'])
+    assert all(os.path.isdir(upload) for upload in uploads)
+
+    deadline = time.time() + 120
+    while app_module._layer_jobs:
+        assert time.time() < deadline
+        time.sleep(0.1)
+
+    expired = time.time() - app.config['UPLOAD_RETENTION_SECONDS'] - 60
+    os.utime(uploads[0], (expired, expired))
+    app_module.sweep_uploads()
+    assert not os.path.exists(uploads[0]) and os.path.isdir(uploads[1])
+
+
+def test_plot_results():
+    """A plot rendered later shows the mLS and uncertainty of the results."""
+    areas = 100 * (1 - np.random.default_rng(0).random(1000)) ** (-1 / 1.4)
+    mls, error, plot = calculate_mls(areas, 100, -2.4, 0.1, 10, uncertainty_method='delta')
+    later = plot_results(areas, {'cutoff': 100, 'beta': -2.4, 'error': error})
+    assert later == plot
+
+
+def main():
+    """Run all tests."""
+    tests = [test_process_all, test_upload_lifetime, test_plot_results]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✅ {test.__name__}")
+        except AssertionError:
+            failed += 1
+            print(f"  ❌ {test.__name__}")
+    job_queue.shutdown()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+"""
+Tests for the local job queue in job_queue and the pipeline it runs.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from job_queue import DONE, FAILED, QUEUED, RUNNING, JobQueue, JobStore, QueueFull  # noqa: E402
+from pipeline import areas_key, run_areas, run_layer  # noqa: E402
+from result_cache import ResultCache  # noqa: E402
+
+TESTS_DIR = os.path.join(ROOT, 'tests')
+
+
+def add(a, b, messages, progress):
+    """Job returning a sum and a note."""
+    progress('add', 0, 1)
+    messages.append(('Added', 'info'))
+    progress('add', 1, 1)
+    return {'sum': np.int64(a + b)}
+
+
+def divide(a, b, messages, progress):
+    """Job failing on division by zero."""
+    messages.append(('Dividing', 'info'))
+    return a / b
+
+
+def wait_for(store, job_id, timeout=60):
+    """Record of a job once it is done or failed."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = store.get(job_id)
+        if job['status'] in (DONE, FAILED):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def temp_store():
+    return JobStore(os.path.join(tempfile.mkdtemp(), 'jobs.sqlite3'))
+
+
+def test_store_lifecycle():
+    """Jobs go from queued to running to done or failed, and expire."""
+    store = temp_store()
+    job_id = store.create({'name': 'inventory'})
+    job = store.get(job_id)
+    assert job['status'] == QUEUED and job['info'] == {'name': 'inventory'}
+    assert store.get('missing') is None
+
+    store.start(job_id)
+    assert store.count(RUNNING) == 1
+    store.finish(job_id, {'mls': np.float64(1.5)}, [('Done', 'success')])
+    job = store.get(job_id)
+    assert job['status'] == DONE
+    assert job['result'] == {'mls': 1.5}
+    assert job['messages'] == [['Done', 'success']]
+
+    other = store.create()
+    store.fail(other, ValueError('bad layer'))
+    assert store.get(other)['error'] == 'bad layer'
+    assert store.count(DONE, FAILED) == 2
+
+    store.delete_older_than(3600)
+    assert store.count(DONE, FAILED) == 2
+    store.delete_older_than(-1)
+    assert store.get(job_id) is None and store.get(other) is None
+
+
+def test_abandoned_jobs():
+    """Jobs left queued or running by exited processes fail; stalled jobs expire."""
+    store = temp_store()
+    dead = subprocess.Popen([sys.executable, '-c', 'pass'])
+    dead.wait()
+    running = store.create(owner=f'{dead.pid}:old')
+    store.start(running)
+    queued = store.create()
+    restarted = store.create(owner=f'{os.getpid()}:old')
+    live = store.create(owner=f'{os.getppid()}:other')
+    finished = store.create(owner=f'{dead.pid}:old')
+    store.finish(finished, {})
+
+    queue = JobQueue(store)
+    for job_id in (running, queued, restarted):
+        job = store.get(job_id)
+        assert job['status'] == FAILED and 'restart' in job['error']
+    assert store.get(live)['status'] == QUEUED
+    assert store.get(finished)['status'] == DONE
+
+    # The queue's own jobs are not abandoned
+    own = store.create(owner=queue._owner())
+    assert store.fail_abandoned(queue._owner()) == 0
+    assert store.get(own)['status'] == QUEUED
+
+    store.delete_older_than(-1)
+    assert store.get(live) is None and store.get(own) is None
+
+
+def test_queue_runs_jobs():
+    """Jobs run in worker processes; results, messages and errors are stored."""
+    queue = JobQueue(temp_store(), max_workers=2)
+    try:
+        done = wait_for(queue.store, queue.submit(add, 2, 3, info={'n': 1}))
+        assert done['status'] == DONE and done['result'] == {'sum': 5}
+        assert done['messages'] == [['Added', 'info']]
+        assert done['progress'] == {'stage': 'add', 'done': 1, 'total': 1}
+
+        failed = wait_for(queue.store, queue.submit(divide, 1, 0))
+        assert failed['status'] == FAILED
+        assert 'division by zero' in failed['error']
+        assert failed['messages'] == [['Dividing', 'info']]
+
+        # A job submitted after a pending future waits for it
+        gate = Future()
+        job_id = queue.submit(add, 1, 1, after=gate)
+        time.sleep(0.2)
+        assert queue.store.get(job_id)['status'] == QUEUED
+        gate.set_result(None)
+        assert wait_for(queue.store, job_id)['result'] == {'sum': 2}
+    finally:
+        queue.shutdown()
+
+
+def test_batches():
+    """Jobs created in a batch are listed together, in order."""
+    store = temp_store()
+    first = store.create({'layer': 'a.shp'}, batch='b1')
+    store.create({'layer': 'other.shp'})
+    second = store.create({'layer': 'b.shp'}, batch='b1')
+    assert [job['id'] for job in store.batch('b1')] == [first, second]
+    assert store.batch('b1')[0]['info'] == {'layer': 'a.shp'}
+    assert store.batch('missing') == []
+
+
+def test_queue_bound():
+    """Submitting beyond max_pending waiting jobs raises QueueFull."""
+    queue = JobQueue(temp_store(), max_pending=2)
+    gate = Future()
+    try:
+        queue.submit(add, 1, 1, after=gate)
+        queue.submit(add, 1, 1, after=gate)
+        try:
+            queue.submit(add, 1, 1)
+        except QueueFull:
+            pass
+        else:
+            assert False, "expected QueueFull"
+    finally:
+        gate.set_result(None)
+        queue.shutdown()
+
+
+def test_run_layer_job():
+    """The pipeline runs as a job, and a second run reuses the cached results."""
+    cache = ResultCache(tempfile.mkdtemp())
+    path = os.path.join(TESTS_DIR, 'test_landslides.shp')
+    options = {'workers': 1}
+    key = areas_key('upload', None, options)
+    parameters = {'estimation_method': 'simplified', 'uncertainty_method': 'delta'}
+    queue = JobQueue(temp_store())
+    try:
+        first = wait_for(queue.store, queue.submit(run_layer, cache, key, path, options, parameters))
+        assert first['status'] == DONE, first['error']
+        assert first['result']['valid_areas_count'] > 0
+        assert any(message.startswith('Parameters estimated') for message, _ in first['messages'])
+
+        second = wait_for(queue.store, queue.submit(run_layer, cache, key, path, options, parameters))
+        # Cached results skip reading; only the timings differ
+        assert first['result'].pop('timings')['total'] > 0
+        assert second['result'].pop('timings')['read'] == 0
+        assert second['result'] == first['result']
+        assert second['messages'][0][0].startswith('Results reused')
+    finally:
+        queue.shutdown()
+
+
+def test_goodness_of_fit_mode():
+    """Estimated parameters are tested with refits, given ones as they are."""
+    cache = ResultCache(tempfile.mkdtemp())
+    areas = 100 * (1 - np.random.default_rng(0).random(800)) ** (-1 / 1.4)
+    parameters = {'estimation_method': 'simplified', 'uncertainty_method': 'delta',
+                  'goodness_of_fit': True}
+    estimated = run_areas(cache, areas, parameters)['goodness_of_fit']
+    assert estimated['fitted']
+    given = run_areas(cache, areas, dict(parameters, cutoff=100, beta=-2.4))['goodness_of_fit']
+    assert not given['fitted'] and (given['xmin'], given['alpha']) == (100, 2.4)
+    half = run_areas(cache, areas, dict(parameters, cutoff=100))['goodness_of_fit']
+    assert half['fitted']
+
+
+def main():
+    """Run all tests."""
+    tests = [test_store_lifecycle, test_abandoned_jobs, test_queue_runs_jobs, test_batches,
+             test_queue_bound, test_run_layer_job, test_goodness_of_fit_mode]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✅ {test.__name__}")
+        except AssertionError:
+            failed += 1
+            print(f"  ❌ {test.__name__}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""
+Tests for the per-layer area cache in layer_cache.
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from area_reader import read_areas, zip_member_path  # noqa: E402
+from layer_cache import compute_layer, load_layer, read_summary  # noqa: E402
+
+TESTS_DIR = os.path.join(ROOT, 'tests')
+OPTIONS = {'workers': 1, 'repair': 'buffer', 'projection': 'utm', 'area_field': None,
+           'verify_sample': 100}
+
+
+def test_round_trip():
+    """Saved areas and summary equal a direct read of the layer."""
+    cache_dir = tempfile.mkdtemp()
+    path = zip_member_path(os.path.join(TESTS_DIR, 'multiple_landslides.zip'),
+                           'landslides_inventory2.shp')
+    assert read_summary(cache_dir, 0) is None
+
+    summary = compute_layer(path, cache_dir, 0, OPTIONS)
+    areas, loaded = load_layer(cache_dir, 0, OPTIONS)
+    expected = read_areas(path)['areas']
+
+    assert np.array_equal(areas, expected)
+    assert loaded == read_summary(cache_dir, 0)
+    assert loaded['count'] == summary['count'] == len(expected)
+    assert loaded['feature_count'] == 500
+    assert loaded['max_area'] == expected.max()
+    assert loaded['median_area'] == np.median(expected)
+
+
+def test_other_options_miss():
+    """An entry saved with other read options is not reused."""
+    cache_dir = tempfile.mkdtemp()
+    compute_layer(os.path.join(TESTS_DIR, 'test_landslides.shp'), cache_dir, 0, OPTIONS)
+
+    areas, summary = load_layer(cache_dir, 0, dict(OPTIONS, area_field='auto'))
+    assert areas is None
+    assert summary['options'] == OPTIONS
+
+
+def test_errors_are_saved():
+    """An unreadable layer saves its error instead of raising."""
+    cache_dir = tempfile.mkdtemp()
+    summary = compute_layer(os.path.join(cache_dir, 'missing.shp'), cache_dir, 3, OPTIONS)
+
+    assert 'error' in summary
+    assert read_summary(cache_dir, 3)['error'] == summary['error']
+    assert load_layer(cache_dir, 3, OPTIONS)[0] is None
+
+
+def main():
+    """Run all tests."""
+    tests = [test_round_trip, test_other_options_miss, test_errors_are_saved]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✅ {test.__name__}")
+        except AssertionError:
+            failed += 1
+            print(f"  ❌ {test.__name__}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
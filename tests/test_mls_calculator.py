@@ -0,0 +1,259 @@
+"""
+Tests for the mLS calculation and uncertainty engines in mls_calculator.
+"""
+
+import os
+import sys
+
+import numpy as np
+import scipy.io as sio
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from mls_calculator import (  # noqa: E402
+    HistogramAccumulator, LogBinning, MLSResult, adaptive_monte_carlo_mls_error,
+    calculate_mls, compute_mls, get_binning, monte_carlo_mls_error, mls_samples, mls_uncertainty, render_mls_plot
+)
+
+MATLAB_DIR = os.path.join(ROOT, 'matlab_original')
+
+
+def load_matlab_sample():
+    """Load the MATLAB sample inventory and its published parameters."""
+    def scalar(name):
+        return float(sio.loadmat(os.path.join(MATLAB_DIR, name + '.mat'))[name].item())
+
+    area = sio.loadmat(os.path.join(MATLAB_DIR, 'sample_data.mat'))['Area'].flatten()
+    return (area, scalar('cutoff'), scalar('beta'),
+            scalar('beta_error'), scalar('cutoff_error'))
+
+
+def loop_mls_error(max_area, midy, cutoff, beta, beta_error, cutoff_error, rng):
+    """Reference scalar Monte Carlo loop, as originally written."""
+    beta_interval = np.linspace(beta - beta_error, beta + beta_error, 500)
+    cutoff_interval = np.linspace(max(cutoff - cutoff_error, 2), cutoff + cutoff_error, 500)
+    mls_array = []
+    for _ in range(10000):
+        cutoff_sim = rng.normal(np.mean(cutoff_interval), np.std(cutoff_interval))
+        beta_sim = rng.normal(np.mean(beta_interval), np.std(beta_interval))
+        mls_sim = mls_samples(np.array([cutoff_sim]), np.array([beta_sim]), max_area, midy)[0]
+        if np.isfinite(mls_sim):
+            mls_array.append(mls_sim)
+    return np.std(mls_array)
+
+
+def test_matlab_parity():
+    """mLS and its uncertainty match the MATLAB sample results."""
+    area, cutoff, beta, beta_error, cutoff_error = load_matlab_sample()
+    mls_value, error, _ = calculate_mls(area, cutoff, beta, beta_error, cutoff_error, seed=0)
+
+    assert abs(mls_value - 3.6273) < 1e-4
+    assert abs(error - 0.085) < 0.005
+
+
+def test_seed_is_reproducible():
+    """The same seed gives the same uncertainty, in either precision."""
+    args = (1e5, 1e-3, 500.0, -2.3, 0.1, 50.0)
+    assert monte_carlo_mls_error(*args, seed=7) == monte_carlo_mls_error(*args, seed=7)
+    assert monte_carlo_mls_error(*args, seed=7) != monte_carlo_mls_error(*args, seed=8)
+
+    single = monte_carlo_mls_error(*args, seed=7, dtype=np.float32)
+    double = monte_carlo_mls_error(*args, seed=7)
+    assert abs(single - double) / double < 0.05
+
+
+def test_vectorized_matches_loop():
+    """The batched draws have the same statistics as the scalar loop."""
+    args = (2e5, 5e-4, 1000.0, -2.4, 0.15, 200.0)
+    vectorized = [monte_carlo_mls_error(*args, seed=s) for s in range(5)]
+    looped = [loop_mls_error(*args, rng=np.random.default_rng(100 + s)) for s in range(5)]
+
+    assert abs(np.mean(vectorized) - np.mean(looped)) / np.mean(looped) < 0.02
+
+
+def test_adaptive_converges():
+    """Adaptive sampling stops at the tolerance and reports the draws used."""
+    args = (1e5, 1e-3, 500.0, -2.3, 0.1, 50.0)
+    fixed = monte_carlo_mls_error(*args, n_samples=200000, seed=1)
+
+    loose = adaptive_monte_carlo_mls_error(*args, tolerance=1e-2, seed=2)
+    tight = adaptive_monte_carlo_mls_error(*args, tolerance=5e-4, seed=2)
+
+    assert loose['converged'] and tight['converged']
+    assert loose['n_samples'] < tight['n_samples']
+    assert tight['standard_error'] <= 5e-4
+    assert abs(tight['error'] - fixed) < 5 * 5e-4
+
+
+def test_adaptive_time_budget():
+    """A zero tolerance only stops on the time budget or sample cap."""
+    args = (1e5, 1e-3, 500.0, -2.3, 0.1, 50.0)
+    result = adaptive_monte_carlo_mls_error(*args, tolerance=0.0, time_budget=0.0,
+                                            seed=3)
+    assert not result['converged']
+    assert result['n_samples'] == 1000
+
+    result = adaptive_monte_carlo_mls_error(*args, tolerance=0.0, max_samples=5000, seed=3)
+    assert result['n_samples'] == 5000
+
+
+def test_delta_and_sobol_match_montecarlo():
+    """The closed-form and quasi-random methods agree with Monte Carlo."""
+    area, cutoff, beta, beta_error, cutoff_error = load_matlab_sample()
+    args = (np.max(area), 1e-3, cutoff, -abs(beta), beta_error, cutoff_error)
+    reference = monte_carlo_mls_error(*args, n_samples=1000000, seed=0)
+
+    delta = mls_uncertainty(*args, method='delta')
+    sobol = mls_uncertainty(*args, method='sobol', seed=0)
+
+    assert delta['n_samples'] == 0
+    assert sobol['n_samples'] == 512
+    assert abs(delta['error'] - reference) / reference < 0.01
+    assert abs(sobol['error'] - reference) / reference < 0.03
+
+
+def test_unknown_uncertainty_method():
+    """An unknown method name is rejected."""
+    try:
+        mls_uncertainty(1e5, 1e-3, 500.0, -2.3, 0.1, 50.0, method='bootstrap')
+    except ValueError:
+        return
+    raise AssertionError("ValueError not raised")
+
+
+def test_compute_without_plot():
+    """compute_mls returns the numbers calculate_mls reports, without a plot."""
+    area, cutoff, beta, beta_error, cutoff_error = load_matlab_sample()
+    result = compute_mls(area, cutoff, beta, beta_error, cutoff_error,
+                         uncertainty_method='delta')
+    mls_value, error, plot_base64 = calculate_mls(area, cutoff, beta, beta_error,
+                                                  cutoff_error, uncertainty_method='delta')
+
+    assert isinstance(result, MLSResult)
+    assert result.mls == mls_value and result.error == error
+    assert result.beta < 0
+    assert len(result.bin_centers) == len(result.frequency_density) == 119
+    assert np.all(result.fit_x >= cutoff)
+    assert render_mls_plot(result) == plot_base64
+
+
+def test_binning_matches_mls_m():
+    """Cached edges, intervals and centers match the original loops."""
+    x1 = np.zeros(120)
+    x1[0] = 2
+    for i in range(1, 120):
+        x1[i] = x1[i-1] * 1.2
+    internal = np.concatenate([[x1[0]], x1[1:-1] - x1[:-2]])
+
+    binning = get_binning()
+    assert get_binning() is binning
+    assert np.array_equal(binning.edges, x1)
+    assert np.array_equal(binning.widths, internal)
+    assert np.array_equal(binning.centers, (x1[:-1] + x1[1:]) / 2)
+
+
+def test_histogram_methods_match_numpy():
+    """Every histogram path matches np.histogram, including values on edges."""
+    rng = np.random.default_rng(0)
+    for binning in (get_binning(), LogBinning(start=5, ratio=1.5, n_edges=60)):
+        edges = binning.edges
+        areas = np.concatenate([
+            np.exp(rng.uniform(-1, np.log(edges[-1]) + 1, 100000)),
+            edges, np.nextafter(edges, 0), np.nextafter(edges, np.inf),
+            [0.0, -1.0, np.inf],
+        ])
+        expected = np.histogram(areas, bins=edges)[0]
+
+        assert np.array_equal(binning.histogram(areas), expected)
+        assert np.array_equal(binning.histogram(areas, method='direct'), expected)
+        assert np.array_equal(binning.histogram(np.sort(areas), method='sorted'), expected)
+
+
+def test_accumulator_matches_full_inventory():
+    """Batches and merged accumulators give the same mLS as the full array."""
+    area, cutoff, beta, beta_error, cutoff_error = load_matlab_sample()
+    expected = compute_mls(area, cutoff, beta, beta_error, cutoff_error,
+                           uncertainty_method='delta')
+
+    first = HistogramAccumulator()
+    for batch in np.array_split(area[:600], 7):
+        first.add(batch)
+    second = HistogramAccumulator().add(area[600:])
+    merged = first.merge(second)
+    result = merged.compute_mls(cutoff, beta, beta_error, cutoff_error,
+                                uncertainty_method='delta')
+
+    assert merged.count == len(area)
+    assert merged.max_area == np.max(area)
+    assert np.array_equal(result.frequency, expected.frequency)
+    assert result.mls == expected.mls and result.error == expected.error
+
+
+def test_accumulator_polygons():
+    """Projected polygons are reduced to their areas."""
+    from shapely.geometry import box
+
+    accumulator = HistogramAccumulator()
+    accumulator.add_polygons([box(0, 0, 10, 10), box(0, 0, 100, 50)])
+    assert accumulator.count == 2
+    assert accumulator.max_area == 5000.0
+    assert accumulator.total_area == 5100.0
+
+
+def test_accumulator_drops_invalid_areas():
+    """NaN, zero, negative and empty-polygon areas are not counted."""
+    from shapely.geometry import Polygon
+
+    accumulator = HistogramAccumulator().add([np.nan, 500, 1000, -5, 0])
+    assert accumulator.count == 2 == accumulator.counts.sum()
+    assert accumulator.max_area == 1000.0 and accumulator.mean_area == 750.0
+
+    accumulator.add_polygons([None, Polygon()])
+    assert accumulator.count == 2 and accumulator.mean_area == 750.0
+
+    empty = HistogramAccumulator().add([np.nan])
+    assert empty.count == 0 and empty.max_area == -np.inf
+
+
+def test_progress_callbacks():
+    """The uncertainty and plotting stages report their progress."""
+    area, cutoff, beta, beta_error, cutoff_error = load_matlab_sample()
+    calls = []
+    progress = lambda stage, done, total: calls.append((stage, done, total))  # noqa: E731
+
+    mls, error, _ = calculate_mls(area, cutoff, beta, beta_error, cutoff_error, seed=1,
+                                  progress=progress)
+    assert (mls, error) == calculate_mls(area, cutoff, beta, beta_error, cutoff_error,
+                                         seed=1)[:2]
+    assert calls == [('uncertainty', 0, 1), ('uncertainty', 1, 1),
+                     ('render', 0, 1), ('render', 1, 1)]
+
+    calls.clear()
+    adaptive_monte_carlo_mls_error(1e5, 1e-3, 500.0, -2.3, 0.1, 50.0, tolerance=0.0,
+                                   max_samples=5000, seed=3, progress=progress)
+    assert [done for _, done, _ in calls] == [1000, 2000, 3000, 4000, 5000]
+
+
+def main():
+    """Run all tests."""
+    tests = [test_matlab_parity, test_seed_is_reproducible, test_vectorized_matches_loop,
+             test_adaptive_converges, test_adaptive_time_budget,
+             test_delta_and_sobol_match_montecarlo, test_unknown_uncertainty_method,
+             test_compute_without_plot, test_binning_matches_mls_m,
+             test_histogram_methods_match_numpy, test_accumulator_matches_full_inventory,
+             test_accumulator_polygons, test_accumulator_drops_invalid_areas,
+             test_progress_callbacks]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✅ {test.__name__}")
+        except AssertionError:
+            failed += 1
+            print(f"  ❌ {test.__name__}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,262 @@
+"""
+Tests for the power-law parameter estimators in powerlaw_estimator.
+"""
+
+import os
+import sys
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from powerlaw_estimator import (  # noqa: E402
+    POWERLAW_AVAILABLE, bootstrap_parameters, estimate_powerlaw_parameters, fit_clauset,
+    goodness_of_fit, scan_xmin
+)
+
+
+def synthetic_areas(n_samples=1000, seed=42, true_cutoff=100, true_beta=-2.3):
+    """Power-law areas above true_cutoff, as in the module's __main__."""
+    rng = np.random.default_rng(seed)
+    u = rng.uniform(0, 1, n_samples)
+    alpha = abs(true_beta) - 1
+    return true_cutoff * (1 - u) ** (-1 / alpha)
+
+
+def brute_force_fit(areas, xmin):
+    """MLE exponent and exact KS distance for one xmin, computed directly."""
+    tail = np.sort(areas[areas >= xmin])
+    m = len(tail)
+    alpha = 1 + m / np.sum(np.log(tail / xmin))
+    cdf = 1 - (tail / xmin) ** (1 - alpha)
+    k = np.arange(m)
+    ks = max(np.max((k + 1) / m - cdf), np.max(cdf - k / m))
+    return alpha, ks
+
+
+def test_scan_matches_brute_force():
+    """Suffix-sum MLE and exact KS match a direct evaluation per candidate."""
+    areas = synthetic_areas()
+    candidates = np.linspace(50, 400, 17)
+    scan = scan_xmin(areas, candidates=candidates)
+
+    for j, xmin in enumerate(candidates):
+        alpha, ks = brute_force_fit(areas, xmin)
+        assert abs(scan['alpha'][j] - alpha) < 1e-9
+        assert abs(scan['ks'][j] - ks) < 1e-12
+    assert scan['ks'][scan['best']] == np.min(scan['ks'])
+
+
+def test_scan_default_candidates():
+    """By default every unique area in range is a candidate."""
+    areas = np.round(synthetic_areas(), 0)
+    scan = scan_xmin(areas, xmin_range=(100, 300))
+
+    expected = np.unique(areas[(areas >= 100) & (areas <= 300)])
+    assert np.array_equal(scan['xmin'], expected)
+    assert np.all(scan['n_tail'] == [np.sum(areas >= x) for x in expected])
+
+    # Beyond max_candidates, unique areas evenly spaced in rank, ends included
+    capped = scan_xmin(areas, xmin_range=(100, 300), max_candidates=20)
+    assert len(capped['xmin']) == 20
+    assert np.all(np.isin(capped['xmin'], expected))
+    assert capped['xmin'][0] == expected[0] and capped['xmin'][-1] == expected[-1]
+
+
+def test_scan_skips_short_tails():
+    """Candidates with fewer than min_tail areas above them are not fitted."""
+    areas = synthetic_areas(n_samples=200)
+    scan = scan_xmin(areas, candidates=[np.sort(areas)[-10], 100.0], min_tail=50)
+    assert np.isnan(scan['ks'][0]) and np.isnan(scan['alpha'][0])
+    assert scan['best'] == 1
+
+
+def test_simplified_recovers_parameters():
+    """The simplified estimator recovers the synthetic parameters."""
+    areas = synthetic_areas(n_samples=5000)
+    cutoff, beta, cutoff_error, beta_error, method = estimate_powerlaw_parameters(
+        areas, method='simplified'
+    )
+    assert method == 'simplified'
+    assert 100 <= cutoff <= np.median(areas)
+    assert abs(beta + 2.3) < 0.1
+
+
+def test_native_matches_powerlaw_fit():
+    """The native fitter reproduces powerlaw.Fit (xmin, alpha, sigma, D)."""
+    if not POWERLAW_AVAILABLE:
+        print("  (powerlaw package not installed, skipping comparison)")
+        return
+    import warnings
+    import powerlaw
+
+    rng = np.random.default_rng(3)
+    inventories = [
+        synthetic_areas(),
+        np.round(synthetic_areas(n_samples=2000, seed=5), 0),
+        np.concatenate([rng.lognormal(3, 1, 1500),
+                        synthetic_areas(n_samples=1000, seed=7, true_cutoff=50)]),
+    ]
+    for areas in inventories:
+        xmin_range = (np.percentile(areas, 5), np.percentile(areas, 50))
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            reference = powerlaw.Fit(areas, xmin=xmin_range, verbose=False).power_law
+        fit = fit_clauset(areas, xmin_range)
+
+        assert fit['xmin'] == reference.xmin
+        assert abs(fit['alpha'] - reference.alpha) < 1e-9
+        assert abs(fit['sigma'] - reference.standard_err) < 1e-9
+        assert abs(fit['ks'] - reference.D) < 1e-9
+
+
+def test_native_pruning_is_exact():
+    """Lower-bound pruning picks the same xmin as evaluating every candidate."""
+    areas = synthetic_areas(n_samples=3000, seed=11)
+    pruned = fit_clauset(areas)
+    full = fit_clauset(areas, n_probes=1)
+
+    assert pruned['n_evaluated'] < pruned['n_candidates']
+    assert pruned['xmin'] == full['xmin'] and pruned['ks'] == full['ks']
+
+
+def test_auto_uses_native():
+    """The default method does not need the powerlaw package."""
+    areas = synthetic_areas()
+    cutoff, beta, cutoff_error, beta_error, method = estimate_powerlaw_parameters(areas)
+    assert method == 'native'
+    fit = fit_clauset(areas, (np.percentile(areas, 5), np.percentile(areas, 50)))
+    assert cutoff == fit['xmin'] and beta == -fit['alpha'] and beta_error == fit['sigma']
+
+
+def test_unknown_method():
+    """Misspelled method names are rejected instead of falling back to native."""
+    try:
+        estimate_powerlaw_parameters(synthetic_areas(), method='offical')
+    except ValueError as error:
+        assert 'offical' in str(error)
+    else:
+        assert False, "expected ValueError"
+
+
+def test_approximate_search_reports_gap():
+    """The coarse-to-fine search is close to the exact one and says how close."""
+    rng = np.random.default_rng(4)
+    areas = np.concatenate([rng.lognormal(4, 1, 10000),
+                            synthetic_areas(n_samples=10000, seed=4)])
+    xmin_range = (np.percentile(areas, 5), np.percentile(areas, 50))
+    exact = fit_clauset(areas, xmin_range)
+    approximate = fit_clauset(areas, xmin_range, exact=False, n_subsample=2000)
+
+    assert exact['exact'] and exact['ks_gap'] == 0
+    assert not approximate['exact']
+    assert approximate['n_evaluated'] < exact['n_evaluated']
+    assert exact['ks'] <= approximate['ks'] <= exact['ks'] + approximate['ks_gap']
+    assert abs(np.log(approximate['xmin'] / exact['xmin'])) < 0.2
+
+
+def test_bootstrap_independent_of_workers():
+    """Per-resample seeds give the same bootstrap for any number of workers."""
+    areas = synthetic_areas()
+    serial = bootstrap_parameters(areas, n_resamples=20, seed=3, workers=1)
+    parallel = bootstrap_parameters(areas, n_resamples=20, seed=3, workers=2)
+
+    assert np.array_equal(serial['cutoff'], parallel['cutoff'])
+    assert np.array_equal(serial['beta'], parallel['beta'])
+    assert serial['cutoff_error'] > 0 and 0 < serial['beta_error'] < 0.5
+
+
+def test_bootstrap_errors_replace_approximations():
+    """With n_bootstrap the estimator reports the bootstrap errors."""
+    areas = synthetic_areas()
+    estimate = estimate_powerlaw_parameters(areas, n_bootstrap=20, seed=3, workers=1)
+    bootstrap = bootstrap_parameters(areas, n_resamples=20, seed=3, workers=1)
+
+    assert estimate[:2] == estimate_powerlaw_parameters(areas)[:2]
+    assert estimate[2] == bootstrap['cutoff_error']
+    assert estimate[3] == bootstrap['beta_error']
+
+
+def test_goodness_of_fit_accepts_power_law():
+    """A true power law is plausible and the test stops early."""
+    gof = goodness_of_fit(synthetic_areas(n_samples=2000), seed=1, workers=1)
+    assert gof['plausible'] and gof['decided']
+    assert gof['n_synthetic'] < 1000
+    assert gof['p_interval'][0] > gof['significance']
+
+
+def test_goodness_of_fit_rejects_lognormal():
+    """A lognormal inventory is rejected."""
+    areas = np.random.default_rng(0).lognormal(4, 1.2, 3000)
+    gof = goodness_of_fit(areas, seed=1, workers=1)
+    assert not gof['plausible'] and gof['decided']
+    assert gof['p_interval'][1] < gof['significance']
+
+
+def test_goodness_of_fit_independent_of_workers():
+    """Per-dataset seeds give the same p-value for any number of workers."""
+    areas = synthetic_areas()
+    serial = goodness_of_fit(areas, max_synthetic=40, batch_size=20, early_stop=False,
+                             seed=2, workers=1)
+    parallel = goodness_of_fit(areas, max_synthetic=40, batch_size=20, early_stop=False,
+                               seed=2, workers=2)
+    assert serial['n_synthetic'] == 40
+    assert serial['p_value'] == parallel['p_value']
+
+
+def test_goodness_of_fit_given_power_law():
+    """Given xmin and alpha are tested as they stand, not refitted."""
+    areas = synthetic_areas(n_samples=2000)
+    true = goodness_of_fit(areas, seed=1, workers=1, xmin=100, alpha=2.3)
+    assert not true['fitted'] and true['plausible'] and true['decided']
+    assert (true['xmin'], true['alpha']) == (100, 2.3)
+    wrong = goodness_of_fit(areas, seed=1, workers=1, xmin=100, alpha=1.8)
+    assert not wrong['plausible'] and wrong['decided']
+    assert goodness_of_fit(areas, seed=1, workers=1)['fitted']
+
+
+def test_progress_callbacks():
+    """The estimation, bootstrap and goodness-of-fit stages report their progress."""
+    areas = synthetic_areas()
+    calls = []
+    progress = lambda stage, done, total: calls.append((stage, done, total))  # noqa: E731
+
+    estimate = estimate_powerlaw_parameters(areas, n_bootstrap=40, seed=3, workers=1,
+                                            progress=progress)
+    assert estimate == estimate_powerlaw_parameters(areas, n_bootstrap=40, seed=3, workers=1)
+    assert calls[:2] == [('estimate', 0, 1), ('estimate', 1, 1)]
+    bootstrap = [done for stage, done, total in calls if stage == 'bootstrap']
+    assert len(bootstrap) == 20 and bootstrap[-1] == 40 and bootstrap == sorted(bootstrap)
+
+    calls.clear()
+    goodness_of_fit(areas, max_synthetic=40, batch_size=20, early_stop=False, seed=2,
+                    workers=1, progress=progress)
+    assert calls == [('goodness_of_fit', 20, 40), ('goodness_of_fit', 40, 40)]
+
+
+def main():
+    """Run all tests."""
+    tests = [test_scan_matches_brute_force, test_scan_default_candidates,
+             test_scan_skips_short_tails, test_simplified_recovers_parameters,
+             test_native_matches_powerlaw_fit, test_native_pruning_is_exact,
+             test_auto_uses_native, test_unknown_method,
+             test_approximate_search_reports_gap,
+             test_bootstrap_independent_of_workers,
+             test_bootstrap_errors_replace_approximations,
+             test_goodness_of_fit_accepts_power_law, test_goodness_of_fit_rejects_lognormal,
+             test_goodness_of_fit_independent_of_workers, test_goodness_of_fit_given_power_law,
+             test_progress_callbacks]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✅ {test.__name__}")
+        except AssertionError:
+            failed += 1
+            print(f"  ❌ {test.__name__}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
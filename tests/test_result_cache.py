@@ -0,0 +1,100 @@
+"""
+Tests for the content-addressed stage cache in result_cache.
+"""
+
+import hashlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from result_cache import ResultCache, file_sha256, save_with_sha256  # noqa: E402
+
+
+def test_streaming_hash():
+    """The upload is copied and hashed in one pass."""
+    data = os.urandom(3 * 1024 * 1024 + 17)
+    path = os.path.join(tempfile.mkdtemp(), 'upload.zip')
+
+    digest = save_with_sha256(io.BytesIO(data), path, chunk_size=65536)
+    assert digest == hashlib.sha256(data).hexdigest() == file_sha256(path)
+    with open(path, 'rb') as handle:
+        assert handle.read() == data
+
+
+def test_keys():
+    """Keys depend on the values of the parts, not on dict order."""
+    assert ResultCache.key('fit', {'a': 1, 'b': 2}) == ResultCache.key('fit', {'b': 2, 'a': 1})
+    assert ResultCache.key('fit', 'native', 0) != ResultCache.key('fit', 'native', 200)
+    assert ResultCache.key('result', np.float64(1.5)) == ResultCache.key('result', 1.5)
+
+
+def test_round_trip():
+    """JSON values and memory-mapped arrays come back unchanged."""
+    cache = ResultCache(tempfile.mkdtemp())
+    key = ResultCache.key('areas', 'abc')
+    assert cache.get('fit', key) is None and cache.get_array('areas', key) is None
+
+    cache.put('fit', key, [100.0, 2.3, 10.0, 0.05, 'native'])
+    assert cache.get('fit', key) == [100.0, 2.3, 10.0, 0.05, 'native']
+
+    areas = np.random.default_rng(0).pareto(1.4, 1000)
+    cache.put_array('areas', key, areas, {'feature_count': 1000, 'plausible': np.bool_(True)})
+    loaded, meta = cache.get_array('areas', key)
+    assert isinstance(loaded, np.memmap) and not loaded.flags.writeable
+    assert np.array_equal(loaded, areas)
+    assert meta == {'feature_count': 1000, 'plausible': True}
+
+    # Other processes see the entries on disk
+    fresh = ResultCache(cache.root)
+    assert fresh.get('fit', key) == [100.0, 2.3, 10.0, 0.05, 'native']
+
+
+def test_lru_eviction():
+    """Beyond the disk budget, the least recently used entries go first."""
+    cache = ResultCache(tempfile.mkdtemp(), max_disk_bytes=2500)
+    value = 'x' * 1000
+    for name in ['a', 'b']:
+        cache.put('result', name, value)
+        time.sleep(0.01)
+    cache.get('result', 'a')
+    time.sleep(0.01)
+    cache.put('result', 'c', value)
+
+    assert cache.get('result', 'b') is None
+    assert cache.get('result', 'a') == value
+    assert cache.get('result', 'c') == value
+
+
+def test_memory_budget():
+    """The in-process copy stays under its budget."""
+    cache = ResultCache(tempfile.mkdtemp(), max_memory_bytes=2500)
+    for index in range(10):
+        cache.put('result', str(index), 'x' * 1000)
+    assert cache._memory_bytes <= 2500
+    assert cache.get('result', '0') == 'x' * 1000
+
+
+def main():
+    """Run all tests."""
+    tests = [test_streaming_hash, test_keys, test_round_trip, test_lru_eviction,
+             test_memory_budget]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"  ✅ {test.__name__}")
+        except AssertionError:
+            failed += 1
+            print(f"  ❌ {test.__name__}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())